@@ -0,0 +1,65 @@
+""" Version tokens and counters kept in the shared cache.
+
+Cached entries which cannot be found by the objects they were built from record the version tokens of those
+objects instead. Replacing the tokens of changed objects invalidates every entry built from them.
+"""
+import uuid
+
+from django.core.cache import cache
+
+from ecommerce.core.transactions import run_now_and_after_commit
+
+
+def get_versions(cache_keys, timeout):
+    """
+    Returns the version tokens stored under the given cache keys, creating tokens for keys not cached yet.
+
+    Arguments:
+        cache_keys (list): Cache keys of the version tokens.
+        timeout (int): Seconds the created tokens are cached for.
+
+    Returns:
+        dict: The version token stored under every cache key.
+    """
+    versions = cache.get_many(cache_keys)
+    missing = [cache_key for cache_key in cache_keys if cache_key not in versions]
+    if missing:
+        for cache_key in missing:
+            cache.add(cache_key, uuid.uuid4().hex, timeout)
+        versions.update(cache.get_many(missing))
+    return versions
+
+
+def _set_versions(cache_keys, timeout):
+    cache.set_many({cache_key: uuid.uuid4().hex for cache_key in cache_keys}, timeout)
+
+
+def invalidate_versions(cache_keys, timeout):
+    """
+    Replaces the version tokens stored under the given cache keys.
+
+    Tokens are replaced again once the current transaction is over, so that entries rebuilt from data
+    which was not committed yet are invalidated too.
+
+    Arguments:
+        cache_keys (iterable): Cache keys of the version tokens.
+        timeout (int): Seconds the new tokens are cached for.
+    """
+    run_now_and_after_commit(_set_versions, list(cache_keys), timeout)
+
+
+def increment_counter(cache_key, count=1):
+    """ Adds to the counter stored under the given cache key, which is shared by all processes. """
+    if count:
+        cache.add(cache_key, 0, None)
+        try:
+            cache.incr(cache_key, count)
+        except ValueError:
+            # The counter was evicted since it was added.
+            pass
+
+
+def get_counters(cache_keys):
+    """ Returns the counts stored under the given cache keys, which are 0 for counters not cached. """
+    counts = cache.get_many(cache_keys)
+    return {cache_key: counts.get(cache_key, 0) for cache_key in cache_keys}
@@ -0,0 +1,132 @@
+""" Circuit breakers guarding calls made to the LMS on behalf of a site.
+
+When a service degrades, every call to it waits for its full timeout, and the workers making those calls are
+soon all waiting. A circuit breaker counts the failures of calls to an endpoint and, once too many of them
+fail, refuses further calls for a while so that they fail fast instead. The state of every circuit lives in
+the cache, so that it is shared by all workers.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from requests.exceptions import ConnectionError, Timeout
+
+logger = logging.getLogger(__name__)
+
+# Endpoints guarded by circuit breakers.
+LMS_BULK_ENROLLMENT_API = 'lms_bulk_enrollment_api'
+LMS_COMMERCE_API = 'lms_commerce_api'
+LMS_CREDIT_API = 'lms_credit_api'
+LMS_ENROLLMENT_API = 'lms_enrollment_api'
+CIRCUITS = (LMS_BULK_ENROLLMENT_API, LMS_COMMERCE_API, LMS_CREDIT_API, LMS_ENROLLMENT_API)
+
+
+class CircuitOpenError(ConnectionError):
+    """ Raised instead of making a call through an open circuit.
+
+    This is a ConnectionError, so that callers handle refused calls as they handle calls failing to connect.
+    """
+    pass
+
+
+class CircuitBreaker(object):
+    """ Circuit breaker guarding HTTP calls made to an endpoint on behalf of a site.
+
+    The circuit opens once CIRCUIT_BREAKER_FAILURE_THRESHOLD calls fail to connect, time out, or are answered
+    with a server error within CIRCUIT_BREAKER_FAILURE_WINDOW seconds. Calls are then refused with a
+    CircuitOpenError. After CIRCUIT_BREAKER_RESET_TIMEOUT seconds the circuit is half-open, and one probe call
+    is let through every CIRCUIT_BREAKER_PROBE_INTERVAL seconds: the circuit closes once a probe succeeds,
+    and opens again if it fails. Circuit breakers are disabled when CIRCUIT_BREAKER_FAILURE_THRESHOLD is 0.
+
+    Args:
+        name (str): The endpoint guarded by the circuit breaker.
+        site_id (int): ID of the configuration of the site on whose behalf calls are made.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half-open'
+
+    def __init__(self, name, site_id=None):
+        self.name = name
+        self.site_id = site_id
+
+    def _get_cache_key(self, suffix):
+        return 'circuit_breaker.{}.{}.{}'.format(self.site_id, self.name, suffix)
+
+    @property
+    def enabled(self):
+        return settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD > 0
+
+    @property
+    def state(self):
+        opened_at = cache.get(self._get_cache_key('opened_at'))
+        if opened_at is None:
+            return self.CLOSED
+        if time.time() - opened_at < settings.CIRCUIT_BREAKER_RESET_TIMEOUT:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def call(self, request, *args, **kwargs):
+        """ Makes an HTTP call through the circuit.
+
+        Args:
+            request (callable): Function making the call, and returning its response.
+            *args, **kwargs: Arguments passed to the function.
+
+        Returns:
+            The response to the call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open and already being probed.
+        """
+        if not self.enabled:
+            return request(*args, **kwargs)
+
+        state = self.state
+        if state == self.OPEN or (
+                state == self.HALF_OPEN and
+                not cache.add(self._get_cache_key('probe'), True, settings.CIRCUIT_BREAKER_PROBE_INTERVAL)
+        ):
+            raise CircuitOpenError('Circuit [{}] of site [{}] is {}.'.format(self.name, self.site_id, state))
+
+        try:
+            response = request(*args, **kwargs)
+        except (ConnectionError, Timeout):
+            self._record_failure(state)
+            raise
+
+        if response.status_code >= 500:
+            self._record_failure(state)
+        elif state != self.CLOSED:
+            self._close()
+
+        return response
+
+    def _record_failure(self, state):
+        if state == self.HALF_OPEN:
+            self._open()
+            return
+
+        key = self._get_cache_key('failures')
+        window = settings.CIRCUIT_BREAKER_FAILURE_WINDOW
+        cache.add(key, 0, window)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            # The window ended since the counter was added.
+            cache.set(key, 1, window)
+            failures = 1
+
+        if failures >= settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD:
+            self._open()
+
+    def _open(self):
+        cache.set(self._get_cache_key('opened_at'), time.time(), None)
+        cache.delete_many([self._get_cache_key('failures'), self._get_cache_key('probe')])
+        logger.warning(
+            'Opened circuit [%s] of site [%s]. Calls are refused for [%d] seconds.',
+            self.name, self.site_id, settings.CIRCUIT_BREAKER_RESET_TIMEOUT
+        )
+
+    def _close(self):
+        cache.delete_many([self._get_cache_key(suffix) for suffix in ('opened_at', 'failures', 'probe')])
+        logger.info('Closed circuit [%s] of site [%s].', self.name, self.site_id)
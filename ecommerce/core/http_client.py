@@ -0,0 +1,169 @@
+""" Pooled HTTP clients for calls made to the LMS and other services on behalf of a site.
+
+Opening a connection, and negotiating TLS for it, often costs more than the call itself. Every site
+therefore owns a client whose connection pools are shared by all of its calls, so that connections
+to a service are kept alive and reused across requests.
+"""
+import logging
+import threading
+import time
+from urlparse import urlparse
+
+import requests
+from django.conf import settings
+from edx_rest_api_client.client import EdxRestApiClient
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from threadlocals.threadlocals import get_current_request
+
+from ecommerce.core.circuit_breaker import CIRCUITS, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = frozenset(['DELETE', 'GET', 'HEAD', 'OPTIONS', 'PUT'])
+RETRY_STATUS_CODES = frozenset([502, 503, 504])
+
+
+class PooledSession(requests.Session):
+    """ Session sending its requests over connection pools shared with other sessions.
+
+    Sessions hold their own authentication and headers, so every caller gets a session of its own,
+    while the keep-alive connections live in the adapter shared by all sessions of a client.
+    Idempotent requests which fail to connect, or are answered with a 502, 503 or 504, are retried
+    with exponential backoff, up to max_retries times, which defaults to HTTP_CLIENT_MAX_RETRIES.
+    Requests of sessions given a circuit breaker are made through its circuit. The duration of every
+    request is logged.
+    """
+
+    def __init__(self, adapter, circuit_breaker=None, max_retries=None):
+        super(PooledSession, self).__init__()
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        self.circuit_breaker = circuit_breaker
+        self.max_retries = max_retries
+
+    def request(self, method, url, *args, **kwargs):  # pylint: disable=arguments-differ
+        if self.circuit_breaker:
+            return self.circuit_breaker.call(self._request_with_retries, method, url, *args, **kwargs)
+        return self._request_with_retries(method, url, *args, **kwargs)
+
+    def _request_with_retries(self, method, url, *args, **kwargs):
+        retries = 0
+        if method.upper() in IDEMPOTENT_METHODS:
+            retries = settings.HTTP_CLIENT_MAX_RETRIES if self.max_retries is None else self.max_retries
+        attempt = 0
+
+        while True:
+            start = time.time()
+            try:
+                response = super(PooledSession, self).request(method, url, *args, **kwargs)
+            except ConnectionError:
+                self._log_request(method, url, None, start)
+                if attempt >= retries:
+                    raise
+            else:
+                self._log_request(method, url, response.status_code, start)
+                if attempt >= retries or response.status_code not in RETRY_STATUS_CODES:
+                    return response
+                response.close()
+
+            time.sleep(settings.HTTP_CLIENT_RETRY_BACKOFF * (2 ** attempt))
+            attempt += 1
+
+    def close(self):
+        # The adapter, and the connections it pools, are shared with the client's other sessions.
+        pass
+
+    def _log_request(self, method, url, status_code, start):
+        logger.info(
+            'http_request: duration="%.3f", host="%s", method="%s", status_code="%s"',
+            time.time() - start, urlparse(url).netloc, method.upper(), status_code
+        )
+
+
+class SiteHttpClient(object):
+    """ HTTP client owning the connection pools used for calls made on behalf of a site.
+
+    Args:
+        site_id (int): ID of the configuration of the site, if any.
+    """
+
+    def __init__(self, site_id=None):
+        self.site_id = site_id
+        self.adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_CLIENT_POOL_CONNECTIONS,
+            pool_maxsize=settings.HTTP_CLIENT_POOL_MAXSIZE
+        )
+
+    def circuit_breaker(self, circuit):
+        """ Returns the circuit breaker guarding calls to the given endpoint on behalf of the client's site. """
+        return CircuitBreaker(circuit, self.site_id)
+
+    def get_circuit_states(self):
+        """ Returns the state of the circuit of every guarded endpoint, keyed by endpoint. """
+        return {circuit: self.circuit_breaker(circuit).state for circuit in CIRCUITS}
+
+    def session(self, circuit=None, max_retries=None):
+        """ Returns a new session sending its requests over the client's connection pools.
+
+        Args:
+            circuit (str): The endpoint whose circuit breaker guards the session's requests, if any.
+            max_retries (int): Number of times failed idempotent requests are retried. Defaults to
+                HTTP_CLIENT_MAX_RETRIES.
+        """
+        return PooledSession(self.adapter, self.circuit_breaker(circuit) if circuit else None, max_retries)
+
+    def request(self, method, url, circuit=None, max_retries=None, **kwargs):
+        return self.session(circuit, max_retries).request(method, url, **kwargs)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def api_client(self, url, circuit=None, **kwargs):
+        """ Returns an EdxRestApiClient sending its requests over the client's connection pools.
+
+        Args:
+            url (str): The root URL of the API.
+            circuit (str): The endpoint whose circuit breaker guards the client's requests, if any.
+            **kwargs: Keyword arguments, such as the credentials, passed to the EdxRestApiClient.
+
+        Returns:
+            EdxRestApiClient
+        """
+        return EdxRestApiClient(url, session=self.session(circuit), **kwargs)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_http_client(site_configuration=None):
+    """ Returns the pooled HTTP client of a site.
+
+    Args:
+        site_configuration (SiteConfiguration): Configuration of the site on whose behalf calls are made.
+            Defaults to the configuration of the current request's site. Calls made outside of a site
+            share a client of their own.
+
+    Returns:
+        SiteHttpClient
+    """
+    if site_configuration is None:
+        site = getattr(get_current_request(), 'site', None)
+        site_configuration = getattr(site, 'siteconfiguration', None)
+
+    key = site_configuration.id if site_configuration else None
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = SiteHttpClient(key)
+
+    return client
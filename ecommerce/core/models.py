@@ -1,6 +1,7 @@
 import datetime
 import hashlib
 import logging
+from multiprocessing.pool import ThreadPool
 from urlparse import urljoin
 
 from analytics import Client as SegmentClient
@@ -19,7 +20,9 @@ from jsonfield.fields import JSONField
 from requests.exceptions import ConnectionError, Timeout
 from slumber.exceptions import HttpNotFoundError, SlumberBaseException
 
+from ecommerce.core.circuit_breaker import LMS_CREDIT_API, LMS_ENROLLMENT_API
 from ecommerce.core.exceptions import VerificationStatusError
+from ecommerce.core.http_client import get_http_client
 from ecommerce.core.url_utils import get_lms_url
 from ecommerce.core.utils import log_message_and_raise_validation_error
 from ecommerce.courses.utils import mode_for_seat
@@ -328,7 +331,7 @@ class SiteConfiguration(models.Model):
             EdxRestApiClient: The client to access the Course Catalog service.
         """
 
-        return EdxRestApiClient(settings.COURSE_CATALOG_API_URL, jwt=self.access_token)
+        return get_http_client(self).api_client(settings.COURSE_CATALOG_API_URL, jwt=self.access_token)
 
 
 class User(AbstractUser):
@@ -371,8 +374,10 @@ class User(AbstractUser):
         """
         course_key = seat.attr.course_key
         try:
-            api = EdxRestApiClient(
-                request.site.siteconfiguration.build_lms_url('/api/enrollment/v1'),
+            site_configuration = request.site.siteconfiguration
+            api = get_http_client(site_configuration).api_client(
+                site_configuration.build_lms_url('/api/enrollment/v1'),
+                circuit=LMS_ENROLLMENT_API,
                 oauth_access_token=self.access_token,
                 append_slash=False
             )
@@ -404,8 +409,9 @@ class User(AbstractUser):
             connection with the LMS account API endpoint.
         """
         try:
-            api = EdxRestApiClient(
-                request.site.siteconfiguration.build_lms_url('/api/user/v1'),
+            site_configuration = request.site.siteconfiguration
+            api = get_http_client(site_configuration).api_client(
+                site_configuration.build_lms_url('/api/user/v1'),
                 oauth_access_token=self.access_token,
                 append_slash=False
             )
@@ -439,8 +445,9 @@ class User(AbstractUser):
             'course_key': course_key
         }
         try:
-            api = EdxRestApiClient(
+            api = get_http_client().api_client(
                 get_lms_url('api/credit/v1/'),
+                circuit=LMS_CREDIT_API,
                 oauth_access_token=self.access_token
             )
             response = api.eligibility().get(**query_strings)
@@ -453,6 +460,54 @@ class User(AbstractUser):
             raise
         return response
 
+    def get_credit_eligibilities(self, course_keys, site):
+        """
+        Check if a user is eligible for several credit courses.
+        The LMS eligibility API endpoint is called for every course key concurrently,
+        so the calls cost a single round trip rather than one per course.
+
+        Args:
+            course_keys (list): The course keys for which the eligibility is checked for.
+            site (Site): The site on whose behalf the LMS eligibility API endpoint is called.
+
+        Returns:
+            A dict mapping every course key to its eligibility information, as returned
+            by is_eligible_for_credit.
+
+        Raises:
+            ConnectionError, SlumberBaseException and Timeout for failures in establishing a
+            connection with the LMS eligibility API endpoint.
+        """
+        course_keys = list(set(course_keys))
+        if not course_keys:
+            return {}
+
+        # The access token is read from the database, which is not available to the worker threads.
+        api = get_http_client(site.siteconfiguration).api_client(
+            site.siteconfiguration.build_lms_url('api/credit/v1/'),
+            circuit=LMS_CREDIT_API,
+            oauth_access_token=self.access_token
+        )
+
+        def get_eligibility(course_key):
+            try:
+                return api.eligibility().get(username=self.username, course_key=course_key)
+            except (ConnectionError, SlumberBaseException, Timeout):
+                log.exception(
+                    'Failed to retrieve eligibility details for [%s] in course [%s]',
+                    self.username,
+                    course_key
+                )
+                raise
+
+        pool = ThreadPool(min(len(course_keys), settings.CREDIT_ELIGIBILITY_MAX_WORKERS))
+        try:
+            responses = pool.map(get_eligibility, course_keys)
+        finally:
+            pool.close()
+            pool.join()
+        return dict(zip(course_keys, responses))
+
     def is_verified(self, site):
         """
         Check if a user has verified his/her identity.
@@ -474,7 +529,7 @@ class User(AbstractUser):
             cache_key = hashlib.md5(cache_key).hexdigest()
             verification = cache.get(cache_key)
             if not verification:
-                api = EdxRestApiClient(
+                api = get_http_client(site.siteconfiguration).api_client(
                     site.siteconfiguration.build_lms_url('api/user/v1/'),
                     oauth_access_token=self.access_token
                 )
@@ -0,0 +1,47 @@
+""" Local HTTP servers standing in for remote services in tests and benchmarks. """
+import json
+import threading
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+from SocketServer import ThreadingMixIn
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """ Base of the request handlers of stub servers, which answer with JSON and log nothing. """
+
+    def respond(self, status_code, data=None):
+        body = json.dumps(data) if data is not None else ''
+        self.send_response(status_code)
+        if data is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StubServer(ThreadingMixIn, HTTPServer):
+    """ Server on a free local port, serving every request in a thread of its own, for use as a context manager.
+
+    Handlers record the requests they answer in the requests list of the server.
+
+    Args:
+        handler_class (type): Request handler answering the requests made to the server.
+    """
+    daemon_threads = True
+
+    def __init__(self, handler_class):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), handler_class)
+        self.requests = []
+        self.root_url = 'http://127.0.0.1:{}'.format(self.server_port)
+
+    def __enter__(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.core.signals import request_finished
+
+from ecommerce.core.cache import get_counters, get_versions, increment_counter, invalidate_versions
+from ecommerce.tests.testcases import TestCase
+
+
+class VersionTests(TestCase):
+    def setUp(self):
+        super(VersionTests, self).setUp()
+        self.addCleanup(cache.clear)
+
+    def test_get_versions(self):
+        """ Verify tokens are created for keys not cached yet, and kept until invalidated. """
+        versions = get_versions(['a', 'b'], 60)
+        self.assertEqual(set(versions), {'a', 'b'})
+        self.assertEqual(get_versions(['a', 'b'], 60), versions)
+
+        invalidate_versions(['a'], 60)
+        new_versions = get_versions(['a', 'b'], 60)
+        self.assertNotEqual(new_versions['a'], versions['a'])
+        self.assertEqual(new_versions['b'], versions['b'])
+
+    def test_invalidated_after_commit(self):
+        """ Verify tokens invalidated inside a transaction are replaced again once the request is finished. """
+        invalidate_versions(['a'], 60)
+        version = get_versions(['a'], 60)['a']
+        request_finished.send(sender=self.__class__)
+        self.assertNotEqual(get_versions(['a'], 60)['a'], version)
+
+
+class CounterTests(TestCase):
+    def setUp(self):
+        super(CounterTests, self).setUp()
+        self.addCleanup(cache.clear)
+
+    def test_counters(self):
+        """ Verify counters start at 0 and are incremented by the given counts. """
+        increment_counter('a')
+        increment_counter('a', 2)
+        increment_counter('b', 0)
+        self.assertEqual(get_counters(['a', 'b']), {'a': 3, 'b': 0})
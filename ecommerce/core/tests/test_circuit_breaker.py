@@ -0,0 +1,132 @@
+from django.core.cache import cache
+from django.test import override_settings
+from requests.exceptions import ConnectionError
+
+from ecommerce.core.circuit_breaker import (
+    CIRCUITS, LMS_COMMERCE_API, LMS_ENROLLMENT_API, CircuitBreaker, CircuitOpenError
+)
+from ecommerce.core.http_client import get_http_client
+from ecommerce.core.stubs import StubRequestHandler, StubServer
+from ecommerce.tests.testcases import TestCase
+
+
+class FlakyServerHandler(StubRequestHandler):
+    """ Answers every request with the next of the server's status codes, or with a 200 once they run out. """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        self.server.requests.append(self.path)
+        self.respond(self.server.status_codes.pop(0) if self.server.status_codes else 200)
+
+
+class FlakyServer(StubServer):
+    """ Local server standing in for a flaky LMS endpoint. """
+
+    def __init__(self, status_codes=None):
+        StubServer.__init__(self, FlakyServerHandler)
+        self.status_codes = list(status_codes or [])
+        self.url = self.root_url + '/'
+
+
+@override_settings(
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD=3,
+    CIRCUIT_BREAKER_FAILURE_WINDOW=60,
+    CIRCUIT_BREAKER_RESET_TIMEOUT=60,
+    CIRCUIT_BREAKER_PROBE_INTERVAL=60
+)
+class CircuitBreakerTests(TestCase):
+    def setUp(self):
+        super(CircuitBreakerTests, self).setUp()
+        self.addCleanup(cache.clear)
+        self.http_client = get_http_client(self.site.siteconfiguration)
+        self.circuit_breaker = self.http_client.circuit_breaker(LMS_ENROLLMENT_API)
+
+        self.server = FlakyServer().__enter__()
+        self.addCleanup(self.server.__exit__)
+
+    def get(self):
+        return self.http_client.get(self.server.url, circuit=LMS_ENROLLMENT_API)
+
+    def trip(self):
+        """ Opens the circuit by failing as many calls as the threshold allows. """
+        self.server.status_codes = [503] * 3
+        for __ in range(3):
+            self.assertEqual(self.get().status_code, 503)
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.OPEN)
+        self.server.requests = []
+
+    def test_circuit_opens(self):
+        """ Verify the circuit opens once enough calls fail, and refuses calls without sending them. """
+        self.server.status_codes = [503, 503]
+        for __ in range(3):
+            self.get()
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+        self.server.status_codes = [500]
+        self.get()
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.OPEN)
+        self.server.requests = []
+
+        with self.assertRaises(CircuitOpenError):
+            self.get()
+        self.assertEqual(self.server.requests, [])
+
+        # Other endpoints, and the same endpoint called on behalf of other sites, are unaffected.
+        self.assertEqual(self.http_client.get(self.server.url, circuit=LMS_COMMERCE_API).status_code, 200)
+        self.assertEqual(CircuitBreaker(LMS_ENROLLMENT_API).state, CircuitBreaker.CLOSED)
+
+    def test_connection_failures_open_circuit(self):
+        """ Verify calls failing to connect count as failures. """
+        # Nothing listens on port 1, so connections are refused.
+        for __ in range(3):
+            with self.assertRaises(ConnectionError):
+                self.http_client.get('http://127.0.0.1:1/', circuit=LMS_ENROLLMENT_API)
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.OPEN)
+
+    def test_successful_probe_closes_circuit(self):
+        """ Verify a half-open circuit closes once a probe succeeds. """
+        self.trip()
+
+        with override_settings(CIRCUIT_BREAKER_RESET_TIMEOUT=0):
+            self.assertEqual(self.circuit_breaker.state, CircuitBreaker.HALF_OPEN)
+            self.assertEqual(self.get().status_code, 200)
+
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_failed_probe_opens_circuit(self):
+        """ Verify a half-open circuit lets a single probe through, and opens again if it fails. """
+        self.trip()
+
+        with override_settings(CIRCUIT_BREAKER_RESET_TIMEOUT=0):
+            self.server.status_codes = [503]
+            self.assertEqual(self.get().status_code, 503)
+            self.assertEqual(len(self.server.requests), 1)
+
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.get()
+
+        with override_settings(CIRCUIT_BREAKER_RESET_TIMEOUT=0):
+            cache.add(self.circuit_breaker._get_cache_key('probe'), True)  # pylint: disable=protected-access
+            with self.assertRaises(CircuitOpenError):
+                self.get()
+        self.assertEqual(len(self.server.requests), 1)
+
+    @override_settings(CIRCUIT_BREAKER_FAILURE_THRESHOLD=0)
+    def test_disabled(self):
+        """ Verify circuits never open when circuit breakers are disabled. """
+        self.server.status_codes = [503] * 5
+        for __ in range(5):
+            self.get()
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.circuit_breaker.state, CircuitBreaker.CLOSED)
+
+    def test_get_circuit_states(self):
+        """ Verify the client reports the state of the circuit of every guarded endpoint. """
+        expected = {circuit: CircuitBreaker.CLOSED for circuit in CIRCUITS}
+        self.assertEqual(self.http_client.get_circuit_states(), expected)
+
+        self.trip()
+        expected[LMS_ENROLLMENT_API] = CircuitBreaker.OPEN
+        self.assertEqual(self.http_client.get_circuit_states(), expected)
@@ -0,0 +1,95 @@
+from io import BytesIO
+
+import mock
+from django.test import override_settings
+from requests import Response
+from requests.exceptions import ConnectionError
+
+from ecommerce.core.http_client import get_http_client
+from ecommerce.tests.factories import SiteConfigurationFactory
+from ecommerce.tests.testcases import TestCase
+
+URL = 'https://lms.example.com/api/'
+
+
+@override_settings(HTTP_CLIENT_MAX_RETRIES=2, HTTP_CLIENT_RETRY_BACKOFF=0)
+class HttpClientTests(TestCase):
+    def setUp(self):
+        super(HttpClientTests, self).setUp()
+        self.http_client = get_http_client(self.site.siteconfiguration)
+
+    def make_response(self, status_code):
+        response = Response()
+        response.status_code = status_code
+        response.raw = BytesIO()
+        return response
+
+    def test_get_http_client(self):
+        """ Verify every site has a client of its own, defaulting to the current request's site. """
+        self.assertIs(get_http_client(), self.http_client)
+        self.assertIs(get_http_client(self.site.siteconfiguration), self.http_client)
+        self.assertIsNot(get_http_client(SiteConfigurationFactory()), self.http_client)
+
+        with mock.patch('ecommerce.core.http_client.get_current_request', mock.Mock(return_value=None)):
+            self.assertIsNot(get_http_client(), self.http_client)
+
+    def test_sessions_share_connection_pools(self):
+        """ Verify sessions, and API clients, have their own authentication but share the client's adapter. """
+        first = self.http_client.api_client(URL, oauth_access_token='first')
+        second = self.http_client.api_client(URL, oauth_access_token='second')
+
+        # pylint: disable=protected-access
+        first_session, second_session = first._store['session'], second._store['session']
+        self.assertIsNot(first_session, second_session)
+        self.assertNotEqual(first_session.auth.token, second_session.auth.token)
+        self.assertIs(first_session.get_adapter(URL), self.http_client.adapter)
+        self.assertIs(second_session.get_adapter(URL), self.http_client.adapter)
+
+        with mock.patch.object(self.http_client.adapter, 'close') as mock_close:
+            first_session.close()
+        self.assertFalse(mock_close.called)
+
+    @mock.patch('requests.Session.request')
+    def test_idempotent_request_retried(self, mock_request):
+        """ Verify idempotent requests which fail to connect or are unavailable are retried. """
+        response = self.make_response(200)
+        mock_request.side_effect = [ConnectionError, self.make_response(503), response]
+
+        self.assertIs(self.http_client.get(URL), response)
+        self.assertEqual(mock_request.call_count, 3)
+
+    @mock.patch('requests.Session.request')
+    def test_idempotent_request_retries_exhausted(self, mock_request):
+        """ Verify the last failure is surfaced once retries are exhausted. """
+        mock_request.side_effect = ConnectionError
+        with self.assertRaises(ConnectionError):
+            self.http_client.put(URL)
+        self.assertEqual(mock_request.call_count, 3)
+
+        mock_request.reset_mock()
+        mock_request.side_effect = None
+        mock_request.return_value = self.make_response(503)
+        self.assertEqual(self.http_client.get(URL).status_code, 503)
+        self.assertEqual(mock_request.call_count, 3)
+
+    @mock.patch('requests.Session.request')
+    def test_max_retries(self, mock_request):
+        """ Verify the number of retries can be given per request. """
+        mock_request.side_effect = ConnectionError
+        with self.assertRaises(ConnectionError):
+            self.http_client.get(URL, max_retries=0)
+        self.assertEqual(mock_request.call_count, 1)
+
+    @mock.patch('requests.Session.request')
+    def test_non_idempotent_request_not_retried(self, mock_request):
+        """ Verify requests which are not idempotent are never retried. """
+        mock_request.side_effect = ConnectionError
+        with self.assertRaises(ConnectionError):
+            self.http_client.post(URL)
+        self.assertEqual(mock_request.call_count, 1)
+
+        mock_request.reset_mock()
+        mock_request.side_effect = None
+        mock_request.return_value = self.make_response(503)
+        self.assertEqual(self.http_client.post(URL).status_code, 503)
+        self.assertEqual(mock_request.call_count, 1)
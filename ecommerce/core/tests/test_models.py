@@ -123,6 +123,19 @@ class UserTests(CourseCatalogTestMixin, LmsApiMockMixin, TestCase):
         user, course_key = self.prepare_credit_eligibility_info(eligible=False)
         self.assertFalse(user.is_eligible_for_credit(course_key))
 
+    @httpretty.activate
+    def test_get_credit_eligibilities(self):
+        """ Verify the method returns eligibility information for every course key. """
+        user, course_key = self.prepare_credit_eligibility_info()
+        other_course_key = 'd/e/f'
+        self.mock_eligibility_api(self.request, user, other_course_key, eligible=False)
+
+        eligibilities = user.get_credit_eligibilities([course_key, other_course_key, course_key], self.site)
+        self.assertEqual(set(eligibilities.keys()), {course_key, other_course_key})
+        self.assertEqual(eligibilities[course_key][0]['course_key'], course_key)
+        self.assertFalse(eligibilities[other_course_key])
+        self.assertEqual(user.get_credit_eligibilities([], self.site), {})
+
     @httpretty.activate
     @ddt.data(
         (200, True),
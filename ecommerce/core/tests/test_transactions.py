@@ -0,0 +1,28 @@
+import mock
+from django.core.signals import request_finished
+
+from ecommerce.core.transactions import run_now_and_after_commit
+from ecommerce.tests.testcases import TestCase, TransactionTestCase
+
+
+class RunNowAndAfterCommitTests(TestCase):
+    def test_in_atomic_block(self):
+        """ Verify functions called inside a transaction are called again once the request is finished. """
+        func = mock.Mock(__name__='func')
+        run_now_and_after_commit(func, 1, key='value')
+        func.assert_called_once_with(1, key='value')
+
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(func.call_args_list, [mock.call(1, key='value')] * 2)
+
+        request_finished.send(sender=self.__class__)
+        self.assertEqual(func.call_count, 2)
+
+
+class RunNowAndAfterCommitAutocommitTests(TransactionTestCase):
+    def test_autocommit(self):
+        """ Verify functions called outside of a transaction are only called once. """
+        func = mock.Mock(__name__='func')
+        run_now_and_after_commit(func)
+        request_finished.send(sender=self.__class__)
+        func.assert_called_once_with()
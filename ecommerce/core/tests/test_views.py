@@ -13,6 +13,7 @@ from requests.exceptions import RequestException
 from rest_framework import status
 from testfixtures import LogCapture
 
+from ecommerce.core.circuit_breaker import CIRCUITS, CircuitBreaker
 from ecommerce.core.constants import Status, UnavailabilityMessage
 from ecommerce.tests.testcases import TestCase
 
@@ -20,7 +21,7 @@ LOGGER_NAME = 'ecommerce.core.views'
 User = get_user_model()
 
 
-@mock.patch('requests.get')
+@mock.patch('requests.Session.request')
 class HealthTests(TestCase):
     """Tests of the health endpoint."""
 
@@ -63,6 +64,8 @@ class HealthTests(TestCase):
                 Status.UNAVAILABLE
             )
             l.check((LOGGER_NAME, 'CRITICAL', UnavailabilityMessage.LMS))
+        # The heartbeat is not retried.
+        self.assertEqual(mock_lms_request.call_count, 1)
 
     def test_lms_connection_failure(self, mock_lms_request):
         """Test that the endpoint reports when it cannot contact the LMS."""
@@ -76,6 +79,7 @@ class HealthTests(TestCase):
                 Status.UNAVAILABLE
             )
             l.check((LOGGER_NAME, 'CRITICAL', UnavailabilityMessage.LMS))
+        self.assertEqual(mock_lms_request.call_count, 1)
 
     def _assert_health(self, status_code, overall_status, database_status, lms_status):
         """Verify that the response matches expectations."""
@@ -88,7 +92,8 @@ class HealthTests(TestCase):
             'detailed_status': {
                 'database_status': database_status,
                 'lms_status': lms_status
-            }
+            },
+            'circuit_breakers': {circuit: CircuitBreaker.CLOSED for circuit in CIRCUITS},
         }
         self.assertDictEqual(json.loads(response.content), expected_data)
 
@@ -0,0 +1,47 @@
+""" Callbacks run again once the current transaction is over.
+
+Django 1.8 has no transaction.on_commit. Callbacks registered inside an atomic block, such as the one
+ATOMIC_REQUESTS wraps every view in, are queued for the thread and run again once the request, or Celery task,
+is finished, by which time its transaction has been committed or rolled back.
+"""
+import logging
+import threading
+
+from celery.signals import task_postrun
+from django.core.signals import request_finished
+from django.db import transaction
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+_pending = threading.local()
+
+
+def run_now_and_after_commit(func, *args, **kwargs):
+    """
+    Calls the given function now, and again once the current transaction, if any, is over.
+
+    This suits cache invalidation: the first call keeps the process making a change from reading stale entries,
+    and the second discards entries which other processes rebuilt, in the meantime, from data which was not
+    committed yet.
+    """
+    func(*args, **kwargs)
+    if transaction.get_connection().in_atomic_block:
+        callbacks = getattr(_pending, 'callbacks', None)
+        if callbacks is None:
+            callbacks = _pending.callbacks = []
+        callbacks.append((func, args, kwargs))
+
+
+@receiver(request_finished, dispatch_uid='core.run_pending_callbacks')
+def run_pending_callbacks(**kwargs):  # pylint: disable=unused-argument
+    callbacks = getattr(_pending, 'callbacks', None)
+    _pending.callbacks = None
+    for func, func_args, func_kwargs in callbacks or []:
+        try:
+            func(*func_args, **func_kwargs)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to run [%s] after the transaction was over.', func.__name__)
+
+
+task_postrun.connect(run_pending_callbacks, dispatch_uid='core.run_pending_task_callbacks')
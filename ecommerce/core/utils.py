@@ -18,3 +18,32 @@ def log_message_and_raise_validation_error(message):
     """
     logger.error(message)
     raise ValidationError(message)
+
+
+def get_changed_m2m_ids(sender, instance, action, reverse, model, pk_set):
+    """
+    Returns the IDs of the forward side objects affected by an m2m_changed signal.
+
+    Relations cleared from the reverse side do not report what they held, so they are read before clearing.
+
+    Args:
+        sender (Model): Intermediate model of the relation.
+        instance (Model): Object whose relation changed.
+        action (str): Type of the change.
+        reverse (bool): Whether the relation changed from its reverse side.
+        model (Model): Class of the objects added to, removed from or cleared from the relation.
+        pk_set (set): IDs of the objects added or removed.
+
+    Returns:
+        list: IDs of the affected objects, or None if the relation has not changed yet.
+    """
+    if not reverse:
+        return [instance.id] if action in ('post_add', 'post_remove', 'post_clear') else None
+    if action in ('post_add', 'post_remove'):
+        return list(pk_set or [])
+    if action == 'pre_clear':
+        filter_kwargs = {instance._meta.model_name: instance}
+        return list(sender.objects.filter(**filter_kwargs).values_list(
+            '{}_id'.format(model._meta.model_name), flat=True
+        ))
+    return None
@@ -14,6 +14,7 @@ from django.utils.decorators import method_decorator
 from django.views.generic import View
 
 from ecommerce.core.constants import Status, UnavailabilityMessage
+from ecommerce.core.http_client import get_http_client
 from ecommerce.core.url_utils import get_lms_heartbeat_url
 
 logger = logging.getLogger(__name__)
@@ -25,7 +26,8 @@ def health(_):
     """Allows a load balancer to verify that the ecommerce front-end service is up.
 
     Checks the status of the database connection and the LMS, the two services
-    on which the ecommerce front-end currently depends.
+    on which the ecommerce front-end currently depends, and reports the state of
+    the circuit breakers guarding LMS endpoints.
 
     Returns:
         HttpResponse: 200 if the ecommerce front-end is available, with JSON data
@@ -38,7 +40,8 @@ def health(_):
         >>> response.status_code
         200
         >>> response.content
-        '{"overall_status": "OK", "detailed_status": {"database_status": "OK", "lms_status": "OK"}}'
+        '{"overall_status": "OK", "detailed_status": {"database_status": "OK", "lms_status": "OK"},
+          "circuit_breakers": {"lms_enrollment_api": "closed", ...}}'
     """
     overall_status = database_status = lms_status = Status.UNAVAILABLE
 
@@ -52,7 +55,8 @@ def health(_):
         database_status = Status.UNAVAILABLE
 
     try:
-        response = requests.get(get_lms_heartbeat_url(), timeout=1)
+        # Load balancers call this often and time out quickly, so a failed heartbeat is reported at once.
+        response = get_http_client().get(get_lms_heartbeat_url(), timeout=1, max_retries=0)
 
         if response.status_code == 200:
             lms_status = Status.OK
@@ -71,6 +75,7 @@ def health(_):
             'database_status': database_status,
             'lms_status': lms_status,
         },
+        'circuit_breakers': get_http_client().get_circuit_states(),
     }
 
     if overall_status == Status.OK:
@@ -4,7 +4,7 @@ from django.contrib.auth.views import redirect_to_login
 from oscar.core.loading import get_model
 
 from ecommerce.extensions.api import exceptions
-from ecommerce.extensions.voucher.utils import get_cached_voucher
+from ecommerce.extensions.voucher.utils import get_voucher_redemption_bundle
 
 Voucher = get_model('voucher', 'Voucher')
 
@@ -17,8 +17,8 @@ def login_required_for_credit(function):
     def decorator(request, *args, **kwargs):
         code = request.GET.get('code', None)
         try:
-            voucher = get_cached_voucher(code)
-            if voucher.offers.first().condition.range.course_seat_types == 'credit':
+            offer = get_voucher_redemption_bundle(code)['offer']
+            if offer.condition.range.course_seat_types == 'credit':
                 if not request.user.is_authenticated():
                     # The next url needs to have the coupon code as a query parameter.
                     next_url = '{}?{}'.format(request.path, request.META.get('QUERY_STRING'))
@@ -21,6 +21,7 @@ from ecommerce.coupons.decorators import login_required_for_credit
 from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.basket.utils import prepare_basket
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.partner.cache import get_product_by_sku
 from ecommerce.extensions.voucher.utils import get_voucher_and_products_from_code
 
 Applicator = get_class('offer.utils', 'Applicator')
@@ -31,7 +32,6 @@ OrderLineVouchers = get_model('voucher', 'OrderLineVouchers')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
 Selector = get_class('partner.strategy', 'Selector')
-StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
 
@@ -138,8 +138,8 @@ class CouponRedeemView(EdxOrderPlacementMixin, View):
             return render(request, template_name, {'error': _(msg)})
 
         try:
-            product = StockRecord.objects.get(partner_sku=sku).product
-        except StockRecord.DoesNotExist:
+            product = get_product_by_sku(sku)
+        except Product.DoesNotExist:
             return render(request, template_name, {'error': _('The product does not exist.')})
 
         valid_voucher, msg = voucher_is_valid(voucher, [product], request)
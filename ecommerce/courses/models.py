@@ -2,6 +2,7 @@ from __future__ import unicode_literals
 import logging
 
 from django.conf import settings
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models import Q, Count
 from django.utils.translation import ugettext_lazy as _
@@ -14,6 +15,7 @@ from ecommerce.core.constants import (
     ENROLLMENT_CODE_SEAT_TYPES,
     ENROLLMENT_CODE_SWITCH
 )
+from ecommerce.core.transactions import run_now_and_after_commit
 from ecommerce.courses.publishers import LMSPublisher
 from ecommerce.extensions.catalogue.utils import generate_sku
 
@@ -87,7 +89,7 @@ class Course(models.Model):
     @property
     def type(self):
         """ Returns the type of the course (based on the available seat types). """
-        seat_types = [getattr(seat.attr, 'certificate_type', '').lower() for seat in self.seat_products]
+        seat_types = [getattr(seat.seat_attr, 'certificate_type', '').lower() for seat in self.seat_products]
         if 'credit' in seat_types:
             return 'credit'
         elif 'professional' in seat_types or 'no-id-professional' in seat_types:
@@ -260,6 +262,82 @@ class Course(models.Model):
 
         return seat
 
+    @classmethod
+    def _get_switch_sku_map_cache_key(cls, course_id):
+        return 'course_switch_sku_map_{}'.format(course_id)
+
+    @classmethod
+    def _build_switch_sku_map(cls, course_id):
+        """ Builds the mapping between the SKUs of the course's seats and of its enrollment codes.
+
+        Every seat is mapped to the enrollment code of the same partner and seat type. An enrollment code is
+        mapped to the seat of its type whose ID verification requirement matches its own, or to the first
+        such seat created if none does.
+        """
+        seats = {}
+        enrollment_codes = {}
+        stock_records = StockRecord.objects.filter(product__course_id=course_id).select_related(
+            'product__product_class'
+        ).order_by('id')
+        for stock_record in stock_records:
+            product = stock_record.product
+            id_verification_required = getattr(product.seat_attr, 'id_verification_required', None)
+            if product.structure == Product.CHILD:
+                seat_type = getattr(product.seat_attr, 'certificate_type', None)
+                seats.setdefault((stock_record.partner_id, seat_type), []).append(
+                    (id_verification_required, stock_record.partner_sku)
+                )
+            elif product.get_product_class().name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
+                seat_type = getattr(product.seat_attr, 'seat_type', None)
+                enrollment_codes[(stock_record.partner_id, seat_type)] = (
+                    id_verification_required, stock_record.partner_sku
+                )
+
+        switch_sku_map = {}
+        for key, (id_verification_required, enrollment_code_sku) in enrollment_codes.items():
+            seats_of_type = seats.get(key)
+            if not key[1] or not seats_of_type:
+                continue
+
+            for __, seat_sku in seats_of_type:
+                switch_sku_map[seat_sku] = enrollment_code_sku
+            matching_seat_skus = [
+                seat_sku for seat_id_verification_required, seat_sku in seats_of_type
+                if seat_id_verification_required == id_verification_required
+            ]
+            switch_sku_map[enrollment_code_sku] = (matching_seat_skus or [seats_of_type[0][1]])[0]
+        return switch_sku_map
+
+    @classmethod
+    def invalidate_switch_sku_map(cls, course_id):
+        """
+        Removes the mapping between the SKUs of a course's seats and of its enrollment codes from cache, now and
+        once the current transaction is over, so that it is rebuilt from the committed seats.
+
+        Arguments:
+            course_id (str): ID of the course.
+        """
+        run_now_and_after_commit(cache.delete, cls._get_switch_sku_map_cache_key(course_id))
+
+    @classmethod
+    def get_switch_sku_map(cls, course_id):
+        """
+        Returns the cached mapping between the SKUs of a course's seats and of the corresponding
+        enrollment codes, in both directions. The mapping is rebuilt if it is missing from cache.
+
+        Arguments:
+            course_id (str): ID of the course.
+
+        Returns:
+            dict: Mapping of seat SKUs to enrollment code SKUs, and vice versa.
+        """
+        cache_key = cls._get_switch_sku_map_cache_key(course_id)
+        switch_sku_map = cache.get(cache_key)
+        if switch_sku_map is None:
+            switch_sku_map = cls._build_switch_sku_map(course_id)
+            cache.set(cache_key, switch_sku_map, settings.COURSE_SWITCH_SKU_MAP_CACHE_TIMEOUT)
+        return switch_sku_map
+
     @property
     def enrollment_code_product(self):
         """ Returns an enrollment code Product related to this course. """
@@ -4,12 +4,12 @@ import logging
 
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
-from edx_rest_api_client.client import EdxRestApiClient
 from edx_rest_api_client.exceptions import SlumberHttpBaseException
 from oscar.core.loading import get_model
-import requests
 
+from ecommerce.core.circuit_breaker import LMS_COMMERCE_API, LMS_CREDIT_API
 from ecommerce.core.constants import ENROLLMENT_CODE_SEAT_TYPES
+from ecommerce.core.http_client import get_http_client
 from ecommerce.core.url_utils import get_lms_url, get_lms_commerce_api_url
 from ecommerce.courses.utils import mode_for_seat
 
@@ -52,8 +52,9 @@ class LMSPublisher(object):
     def _publish_creditcourse(self, course_id, access_token):
         """Creates or updates a CreditCourse object on the LMS."""
 
-        api = EdxRestApiClient(
+        api = get_http_client().api_client(
             get_lms_url('api/credit/v1/'),
+            circuit=LMS_CREDIT_API,
             oauth_access_token=access_token,
             timeout=self.timeout
         )
@@ -130,7 +131,9 @@ class LMSPublisher(object):
         }
 
         try:
-            response = requests.put(url, data=json.dumps(data), headers=headers, timeout=self.timeout)
+            response = get_http_client().put(
+                url, data=json.dumps(data), headers=headers, timeout=self.timeout, circuit=LMS_COMMERCE_API
+            )
             status_code = response.status_code
             if status_code in (200, 201):
                 logger.info(u'Successfully published commerce data for [%s].', course_id)
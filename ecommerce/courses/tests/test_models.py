@@ -1,5 +1,6 @@
 import ddt
 from django.conf import settings
+from django.core.cache import cache
 import mock
 from oscar.core.loading import get_model
 from oscar.test.factories import create_order
@@ -157,6 +158,68 @@ class CourseTests(CourseCatalogTestMixin, TestCase):
         self.assertEqual(stock_record.price_currency, settings.OSCAR_DEFAULT_CURRENCY)
         self.assertEqual(stock_record.partner, self.partner)
 
+    def test_switch_sku_map(self):
+        """ Verify the seat and enrollment code SKUs are mapped to one another when seats are created. """
+        course = CourseFactory()
+        toggle_switch(ENROLLMENT_CODE_SWITCH, True)
+        course.create_or_update_seat('audit', False, 0, self.partner)
+        seat = course.create_or_update_seat('verified', True, 5, self.partner, create_enrollment_code=True)
+        seat_sku = StockRecord.objects.get(product=seat).partner_sku
+        enrollment_code_sku = StockRecord.objects.get(product=course.enrollment_code_product).partner_sku
+        expected = {seat_sku: enrollment_code_sku, enrollment_code_sku: seat_sku}
+
+        self.assertEqual(Course.get_switch_sku_map(course.id), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(Course.get_switch_sku_map(course.id), expected)
+
+        # The mapping is rebuilt if it has been evicted from cache.
+        cache.clear()
+        self.assertEqual(Course.get_switch_sku_map(course.id), expected)
+        with self.assertNumQueries(0):
+            self.assertEqual(Course.get_switch_sku_map(course.id), expected)
+
+    def test_switch_sku_map_invalidation(self):
+        """ Verify changes to the stock records, products and attributes of seats are reflected by the mapping. """
+        course = CourseFactory()
+        toggle_switch(ENROLLMENT_CODE_SWITCH, True)
+        seat = course.create_or_update_seat('verified', True, 5, self.partner, create_enrollment_code=True)
+        stock_record = StockRecord.objects.get(product=seat)
+        enrollment_code_sku = StockRecord.objects.get(product=course.enrollment_code_product).partner_sku
+        self.assertEqual(Course.get_switch_sku_map(course.id)[enrollment_code_sku], stock_record.partner_sku)
+
+        stock_record.partner_sku = 'renamed-sku'
+        stock_record.save()
+        self.assertEqual(Course.get_switch_sku_map(course.id)[enrollment_code_sku], 'renamed-sku')
+
+        seat.attr.certificate_type = 'professional'
+        seat.attr.save()
+        self.assertEqual(Course.get_switch_sku_map(course.id), {})
+
+        seat.attr.certificate_type = 'verified'
+        seat.attr.save()
+        self.assertEqual(Course.get_switch_sku_map(course.id)[enrollment_code_sku], 'renamed-sku')
+        seat.delete()
+        self.assertEqual(Course.get_switch_sku_map(course.id), {})
+
+    def test_switch_sku_map_several_seats(self):
+        """ Verify every seat of a type is mapped to the enrollment code, which is mapped to the seat with the same
+        ID verification requirement. """
+        course = CourseFactory()
+        toggle_switch(ENROLLMENT_CODE_SWITCH, True)
+        id_verified_seat = course.create_or_update_seat('professional', True, 5, self.partner)
+        seat = course.create_or_update_seat(
+            'professional', False, 5, self.partner, remove_stale_modes=False, create_enrollment_code=True
+        )
+        id_verified_seat_sku = StockRecord.objects.get(product=id_verified_seat).partner_sku
+        seat_sku = StockRecord.objects.get(product=seat).partner_sku
+        enrollment_code_sku = StockRecord.objects.get(product=course.enrollment_code_product).partner_sku
+
+        self.assertEqual(Course.get_switch_sku_map(course.id), {
+            id_verified_seat_sku: enrollment_code_sku,
+            seat_sku: enrollment_code_sku,
+            enrollment_code_sku: seat_sku,
+        })
+
     def test_create_credit_seats(self):
         """Verify that the model's seat creation method allows the creation of multiple credit seats."""
         course = Course.objects.create(id='a/b/c', name='Test Course')
@@ -71,7 +71,7 @@ class LMSPublisherTests(CourseCatalogTestMixin, TestCase):
     def test_api_exception(self):
         """ If an exception is raised when communicating with the Commerce API, an ERROR message should be logged. """
         error = 'time out error'
-        with mock.patch('requests.put', side_effect=Timeout(error)):
+        with mock.patch('requests.Session.request', side_effect=Timeout(error)):
             with LogCapture(LOGGER_NAME) as l:
                 response = self.publisher.publish(self.course)
                 l.check(
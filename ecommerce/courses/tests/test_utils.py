@@ -1,6 +1,9 @@
 import hashlib
 
+import json
+
 import ddt
+from django.conf import settings
 from django.core.cache import cache
 import httpretty
 
@@ -12,7 +15,8 @@ from ecommerce.courses.models import Course
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.courses.tests.mixins import CourseCatalogServiceMockMixin
 from ecommerce.courses.utils import (
-    get_certificate_type_display_value, get_course_info_from_catalog, mode_for_seat, get_course_catalogs
+    get_certificate_type_display_value, get_course_info_from_catalog, get_course_runs_info_from_catalog,
+    mode_for_seat, get_course_catalogs
 )
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.tests.testcases import TestCase
@@ -60,6 +64,37 @@ class UtilsTests(CourseCatalogTestMixin, CourseCatalogMockMixin, TestCase):
         cached_course = cache.get(cache_key)
         self.assertEqual(cached_course, response)
 
+    @mock_course_catalog_api_client
+    def test_get_course_runs_info_from_catalog(self):
+        """ Verify the course runs missing from cache are retrieved with a single request, and cached. """
+        courses = [CourseFactory() for __ in range(3)]
+        self.mock_dynamic_catalog_single_course_runs_api(courses[0])
+        get_course_info_from_catalog(self.request.site, courses[0].id)
+
+        httpretty.register_uri(
+            httpretty.GET, '{}course_runs/'.format(settings.COURSE_CATALOG_API_URL),
+            body=json.dumps({
+                'count': 2,
+                'next': None,
+                'results': [{'key': course.id, 'title': course.name} for course in courses[1:]],
+            }),
+            content_type='application/json'
+        )
+        response = get_course_runs_info_from_catalog(self.request.site, [course.id for course in courses])
+
+        self.assertEqual({key: course_run['title'] for key, course_run in response.items()},
+                         {course.id: course.name for course in courses})
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+        self.assertEqual(
+            httpretty.last_request().querystring['keys'],
+            [','.join(sorted(course.id for course in courses[1:]))]
+        )
+
+        # All course runs are now answered from cache.
+        self.assertEqual(get_course_runs_info_from_catalog(self.request.site, [course.id for course in courses]),
+                         response)
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 2)
+
     @ddt.data(
         ('honor', 'Honor'),
         ('verified', 'Verified'),
@@ -13,25 +13,69 @@ def mode_for_seat(product):
     bulk purchase "enrollment code" product variant of the single-seat product, so we attempt
     to locate the 'seat_type' attribute in its place.
     """
-    mode = getattr(product.attr, 'certificate_type', getattr(product.attr, 'seat_type', None))
+    mode = getattr(product.seat_attr, 'certificate_type', getattr(product.seat_attr, 'seat_type', None))
     if not mode:
         return 'audit'
-    if mode == 'professional' and not getattr(product.attr, 'id_verification_required', False):
+    if mode == 'professional' and not getattr(product.seat_attr, 'id_verification_required', False):
         return 'no-id-professional'
     return mode
 
 
+def _get_course_info_cache_key(course_key, partner_short_code):
+    cache_key = 'courses_api_detail_{}{}'.format(course_key, partner_short_code)
+    return hashlib.md5(cache_key).hexdigest()
+
+
 def get_course_info_from_catalog(site, course_key):
     """ Get course information from catalog service and cache """
-    api = site.siteconfiguration.course_catalog_api_client
+    return get_course_runs_info_from_catalog(site, [course_key]).get(unicode(course_key))
+
+
+def get_course_runs_info_from_catalog(site, course_keys):
+    """
+    Get information about several course runs from catalog service and cache it.
+
+    All course runs are looked up in the cache at once; the ones missing from it
+    are retrieved with a single request to the Course Catalog Service.
+
+    Arguments:
+        site (Site): Site whose catalog client is used.
+        course_keys (iterable): Keys (str or CourseKey) of the course runs.
+
+    Returns:
+        dict: Mapping of course run keys, as unicode, to course run information. Course runs
+            unknown to the Course Catalog Service are omitted.
+    """
+    course_keys = set(unicode(course_key) for course_key in course_keys)
     partner_short_code = site.siteconfiguration.partner.short_code
-    cache_key = 'courses_api_detail_{}{}'.format(course_key, partner_short_code)
-    cache_key = hashlib.md5(cache_key).hexdigest()
-    course_run = cache.get(cache_key)
-    if not course_run:  # pragma: no cover
-        course_run = api.course_runs(course_key).get(partner=partner_short_code)
-        cache.set(cache_key, course_run, settings.COURSES_API_CACHE_TIMEOUT)
-    return course_run
+    cache_keys = {
+        _get_course_info_cache_key(course_key, partner_short_code): course_key for course_key in course_keys
+    }
+    course_runs = {
+        cache_keys[cache_key]: course_run
+        for cache_key, course_run in cache.get_many(cache_keys.keys()).items() if course_run
+    }
+
+    missing = sorted(course_keys - set(course_runs))
+    if missing:
+        api = site.siteconfiguration.course_catalog_api_client
+        if len(missing) == 1:
+            fetched = {missing[0]: api.course_runs(missing[0]).get(partner=partner_short_code)}
+        else:
+            endpoint = api.course_runs
+            response = endpoint.get(keys=','.join(missing), partner=partner_short_code, page_size=len(missing))
+            fetched = {
+                course_run['key']: course_run for course_run in traverse_pagination(response, endpoint)
+                if course_run.get('key') in course_keys
+            }
+
+        cache.set_many({
+            _get_course_info_cache_key(course_key, partner_short_code): course_run
+            for course_key, course_run in fetched.items()
+        }, settings.COURSES_API_CACHE_TIMEOUT)
+        course_runs.update(fetched)
+
+    return course_runs
 
 
 def get_course_catalogs(site, resource_id=None):
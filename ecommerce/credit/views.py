@@ -51,7 +51,7 @@ class Checkout(TemplateView):
         credit_seats = []
 
         for seat in course.seat_products:
-            if getattr(seat.attr, 'certificate_type', None) != self.CREDIT_MODE:
+            if getattr(seat.seat_attr, 'certificate_type', None) != self.CREDIT_MODE:
                 continue
 
             purchase_info = strategy.fetch_for_product(seat)
@@ -157,7 +157,7 @@ class Checkout(TemplateView):
                 else:
                     new_price = stockrecord.price_excl_tax - discount_value
                 new_price = '{0:.2f}'.format(new_price)
-            providers_dict[seat.attr.credit_provider].update({
+            providers_dict[seat.seat_attr.credit_provider].update({
                 'price': stockrecord.price_excl_tax,
                 'sku': stockrecord.partner_sku,
                 'credit_hours': seat.attr.credit_hours,
@@ -177,7 +177,9 @@ class Checkout(TemplateView):
             Response from LMS as json, containing list of providers.
         """
 
-        provider_ids = ",".join([seat.attr.credit_provider for seat in credit_seats if seat.attr.credit_provider])
+        provider_ids = ",".join(
+            [seat.seat_attr.credit_provider for seat in credit_seats if seat.seat_attr.credit_provider]
+        )
 
         try:
             return self.credit_api_client.providers.get(provider_ids=provider_ids)
@@ -1,26 +1,63 @@
 """Functions used for data retrieval and manipulation by the API."""
 import logging
 
+from django.db.models import Q
 from oscar.core.loading import get_model, get_class
 
-from ecommerce.extensions.api import exceptions
+from ecommerce.extensions.partner.cache import get_stock_records_data
 
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
 Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
 
 
 logger = logging.getLogger(__name__)
 
 
-def get_product(sku):
-    """Retrieve the product corresponding to the provided SKU."""
-    try:
-        return Product.objects.get(stockrecords__partner_sku=sku)
-    except Product.DoesNotExist:
-        raise exceptions.ProductNotFoundError(
-            exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku)
-        )
+def get_products(skus, partner=None):
+    """Retrieve the products corresponding to the provided SKUs, in a fixed number of queries.
+
+    SKUs are resolved to product IDs from the SKU cache where possible. Products are returned with
+    their stock records, and the product classes their availability depends on, already loaded.
+
+    Arguments:
+        skus (list): SKUs of the products.
+        partner (Partner): If provided, only this partner's stock records are considered.
+
+    Returns:
+        dict: Mapping of the provided SKUs to products. SKUs without a product are omitted.
+    """
+    skus = set(skus)
+    stock_records_data = get_stock_records_data(skus)
+    product_ids = {
+        sku: data['product_id'] for sku, data in stock_records_data.items()
+        if partner is None or data['partner_id'] == partner.id
+    }
+
+    # SKUs which are not cached, because no stock record or several partners' stock records have them, are
+    # resolved by their stock records.
+    unresolved_skus = skus.difference(stock_records_data)
+    products_filter = Q(id__in=product_ids.values())
+    if unresolved_skus:
+        stock_records = StockRecord.objects.filter(partner_sku__in=unresolved_skus)
+        if partner:
+            stock_records = stock_records.filter(partner=partner)
+        products_filter |= Q(stockrecords__in=stock_records)
+
+    products_by_sku = {}
+    products = Product.objects.filter(products_filter).distinct().select_related(
+        'product_class', 'parent__product_class'
+    ).prefetch_related('stockrecords')
+    for product in products:
+        for stock_record in product.stockrecords.all():
+            sku = stock_record.partner_sku
+            if product_ids.get(sku) == product.id or (
+                    sku in unresolved_skus and (partner is None or stock_record.partner_id == partner.id)
+            ):
+                products_by_sku[sku] = product
+
+    return products_by_sku
 
 
 def get_order_metadata(basket):
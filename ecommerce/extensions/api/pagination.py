@@ -1,4 +1,18 @@
+import base64
+import json
+import operator
+from collections import OrderedDict, namedtuple
+from functools import reduce
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
 from rest_framework import pagination
+from rest_framework.exceptions import NotFound
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+Cursor = namedtuple('Cursor', ['values', 'reverse'])
 
 
 class PageNumberPagination(pagination.PageNumberPagination):
@@ -7,3 +21,136 @@ class PageNumberPagination(pagination.PageNumberPagination):
     # NOTE (CCB): This is a hack, necessary until the frontend
     # can properly follow our paginated lists.
     max_page_size = 10000
+
+
+class KeysetPagination(pagination.BasePagination):
+    """ Paginates querysets by keyset, following the ordering fields.
+
+    Instead of counting and skipping rows, every page is fetched with a filter on the values of the ordering
+    fields of the first or last item of the neighbouring page, which the cursor encodes. Pages are fetched at
+    the same cost however deep they are, and no COUNT query is made.
+
+    The ordering fields must be concrete fields, the last of which is unique, such as the primary key.
+    """
+    ordering = ('-id',)
+    cursor_query_param = 'cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = [queryset.model._meta.get_field(field.lstrip('-')) for field in self.ordering]
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor.reverse
+
+        ordering = [self._reverse(field) for field in self.ordering] if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, cursor.values))
+
+        # Fetching one more item than fits in the page tells whether there is another page after it.
+        self.page = list(queryset[:self.page_size + 1])
+        has_more = len(self.page) > self.page_size
+        del self.page[self.page_size:]
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_next_link(self):
+        if not (self.has_next and self.page):
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not (self.has_previous and self.page):
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_keyset_filter(self, ordering, values):
+        """ Returns the filter selecting the items following, in the given ordering, those with the given values. """
+        names = [field.lstrip('-') for field in ordering]
+        conditions = []
+        for index, field in enumerate(ordering):
+            condition = dict(zip(names[:index], values[:index]))
+            condition['{}__{}'.format(names[index], 'lt' if field.startswith('-') else 'gt')] = values[index]
+            conditions.append(Q(**condition))
+        return reduce(operator.or_, conditions)
+
+    def encode_cursor(self, item, reverse):
+        values = []
+        for field in self.fields:
+            value = getattr(item, field.attname)
+            # Unlike the JSON encoder, isoformat() keeps the microseconds the keyset filter compares.
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+
+        cursor = base64.urlsafe_b64encode(json.dumps({'values': values, 'reverse': reverse}))
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        """ Returns the Cursor given with the request, if any.
+
+        Raises:
+            NotFound: If the cursor cannot be decoded.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            values = [field.to_python(value) for field, value in zip(self.fields, cursor['values'])]
+            if len(values) != len(self.fields) or None in values:
+                raise ValueError
+            return Cursor(values, bool(cursor['reverse']))
+        except (KeyError, TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _reverse(self, field):
+        return field[1:] if field.startswith('-') else '-' + field
+
+
+class OrderPagination(KeysetPagination):
+    """ Paginates orders from the most recently placed.
+
+    Requests for a page number are paginated by PageNumberPagination, as they were before keyset pagination was
+    introduced, so that clients following page numbers keep getting the count of orders.
+    """
+    ordering = ('-date_placed', '-id')
+    max_page_size = PageNumberPagination.max_page_size
+    page_number_pagination = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if PageNumberPagination.page_query_param in request.query_params:
+            self.page_number_pagination = PageNumberPagination()
+            return self.page_number_pagination.paginate_queryset(queryset.order_by(*self.ordering), request, view)
+
+        return super(OrderPagination, self).paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.page_number_pagination is not None:
+            return self.page_number_pagination.get_paginated_response(data)
+
+        return super(OrderPagination, self).get_paginated_response(data)
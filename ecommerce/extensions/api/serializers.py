@@ -6,6 +6,7 @@ import logging
 
 from dateutil.parser import parse
 from django.db import transaction
+from django.db.models import Count, Min
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth import get_user_model
@@ -27,6 +28,9 @@ Benefit = get_model('offer', 'Benefit')
 BillingAddress = get_model('order', 'BillingAddress')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponReport = get_model('voucher', 'CouponReport')
+CouponVouchers = get_model('voucher', 'CouponVouchers')
 Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -43,49 +47,131 @@ COURSE_DETAIL_VIEW = 'api:v2:course-detail'
 PRODUCT_DETAIL_VIEW = 'api:v2:product-detail'
 
 
-def is_custom_code(obj):
-    """Helper method to check if the voucher contains custom code. """
-    return not is_enrollment_code(obj) and retrieve_quantity(obj) == 1
+class CouponLoader(object):
+    """
+    Resolves the data serialized for coupons with a fixed number of queries for any number of coupons.
+
+    Each coupon is described by its first voucher, as are the coupon serializers: the voucher's
+    offer, benefit and range, the number of vouchers, and the coupon's category, invoice, note
+    and latest history record.
+    """
+
+    def __init__(self, coupons):
+        coupon_ids = [coupon.id for coupon in coupons]
+        self._data = {coupon_id: {} for coupon_id in coupon_ids}
+
+        coupon_vouchers = CouponVouchers.objects.filter(coupon_id__in=coupon_ids).annotate(
+            num_vouchers=Count('vouchers'), first_voucher_id=Min('vouchers')
+        )
+        first_voucher_ids = {}
+        for item in coupon_vouchers:
+            self._data[item.coupon_id]['quantity'] = item.num_vouchers
+            first_voucher_ids[item.first_voucher_id] = item.coupon_id
+
+        voucher_offers = Voucher.offers.through.objects.filter(voucher_id__in=first_voucher_ids).select_related(
+            'voucher', 'conditionaloffer__benefit__range', 'conditionaloffer__condition__range__catalog'
+        ).order_by(*self._get_related_ordering(ConditionalOffer, 'conditionaloffer'))
+        for voucher_offer in voucher_offers:
+            data = self._data[first_voucher_ids[voucher_offer.voucher_id]]
+            if 'offer' not in data:
+                data['voucher'] = voucher_offer.voucher
+                data['offer'] = voucher_offer.conditionaloffer
+
+        product_categories = ProductCategory.objects.filter(product_id__in=coupon_ids).select_related(
+            'category'
+        ).order_by(*(ProductCategory._meta.ordering or ['pk']))
+        for product_category in product_categories:
+            self._data[product_category.product_id].setdefault('category', product_category.category)
+
+        invoice_ids = dict(
+            Line.objects.filter(product_id__in=coupon_ids, order__invoice__isnull=False).values_list(
+                'product_id', 'order__invoice'
+            )
+        )
+        invoices = Invoice.objects.select_related('business_client').in_bulk(invoice_ids.values())
+        for coupon_id, invoice_id in invoice_ids.items():
+            self._data[coupon_id]['invoice'] = invoices[invoice_id]
+
+        notes = ProductAttributeValue.objects.filter(product_id__in=coupon_ids, attribute__code='note')
+        for coupon_id, note in notes.values_list('product_id', 'value_text'):
+            self._data[coupon_id]['note'] = note
 
+        history = Product.history.filter(id__in=coupon_ids).select_related('history_user').order_by(
+            '-history_date'
+        )
+        for record in history:
+            self._data[record.id].setdefault('history', record)
 
-def is_enrollment_code(obj):
-    benefit = retrieve_voucher(obj).benefit
-    return benefit.type == Benefit.PERCENTAGE and benefit.value == 100
+    @staticmethod
+    def _get_related_ordering(model, field_name):
+        """ Returns a model's default ordering, expressed from a model relating to it through field_name. """
+        return [
+            '{}{}__{}'.format('-' if field.startswith('-') else '', field_name, field.lstrip('-'))
+            for field in model._meta.ordering or ['pk']
+        ]
 
+    def __contains__(self, coupon):
+        return coupon.id in self._data
 
-def retrieve_benefit(obj):
-    """Helper method to retrieve the benefit from voucher. """
-    return retrieve_voucher(obj).benefit
+    def get(self, coupon, key):
+        return self._data[coupon.id].get(key)
 
 
-def retrieve_end_date(obj):
-    """Helper method to retrieve the voucher end datetime. """
-    return retrieve_voucher(obj).end_datetime
+class CouponLoaderMixin(object):
+    """
+    Serializer mixin giving access to the CouponLoader of the coupons being serialized.
 
+    A single loader is built for all coupons of the root serializer and shared through the context.
+    """
 
-def retrieve_offer(obj):
-    """Helper method to retrieve the offer from coupon. """
-    return retrieve_voucher(obj).offers.first()
+    def get_coupon_loader(self, coupon):
+        loader = self.context.get('coupon_loader')
+        if loader is None or coupon not in loader:
+            if isinstance(self.root, serializers.ListSerializer):
+                loader = CouponLoader(self.root.instance)
+            else:
+                loader = CouponLoader([coupon])
+            self.context['coupon_loader'] = loader
+        return loader
 
+    def retrieve_voucher(self, obj):
+        """ Retrieve the first voucher of the coupon. """
+        return self.get_coupon_loader(obj).get(obj, 'voucher')
 
-def retrieve_quantity(obj):
-    """Helper method to retrieve number of vouchers. """
-    return obj.attr.coupon_vouchers.vouchers.count()
+    def retrieve_offer(self, obj):
+        """ Retrieve the offer of the coupon's first voucher. """
+        return self.get_coupon_loader(obj).get(obj, 'offer')
 
+    def retrieve_benefit(self, obj):
+        """ Retrieve the benefit of the coupon's first voucher. """
+        return self.retrieve_offer(obj).benefit
 
-def retrieve_start_date(obj):
-    """Helper method to retrieve the voucher start datetime. """
-    return retrieve_voucher(obj).start_datetime
+    def retrieve_quantity(self, obj):
+        """ Retrieve the number of vouchers of the coupon. """
+        return self.get_coupon_loader(obj).get(obj, 'quantity')
 
+    def retrieve_category(self, obj):
+        return self.get_coupon_loader(obj).get(obj, 'category')
 
-def retrieve_voucher(obj):
-    """Helper method to retrieve the first voucher from coupon. """
-    return obj.attr.coupon_vouchers.vouchers.first()
+    def retrieve_invoice(self, obj):
+        return self.get_coupon_loader(obj).get(obj, 'invoice')
 
+    def is_enrollment_code(self, obj):
+        benefit = self.retrieve_benefit(obj)
+        return benefit.type == Benefit.PERCENTAGE and benefit.value == 100
 
-def retrieve_voucher_usage(obj):
-    """Helper method to retrieve usage from voucher. """
-    return retrieve_voucher(obj).usage
+    def is_custom_code(self, obj):
+        """ Check if the voucher contains custom code. """
+        return not self.is_enrollment_code(obj) and self.retrieve_quantity(obj) == 1
+
+    def get_category(self, obj):
+        return CategorySerializer(self.retrieve_category(obj)).data
+
+    def get_client(self, obj):
+        invoice = self.retrieve_invoice(obj)
+        if invoice is None:
+            raise Invoice.DoesNotExist
+        return invoice.business_client.name
 
 
 class ProductPaymentInfoMixin(serializers.ModelSerializer):
@@ -505,28 +591,41 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('id', 'name',)
 
 
-class CouponListSerializer(serializers.ModelSerializer):
+class CouponListSerializer(CouponLoaderMixin, serializers.ModelSerializer):
     category = serializers.SerializerMethodField()
     client = serializers.SerializerMethodField()
     code = serializers.SerializerMethodField()
 
-    def get_category(self, obj):
-        category = ProductCategory.objects.filter(product=obj).first().category
-        return CategorySerializer(category).data
-
-    def get_client(self, obj):
-        return Invoice.objects.get(order__lines__product=obj).business_client.name
-
     def get_code(self, obj):
-        if is_custom_code(obj):
-            return retrieve_voucher(obj).code
+        if self.is_custom_code(obj):
+            return self.retrieve_voucher(obj).code
 
     class Meta(object):
         model = Product
         fields = ('category', 'client', 'code', 'id', 'title')
 
 
-class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
+class CouponReportSerializer(serializers.ModelSerializer):
+    """ Serializer for the status of coupon reports generated in the background. """
+    download_url = serializers.SerializerMethodField()
+    progress = serializers.IntegerField(read_only=True)
+
+    def get_download_url(self, obj):
+        if obj.status != CouponReport.COMPLETE:
+            return None
+        return reverse(
+            'api:v2:coupons:coupon_report_download', kwargs={'pk': obj.id}, request=self.context.get('request')
+        )
+
+    class Meta(object):
+        model = CouponReport
+        fields = (
+            'id', 'coupon', 'status', 'progress', 'total_vouchers', 'processed_vouchers', 'compressed',
+            'download_url', 'created', 'modified',
+        )
+
+
+class CouponSerializer(CouponLoaderMixin, ProductPaymentInfoMixin, serializers.ModelSerializer):
     """ Serializer for Coupons. """
     benefit_type = serializers.SerializerMethodField()
     benefit_value = serializers.SerializerMethodField()
@@ -551,68 +650,59 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
     email_domains = serializers.SerializerMethodField()
 
     def get_benefit_type(self, obj):
-        return retrieve_benefit(obj).type
+        return self.retrieve_benefit(obj).type
 
     def get_benefit_value(self, obj):
-        return retrieve_benefit(obj).value
+        return self.retrieve_benefit(obj).value
 
     def get_catalog_query(self, obj):
-        return retrieve_offer(obj).condition.range.catalog_query
+        return self.retrieve_offer(obj).condition.range.catalog_query
 
     def get_course_catalog(self, obj):
-        return retrieve_offer(obj).condition.range.course_catalog
-
-    def get_category(self, obj):
-        category = ProductCategory.objects.filter(product=obj).first().category
-        return CategorySerializer(category).data
+        return self.retrieve_offer(obj).condition.range.course_catalog
 
     def get_coupon_type(self, obj):
-        if is_enrollment_code(obj):
+        if self.is_enrollment_code(obj):
             return _('Enrollment code')
         return _('Discount code')
 
-    def get_client(self, obj):
-        return Invoice.objects.get(order__lines__product=obj).business_client.name
-
     def get_code(self, obj):
-        if retrieve_quantity(obj) == 1:
-            return retrieve_voucher(obj).code
+        if self.retrieve_quantity(obj) == 1:
+            return self.retrieve_voucher(obj).code
 
     def get_code_status(self, obj):
-        start_date = retrieve_start_date(obj)
-        end_date = retrieve_end_date(obj)
+        voucher = self.retrieve_voucher(obj)
+        start_date = voucher.start_datetime
+        end_date = voucher.end_datetime
         current_datetime = timezone.now()
         in_time_interval = start_date < current_datetime < end_date
         return _('ACTIVE') if in_time_interval else _('INACTIVE')
 
     def get_course_seat_types(self, obj):
-        offer = retrieve_offer(obj)
+        offer = self.retrieve_offer(obj)
         course_seat_types = offer.condition.range.course_seat_types
         return course_seat_types.split(',') if course_seat_types else course_seat_types
 
     def get_email_domains(self, obj):
-        offer = retrieve_offer(obj)
+        offer = self.retrieve_offer(obj)
         return offer.email_domains
 
     def get_end_date(self, obj):
-        return retrieve_end_date(obj)
+        return self.retrieve_voucher(obj).end_datetime
 
     def get_last_edited(self, obj):
-        history = obj.history.latest()
+        history = self.get_coupon_loader(obj).get(obj, 'history')
         return history.history_user.username, history.history_date
 
     def get_max_uses(self, obj):
-        offer = retrieve_offer(obj)
+        offer = self.retrieve_offer(obj)
         return offer.max_global_applications
 
     def get_note(self, obj):
-        try:
-            return obj.attr.note
-        except AttributeError:
-            return None
+        return self.get_coupon_loader(obj).get(obj, 'note')
 
     def get_num_uses(self, obj):
-        offer = retrieve_offer(obj)
+        offer = self.retrieve_offer(obj)
         return offer.num_applications
 
     def get_payment_information(self, obj):
@@ -621,30 +711,29 @@ class CouponSerializer(ProductPaymentInfoMixin, serializers.ModelSerializer):
         Currently only invoices are supported, in the event of adding another
         payment processor append it to the response dictionary.
         """
-        invoice = Invoice.objects.filter(order__lines__product=obj).first()
+        invoice = self.retrieve_invoice(obj)
         response = {'Invoice': InvoiceSerializer(invoice).data}
         return response
 
     def get_quantity(self, obj):
-        return retrieve_quantity(obj)
+        return self.retrieve_quantity(obj)
 
     def get_start_date(self, obj):
-        return retrieve_start_date(obj)
+        return self.retrieve_voucher(obj).start_datetime
 
     def get_seats(self, obj):
-        offer = retrieve_offer(obj)
+        offer = self.retrieve_offer(obj)
         _range = offer.condition.range
         request = self.context['request']
         if _range.catalog:
-            stockrecords = _range.catalog.stock_records.all()
-            seats = Product.objects.filter(id__in=[sr.product.id for sr in stockrecords])
+            seats = Product.objects.filter(id__in=_range.catalog.stock_records.values('product_id'))
             serializer = ProductSerializer(seats, many=True, context={'request': request})
             return serializer.data
         else:
             return None
 
     def get_voucher_type(self, obj):
-        return retrieve_voucher_usage(obj)
+        return self.retrieve_voucher(obj).usage
 
     class Meta(object):
         model = Product
@@ -0,0 +1,55 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from oscar.test import factories
+
+from ecommerce.extensions.api import data as data_api
+from ecommerce.extensions.partner import cache as sku_cache
+from ecommerce.tests.factories import PartnerFactory
+from ecommerce.tests.testcases import TestCase
+
+
+class GetProductsTests(TestCase):
+    def setUp(self):
+        super(GetProductsTests, self).setUp()
+        self.products = [factories.ProductFactory(stockrecords__partner=self.partner) for __ in range(3)]
+        self.skus = [product.stockrecords.first().partner_sku for product in self.products]
+
+    def test_get_products(self):
+        """ Verify products are resolved, with their stock records, in a fixed number of queries. """
+        with self.assertNumQueries(3):
+            products = data_api.get_products(self.skus + ['not-a-sku'])
+            for product in products.values():
+                self.assertEqual(len(product.stockrecords.all()), 1)
+                product.get_product_class()
+
+        self.assertEqual(products, dict(zip(self.skus, self.products)))
+
+    def test_get_products_for_partner(self):
+        """ Verify only stock records of the given partner are considered. """
+        other_partner = factories.PartnerFactory()
+        self.assertEqual(data_api.get_products(self.skus, partner=other_partner), {})
+        self.assertEqual(data_api.get_products(self.skus[:1], partner=self.partner), {self.skus[0]: self.products[0]})
+
+    @override_settings(SKU_CACHE_TIMEOUT=3600)
+    def test_get_products_cached(self):
+        """ Verify products of cached SKUs are loaded by ID, without looking up their stock records. """
+        self.addCleanup(cache.clear)
+        self.addCleanup(sku_cache._local_cache.clear)  # pylint: disable=protected-access
+        data_api.get_products(self.skus)
+
+        with CaptureQueriesContext(connection) as context:
+            products = data_api.get_products(self.skus, partner=self.partner)
+        self.assertEqual(products, dict(zip(self.skus, self.products)))
+        self.assertEqual(len(context), 2)
+        self.assertNotIn('partner_sku', context.captured_queries[0]['sql'])
+
+    def test_get_products_shared_sku(self):
+        """ Verify SKUs shared by the stock records of several partners are resolved by partner. """
+        other_partner = PartnerFactory()
+        other_product = factories.ProductFactory(
+            stockrecords__partner=other_partner, stockrecords__partner_sku=self.skus[0]
+        )
+        self.assertEqual(data_api.get_products(self.skus[:1], partner=self.partner), {self.skus[0]: self.products[0]})
+        self.assertEqual(data_api.get_products(self.skus[:1], partner=other_partner), {self.skus[0]: other_product})
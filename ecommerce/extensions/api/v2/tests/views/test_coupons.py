@@ -9,7 +9,9 @@ import ddt
 import httpretty
 import pytz
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from oscar.apps.catalogue.categories import create_from_breadcrumbs
 from oscar.core.loading import get_class, get_model
@@ -22,6 +24,7 @@ from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.api.v2.views.coupons import CouponViewSet
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.voucher.models import CouponVouchers
+from ecommerce.extensions.voucher.utils import get_voucher_redemption_bundle
 from ecommerce.invoice.models import Invoice
 from ecommerce.tests.factories import ProductFactory, SiteConfigurationFactory, SiteFactory
 from ecommerce.tests.mixins import ThrottlingMixin
@@ -423,6 +426,40 @@ class CouponViewSetFunctionalTest(CouponMixin, CourseCatalogTestMixin, CourseCat
         self.assertEqual(coupon_data['category']['name'], self.data['category']['name'])
         self.assertEqual(coupon_data['client'], self.data['client'])
 
+    def test_list_coupons_query_count(self):
+        """Verify the number of queries made by the list endpoint does not grow with the number of coupons."""
+        # Warm up caches populated by the first request.
+        self.client.get(COUPONS_LINK)
+        with CaptureQueriesContext(connection) as single_coupon_queries:
+            response = self.client.get(COUPONS_LINK)
+        self.assertEqual(len(json.loads(response.content)['results']), 1)
+
+        for index in range(3):
+            self.data.update({'title': 'Tešt čoupon {}'.format(index), 'quantity': 1 + index % 2})
+            self.client.post(COUPONS_LINK, json.dumps(self.data), 'application/json')
+
+        with CaptureQueriesContext(connection) as many_coupons_queries:
+            response = self.client.get(COUPONS_LINK)
+        results = json.loads(response.content)['results']
+        self.assertEqual(len(results), 4)
+        self.assertTrue(all(coupon['client'] == self.data['client'] for coupon in results))
+        self.assertEqual(len(single_coupon_queries), len(many_coupons_queries))
+
+    def test_coupon_details_query_count(self):
+        """Verify the number of queries made by the details endpoint does not grow with the number of vouchers."""
+        path = reverse('api:v2:coupons-detail', args=[self.coupon.id])
+        self.client.get(path)
+        with CaptureQueriesContext(connection) as few_vouchers_queries:
+            self.client.get(path)
+
+        self.data.update({'title': 'Tešt čoupon 2', 'quantity': 10})
+        self.client.post(COUPONS_LINK, json.dumps(self.data), 'application/json')
+        coupon = Product.objects.get(title=self.data['title'])
+        with CaptureQueriesContext(connection) as many_vouchers_queries:
+            response = self.get_response_json('GET', reverse('api:v2:coupons-detail', args=[coupon.id]))
+        self.assertEqual(response['quantity'], 10)
+        self.assertEqual(len(few_vouchers_queries), len(many_vouchers_queries))
+
     def test_list_and_details_endpoint_return_custom_code(self):
         """Test that the list and details endpoints return the correct code."""
         self.data.update({
@@ -503,6 +540,23 @@ class CouponViewSetFunctionalTest(CouponMixin, CourseCatalogTestMixin, CourseCat
             self.assertEqual(voucher.start_datetime.year, 2030)
             self.assertEqual(voucher.end_datetime.year, 2035)
 
+    def test_update_invalidates_redemption_cache(self):
+        """Test that coupon updates are reflected by the cached voucher redemption data."""
+        code = self.coupon.attr.coupon_vouchers.vouchers.first().code
+        get_voucher_redemption_bundle(code)
+
+        data = {
+            'id': self.coupon.id,
+            'end_datetime': '2035-01-01',
+            'max_uses': 5,
+        }
+        self.client.put(reverse('api:v2:coupons-detail', kwargs={'pk': self.coupon.id}), json.dumps(data),
+                        'application/json')
+
+        bundle = get_voucher_redemption_bundle(code)
+        self.assertEqual(bundle['voucher'].end_datetime.year, 2035)
+        self.assertEqual(bundle['offer'].max_global_applications, 5)
+
     def test_update_benefit_value(self):
         """Test that updating a benefit value updates all of it's voucher offers."""
         path = reverse('api:v2:coupons-detail', kwargs={'pk': self.coupon.id})
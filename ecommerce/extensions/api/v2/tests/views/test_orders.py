@@ -1,19 +1,27 @@
+import datetime
 import json
 
 import ddt
 import httpretty
 import mock
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.signals import request_finished
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.test import override_settings, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
 from oscar.core.loading import get_model
 from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
 
 from ecommerce.extensions.api.serializers import OrderSerializer
 from ecommerce.extensions.api.tests.test_authentication import AccessTokenMixin
 from ecommerce.extensions.api.v2.tests.views import OrderDetailViewTestMixin
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
-from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
 from ecommerce.tests.mixins import ThrottlingMixin
 from ecommerce.tests.testcases import TestCase
 
@@ -22,7 +30,7 @@ ShippingEventType = get_model('order', 'ShippingEventType')
 
 
 @ddt.ddt
-class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
+class OrderListViewTests(AccessTokenMixin, CourseCatalogTestMixin, ThrottlingMixin, TestCase):
     def setUp(self):
         super(OrderListViewTests, self).setUp()
         self.path = reverse('api:v2:order-list')
@@ -39,8 +47,8 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertEqual(response.status_code, 200)
 
         content = json.loads(response.content)
-        self.assertEqual(content['count'], 0)
         self.assertEqual(content['results'], [])
+        self.assertIsNone(content['next'])
 
     @httpretty.activate
     def test_oauth2_authentication(self):
@@ -64,7 +72,7 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertEqual(response.status_code, 200)
         content = json.loads(response.content)
 
-        self.assertEqual(content['count'], 1)
+        self.assertEqual(len(content['results']), 1)
         self.assertEqual(content['results'][0]['number'], unicode(order.number))
 
         # Test ordering
@@ -73,7 +81,7 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         self.assertEqual(response.status_code, 200)
         content = json.loads(response.content)
 
-        self.assertEqual(content['count'], 2)
+        self.assertEqual(len(content['results']), 2)
         self.assertEqual(content['results'][0]['number'], unicode(order_2.number))
         self.assertEqual(content['results'][1]['number'], unicode(order.number))
 
@@ -87,7 +95,7 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         order = factories.create_order(user=self.user)
         response = self.client.get(self.path, HTTP_AUTHORIZATION=self.token)
         content = json.loads(response.content)
-        self.assertEqual(content['count'], 1)
+        self.assertEqual(len(content['results']), 1)
         self.assertEqual(content['results'][0]['number'], unicode(order.number))
 
     @ddt.unpack
@@ -102,7 +110,7 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
 
         response = self.client.get(self.path, HTTP_AUTHORIZATION=self.generate_jwt_token_header(admin_user))
         content = json.loads(response.content)
-        self.assertEqual(content['count'], 1)
+        self.assertEqual(len(content['results']), 1)
         self.assertEqual(content['results'][0]['number'], unicode(order.number))
 
     def test_user_information(self):
@@ -112,7 +120,7 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
 
         response = self.client.get(self.path, HTTP_AUTHORIZATION=self.generate_jwt_token_header(admin_user))
         content = json.loads(response.content)
-        self.assertEqual(content['count'], 1)
+        self.assertEqual(len(content['results']), 1)
         self.assertEqual(content['results'][0]['number'], unicode(order.number))
         self.assertEqual(content['results'][0]['user']['email'], admin_user.email)
         self.assertEqual(content['results'][0]['user']['username'], admin_user.username)
@@ -139,6 +147,83 @@ class OrderListViewTests(AccessTokenMixin, ThrottlingMixin, TestCase):
         response = self.client.get(self.path, {'username': self.user.username})
         self.assertEqual(response.status_code, 403)
 
+    def create_seat_order(self, seat_count):
+        """ Creates an order, placed by the user, of a seat in each of seat_count new courses. """
+        basket = BasketFactory(owner=self.user, site=self.site)
+        for __ in range(seat_count):
+            __, seat = self.create_course_and_seat(partner=self.partner)
+            basket.add_product(seat, 1)
+        return factories.create_order(basket=basket, user=self.user)
+
+    def test_pagination(self):
+        """ Verify orders are paginated by keyset, from the most recently placed, in both directions. """
+        orders = [factories.create_order(user=self.user) for __ in range(5)]
+        # Orders placed at the same time are ordered by ID.
+        current_time = now()
+        for order, days_ago in zip(orders, (4, 3, 3, 2, 1)):
+            Order.objects.filter(id=order.id).update(date_placed=current_time - datetime.timedelta(days=days_ago))
+        expected = [str(order.number) for order in reversed(orders)]
+
+        pages = []
+        url = '{}?page_size=2'.format(self.path)
+        while url:
+            content = json.loads(self.client.get(url, HTTP_AUTHORIZATION=self.token).content)
+            pages.append([order['number'] for order in content['results']])
+            url = content['next']
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+        self.assertIsNone(content['next'])
+
+        pages = []
+        url = content['previous']
+        while url:
+            content = json.loads(self.client.get(url, HTTP_AUTHORIZATION=self.token).content)
+            pages.append([order['number'] for order in content['results']])
+            url = content['previous']
+        self.assertEqual(pages, [expected[2:4], expected[:2]])
+
+    def test_page_number_pagination(self):
+        """ Verify orders requested by page number are paginated by page number, with the count of orders. """
+        orders = [factories.create_order(user=self.user) for __ in range(3)]
+        current_time = now()
+        for order, days_ago in zip(orders, (3, 2, 1)):
+            Order.objects.filter(id=order.id).update(date_placed=current_time - datetime.timedelta(days=days_ago))
+
+        response = self.client.get(self.path, {'page': 2, 'page_size': 2}, HTTP_AUTHORIZATION=self.token)
+        content = json.loads(response.content)
+        self.assertEqual(content['count'], 3)
+        self.assertIsNone(content['next'])
+        self.assertIn('page_size=2', content['previous'])
+        self.assertEqual([order['number'] for order in content['results']], [str(orders[0].number)])
+
+    def test_invalid_cursor(self):
+        """ Verify the view responds with HTTP status 404 to cursors it cannot decode. """
+        response = self.client.get(self.path, {'cursor': 'invalid'}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.status_code, 404)
+
+    @ddt.data(1, 2, 3)
+    def test_list_query_count(self, page_size):
+        """ Verify the number of queries made to list orders does not grow with the number of orders or lines. """
+        self.create_seat_order(1)
+        self.client.get(self.path, HTTP_AUTHORIZATION=self.token)
+        # Serialized orders are cached, so clear the cache to count the queries made to serialize every order listed.
+        cache.clear()
+        with CaptureQueriesContext(connection) as single_order_queries:
+            response = self.client.get(self.path, {'page_size': page_size}, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(len(json.loads(response.content)['results']), 1)
+
+        for seat_count in (2, 3):
+            order = self.create_seat_order(seat_count)
+            order.date_placed = now() - datetime.timedelta(days=seat_count)
+            order.save()
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as many_orders_queries:
+            response = self.client.get(self.path, {'page_size': page_size}, HTTP_AUTHORIZATION=self.token)
+        results = json.loads(response.content)['results']
+        self.assertEqual([len(order['lines']) for order in results], [1, 2, 3][:page_size])
+        self.assertTrue(all(line['product']['attribute_values'] for order in results for line in order['lines']))
+        self.assertEqual(len(single_order_queries), len(many_orders_queries))
+
     def assert_list_with_username_filter(self, user, order):
         """ Helper method for making assertions. """
 
@@ -263,3 +348,22 @@ class OrderDetailViewTests(OrderDetailViewTestMixin, TestCase):
     @property
     def url(self):
         return reverse('api:v2:order-detail', kwargs={'number': self.order.number})
+
+    @override_settings(SERIALIZED_ORDER_CACHE_TIMEOUT=3600)
+    def test_get_completed_order_from_cache(self):
+        """ Verify completed orders are served from cache until they change. """
+        self.addCleanup(cache.clear)
+        self.order.set_status(ORDER.COMPLETE)
+        # The order changed in the transaction of the test, rather than in a request, so it is invalidated again
+        # once a request is finished. Finishing one now keeps that from invalidating the representation cached below.
+        request_finished.send(sender=self.__class__)
+        self.client.get(self.url, HTTP_AUTHORIZATION=self.token)
+
+        with mock.patch.object(OrderSerializer, 'to_representation') as mock_to_representation:
+            response = self.client.get(self.url, HTTP_AUTHORIZATION=self.token)
+        self.assertFalse(mock_to_representation.called)
+        self.assertEqual(response.data, self.serialize_order(self.order))
+
+        self.order.lines.first().set_status(LINE.COMPLETE)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=self.token)
+        self.assertEqual(response.data['lines'][0]['status'], LINE.COMPLETE)
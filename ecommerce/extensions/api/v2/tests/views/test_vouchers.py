@@ -7,8 +7,11 @@ import mock
 import ddt
 import httpretty
 import pytz
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import connection
 from django.http import Http404
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
@@ -19,6 +22,7 @@ from requests.exceptions import ConnectionError, Timeout
 from rest_framework.test import APIRequestFactory
 from slumber.exceptions import SlumberBaseException
 
+from ecommerce.core.models import User
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
 from ecommerce.courses.tests.factories import CourseFactory
@@ -143,7 +147,8 @@ class VoucherViewSetTests(CourseCatalogMockMixin, CourseCatalogTestMixin, LmsApi
     def test_omitting_already_bought_credit_seat(self):
         """ Verify a seat that the user bought is omitted from offer page results. """
         products, request, voucher = self.prepare_get_offers_response(quantity=2, seat_type='credit')
-        self.mock_eligibility_api(request, self.user, 'a/b/c', eligible=True)
+        for product in products:
+            self.mock_eligibility_api(request, self.user, product.course_id)
         offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
         self.assertEqual(len(offers), 2)
 
@@ -163,6 +168,42 @@ class VoucherViewSetTests(CourseCatalogMockMixin, CourseCatalogTestMixin, LmsApi
         offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
         self.assertEqual(len(offers), offer_num)
 
+    def get_offers_query_count(self, request, voucher):
+        """ Returns the number of queries made listing the voucher's offers once caches are warm. """
+        VoucherViewSet().get_offers(request=request, voucher=voucher)
+        with CaptureQueriesContext(connection) as context:
+            offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
+        return len(offers), len(context)
+
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_credit_offers_query_count(self):
+        """ Verify the number of queries made listing credit offers does not grow with the number of seats. """
+        products, request, voucher = self.prepare_get_offers_response(quantity=1, seat_type='credit')
+        self.mock_eligibility_api(request, self.user, products[0].course_id)
+        offer_count, query_count = self.get_offers_query_count(request, voucher)
+        self.assertEqual(offer_count, 1)
+
+        # Add two more seats to the voucher's catalog query results.
+        products += [self.create_course_and_seat(seat_type='credit', partner=self.partner)[1] for __ in range(2)]
+        course_run_info = {'count': len(products), 'next': 'path/to/the/next/page', 'results': []}
+        for product in products:
+            course_run_info['results'].append({
+                'image': {'src': 'path/to/the/course/image'},
+                'key': product.course_id,
+                'start': '2016-05-01T00:00:00Z',
+                'title': product.course.name,
+                'enrollment_end': None
+            })
+            self.mock_eligibility_api(request, self.user, product.course_id)
+        self.mock_dynamic_catalog_course_runs_api(query='*:*', course_run_info=course_run_info)
+        cache.clear()
+        with mock.patch.object(
+                User, 'get_credit_eligibilities', autospec=True, side_effect=User.get_credit_eligibilities
+        ) as mock_eligibilities:
+            self.assertEqual(self.get_offers_query_count(request, voucher), (3, query_count))
+        self.assertEqual(mock_eligibilities.call_count, 2)
+
     @httpretty.activate
     @mock_course_catalog_api_client
     def test_multiple_providers(self):
@@ -303,21 +344,10 @@ class VoucherViewOffersEndpointTests(
         self.assertEqual(response.status_code, 200)
 
     @mock_course_catalog_api_client
-    @ddt.data(
-        (
-            StockRecord.objects.none(),
-            'ecommerce.extensions.api.v2.views.vouchers.StockRecord.objects.filter'
-        ),
-        (
-            Product.objects.none(),
-            'ecommerce.extensions.api.v2.views.vouchers.Product.objects.filter'
-        )
-    )
-    @ddt.unpack
-    def test_voucher_offers_listing_catalog_query_exception(self, return_value, method):
+    def test_voucher_offers_listing_catalog_query_exception(self):
         """
         Verify the endpoint returns status 200 and an empty list of course offers
-        when all product Courses and Stock Records are not found
+        when no products are found
         and range has a catalog query
         """
         course, seat = self.create_course_and_seat()
@@ -327,10 +357,27 @@ class VoucherViewOffersEndpointTests(
         voucher, __ = prepare_voucher(_range=new_range)
         request = self.prepare_offers_listing_request(voucher.code)
 
-        with mock.patch(method, mock.Mock(return_value=return_value)):
+        with mock.patch(
+                'ecommerce.extensions.api.v2.views.vouchers.Product.objects.filter',
+                mock.Mock(return_value=Product.objects.none())
+        ):
             offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
             self.assertEqual(len(offers), 0)
 
+    @mock_course_catalog_api_client
+    def test_voucher_offers_listing_catalog_query_without_stock_records(self):
+        """ Verify the endpoint omits seats which have no stock record when the range has a catalog query. """
+        course, seat = self.create_course_and_seat()
+        self.mock_dynamic_catalog_course_runs_api(query='*:*', course_run=course)
+        new_range, __ = Range.objects.get_or_create(catalog_query='*:*', course_seat_types='verified')
+        new_range.add_product(seat)
+        voucher, __ = prepare_voucher(_range=new_range)
+        request = self.prepare_offers_listing_request(voucher.code)
+        StockRecord.objects.filter(product=seat).delete()
+
+        offers = VoucherViewSet().get_offers(request=request, voucher=voucher)['results']
+        self.assertEqual(len(offers), 0)
+
     @mock_course_catalog_api_client
     def test_voucher_offers_listing_catalog_query(self):
         """ Verify the endpoint returns offers data for single product range. """
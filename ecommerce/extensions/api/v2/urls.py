@@ -1,4 +1,5 @@
 from django.conf.urls import url, include
+from django.db import transaction
 from rest_framework_extensions.routers import ExtendedSimpleRouter
 
 from ecommerce.core.constants import COURSE_ID_PATTERN
@@ -19,7 +20,7 @@ from ecommerce.extensions.api.v2.views import (
     stockrecords as stockrecords_views,
     vouchers as voucher_views
 )
-from ecommerce.extensions.voucher.views import CouponReportCSVView
+from ecommerce.extensions.voucher.views import CouponReportCSVView, CouponReportDownloadView
 
 ORDER_NUMBER_PATTERN = r'(?P<number>[-\w]+)'
 BASKET_ID_PATTERN = r'(?P<basket_id>[\d]+)'
@@ -49,7 +50,22 @@ REFUND_URLS = [
 ]
 
 COUPON_URLS = [
-    url(r'^coupon_reports/(?P<coupon_id>[\d]+)/$', CouponReportCSVView.as_view(), name='coupon_reports'),
+    # Background report tasks must only be sent once the report has been committed.
+    url(
+        r'^coupon_reports/(?P<coupon_id>[\d]+)/$',
+        transaction.non_atomic_requests(CouponReportCSVView.as_view()),
+        name='coupon_reports'
+    ),
+    url(
+        r'^coupon_report_jobs/(?P<pk>[\d]+)/$',
+        coupon_views.CouponReportRetrieveView.as_view(),
+        name='coupon_report_status'
+    ),
+    url(
+        r'^coupon_report_jobs/(?P<pk>[\d]+)/download/$',
+        CouponReportDownloadView.as_view(),
+        name='coupon_report_download'
+    ),
     url(r'^categories/$', coupon_views.CouponCategoriesListView.as_view(), name='coupons_categories'),
 ]
 
@@ -138,15 +138,19 @@ class BasketCreateView(EdxOrderPlacementMixin, generics.CreateAPIView):
 
             requested_products = request.data.get('products')
             if requested_products:
+                # Resolve all requested products, with their stock records, at once
+                products = data_api.get_products(
+                    [requested_product.get('sku') for requested_product in requested_products
+                     if requested_product.get('sku')]
+                )
                 for requested_product in requested_products:
                     # Ensure the requested products exist
                     sku = requested_product.get('sku')
                     if sku:
-                        try:
-                            product = data_api.get_product(sku)
-                        except api_exceptions.ProductNotFoundError as error:
+                        product = products.get(sku)
+                        if product is None:
                             return self._report_bad_request(
-                                error.message,
+                                api_exceptions.PRODUCT_NOT_FOUND_DEVELOPER_MESSAGE.format(sku=sku),
                                 api_exceptions.PRODUCT_NOT_FOUND_USER_MESSAGE
                             )
                     else:
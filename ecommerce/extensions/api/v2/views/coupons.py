@@ -16,19 +16,23 @@ from ecommerce.core.models import BusinessClient
 from ecommerce.coupons.utils import prepare_course_seat_types
 from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.api.filters import ProductFilter
-from ecommerce.extensions.api.serializers import CategorySerializer, CouponSerializer, CouponListSerializer
+from ecommerce.extensions.api.serializers import (
+    CategorySerializer, CouponListSerializer, CouponReportSerializer, CouponSerializer
+)
 from ecommerce.extensions.basket.utils import prepare_basket
 from ecommerce.extensions.catalogue.utils import create_coupon_product, get_or_create_catalog
 from ecommerce.extensions.checkout.mixins import EdxOrderPlacementMixin
+from ecommerce.extensions.offer.models import invalidate_range_product_ids
 from ecommerce.extensions.payment.processors.invoice import InvoicePayment
 from ecommerce.extensions.voucher.models import CouponVouchers
-from ecommerce.extensions.voucher.utils import update_voucher_offer
+from ecommerce.extensions.voucher.utils import invalidate_voucher_redemption_cache, update_voucher_offer
 from ecommerce.invoice.models import Invoice
 
 Basket = get_model('basket', 'Basket')
 Catalog = get_model('catalogue', 'Catalog')
 Category = get_model('catalogue', 'Category')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponReport = get_model('voucher', 'CouponReport')
 logger = logging.getLogger(__name__)
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -51,6 +55,13 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
             return CouponListSerializer
         return CouponSerializer
 
+    def get_queryset(self):
+        queryset = super(CouponViewSet, self).get_queryset()
+        if self.action == 'retrieve':
+            # Coupon details include the price, which is read from the coupon's stock record.
+            queryset = queryset.prefetch_related('stockrecords')
+        return queryset
+
     def create(self, request, *args, **kwargs):
         """Adds coupon to the user's basket.
 
@@ -178,7 +189,7 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
             seats = Product.objects.filter(stockrecords__id__in=stock_record_ids)
             for seat in seats:
                 try:
-                    if seat.attr.certificate_type in settings.BLACK_LIST_COUPON_COURSE_MODES:
+                    if seat.seat_attr.certificate_type in settings.BLACK_LIST_COUPON_COURSE_MODES:
                         validation_message = 'Course mode not supported'
                         raise ValidationError(validation_message, code=status.HTTP_400_BAD_REQUEST)
                 except AttributeError:
@@ -268,6 +279,7 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
 
         if data:
             vouchers.all().update(**data)
+            invalidate_voucher_redemption_cache('voucher', vouchers.values_list('id', flat=True))
 
         range_data = self.create_update_data_dict(data=request.data, fields=Range.UPDATABLE_RANGE_FIELDS)
 
@@ -290,6 +302,9 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
                 range_data['course_catalog'] = None
 
             Range.objects.filter(id=voucher_range.id).update(**range_data)
+            # Queryset updates do not send post_save, so the caches built from the range are cleared here.
+            invalidate_voucher_redemption_cache('range', [voucher_range.id])
+            invalidate_range_product_ids([voucher_range.id])
 
         benefit_value = request.data.get('benefit_value')
         if benefit_value:
@@ -315,7 +330,10 @@ class CouponViewSet(EdxOrderPlacementMixin, viewsets.ModelViewSet):
 
         offer_data = self.create_update_data_dict(data=request.data, fields=ConditionalOffer.UPDATABLE_OFFER_FIELDS)
         if offer_data:
-            ConditionalOffer.objects.filter(vouchers__in=vouchers.all()).update(**offer_data)
+            offers = ConditionalOffer.objects.filter(vouchers__in=vouchers.all())
+            offer_ids = list(offers.values_list('id', flat=True).distinct())
+            offers.update(**offer_data)
+            invalidate_voucher_redemption_cache('offer', offer_ids)
 
         self.update_invoice_data(coupon, request.data)
 
@@ -414,3 +432,10 @@ class CouponCategoriesListView(generics.ListAPIView):
     def get_queryset(self):
         parent_category = Category.objects.get(slug='coupons')
         return parent_category.get_children()
+
+
+class CouponReportRetrieveView(generics.RetrieveAPIView):
+    """ Status of a coupon report generated in the background, polled by the coupon admin app. """
+    queryset = CouponReport.objects.all()
+    serializer_class = CouponReportSerializer
+    permission_classes = (IsAuthenticated, IsAdminUser)
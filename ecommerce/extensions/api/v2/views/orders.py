@@ -1,22 +1,30 @@
 """HTTP endpoints for interacting with orders."""
+import json
 import logging
 
+from django.db.models import Prefetch
 from oscar.core.loading import get_model, get_class
 from rest_framework import filters, status, viewsets
 from rest_framework.decorators import detail_route
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated, DjangoModelPermissions
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
 
 from ecommerce.extensions.api import serializers
 from ecommerce.extensions.api.filters import OrderFilter
+from ecommerce.extensions.api.pagination import OrderPagination
 from ecommerce.extensions.api.permissions import IsStaffOrOwner
 from ecommerce.extensions.api.throttles import ServiceUserThrottle
+from ecommerce.extensions.order.cache import get_serialized_orders
 
 
 logger = logging.getLogger(__name__)
 
+Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
+Source = get_model('payment', 'Source')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
 
 
 class OrderViewSet(viewsets.ReadOnlyModelViewSet):
@@ -27,6 +35,55 @@ class OrderViewSet(viewsets.ReadOnlyModelViewSet):
     throttle_classes = (ServiceUserThrottle,)
     filter_backends = (filters.DjangoFilterBackend,)
     filter_class = OrderFilter
+    pagination_class = OrderPagination
+
+    # Everything OrderSerializer reads, loaded in a fixed number of queries however many orders are serialized.
+    serialized_relations = (
+        Prefetch(
+            'lines',
+            queryset=Line.objects.select_related('product__product_class', 'product__parent__product_class')
+        ),
+        # Line.description is built from the line attributes.
+        'lines__attributes',
+        Prefetch(
+            'lines__product__attribute_values',
+            queryset=ProductAttributeValue.objects.select_related('attribute')
+        ),
+        'lines__product__stockrecords',
+        Prefetch('sources', queryset=Source.objects.select_related('source_type')),
+        'discounts',
+        'basket__vouchers__offers',
+    )
+
+    def get_queryset(self):
+        queryset = super(OrderViewSet, self).get_queryset()
+
+        if self.action in ('list', 'retrieve'):
+            queryset = queryset.select_related('basket', 'billing_address', 'user')
+
+        return queryset
+
+    def list(self, request, *args, **kwargs):
+        orders = self.paginate_queryset(self.filter_queryset(self.get_queryset()))
+        return self.get_paginated_response(self.get_serialized_orders(orders))
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(self.get_serialized_orders([self.get_object()])[0])
+
+    def get_serialized_orders(self, orders):
+        """ Returns the representations of the given orders, serializing only those which are not cached. """
+        variant = '{}_{}'.format(self.request.get_host(), self.request.user.id)
+        return get_serialized_orders(orders, variant, self.serialize_orders)
+
+    def serialize_orders(self, orders):
+        # Relations are only loaded for the orders which are serialized, rather than served from cache.
+        prefetched_orders = self.get_queryset().prefetch_related(*self.serialized_relations).in_bulk(
+            [order.id for order in orders]
+        )
+        data = self.get_serializer([prefetched_orders[order.id] for order in orders], many=True).data
+        # Representations are cached, so they are reduced to plain types. Some of the types serializers return,
+        # such as the Hyperlink of hyperlinked fields, cannot be unpickled.
+        return json.loads(json.dumps(data, cls=JSONEncoder))
 
     def filter_queryset(self, queryset):
         queryset = super(OrderViewSet, self).filter_queryset(queryset)
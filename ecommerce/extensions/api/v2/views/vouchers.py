@@ -4,6 +4,7 @@ from urlparse import urlparse
 
 import django_filters
 from dateutil import parser
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from django.utils.timezone import now
 from opaque_keys.edx.keys import CourseKey
@@ -24,7 +25,7 @@ from ecommerce.extensions.api.v2.views import NonDestroyableModelViewSet
 
 
 logger = logging.getLogger(__name__)
-Order = get_model('order', 'Order')
+Line = get_model('order', 'Line')
 Product = get_model('catalogue', 'Product')
 StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
@@ -101,7 +102,8 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             course_seat_types(str): Comma-separated list of accepted seat types.
 
         Returns:
-            Querysets of products and stock records retrieved from results.
+            A list of products retrieved from results, ordered by seat type, and a
+            dict of their stock records keyed by product ID.
         """
         all_course_ids = []
         nonexpired_course_ids = []
@@ -112,15 +114,28 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             ):
                 nonexpired_course_ids.append(result['key'])
 
-        products = []
-        for seat_type in course_seat_types.split(','):
-            products.extend(Product.objects.filter(
-                course_id__in=nonexpired_course_ids if seat_type == 'professional' else all_course_ids,
-                attributes__name='certificate_type',
-                attribute_values__value_text=seat_type
-            ))
-        stock_records = StockRecord.objects.filter(product__in=products)
-        return products, stock_records
+        seat_types = course_seat_types.split(',')
+        # The parent and product classes are needed by the strategy's availability checks.
+        products = list(Product.objects.filter(
+            course_id__in=all_course_ids,
+            attribute_values__attribute__name='certificate_type',
+            attribute_values__value_text__in=seat_types
+        ).select_related(
+            'parent__product_class', 'product_class'
+        ).prefetch_related('stockrecords').distinct())
+
+        seats = []
+        for seat_type in seat_types:
+            course_ids = nonexpired_course_ids if seat_type == 'professional' else all_course_ids
+            for product in products:
+                if product.seat_attr.certificate_type == seat_type and product.course_id in course_ids:
+                    seats.append(product)
+
+        stock_records = {}
+        for product in seats:
+            for stock_record in product.stockrecords.all():
+                stock_records.setdefault(product.id, stock_record)
+        return seats, stock_records
 
     def get_offers_from_query(self, request, voucher, catalog_query):
         """ Helper method for collecting offers from catalog query.
@@ -147,48 +162,59 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             site=request.site
         )
         next_page = response['next']
+        # Every course run returned by the query is contained by it, which saves basket
+        # contains checks a trip to the Course Catalog Service when these seats are redeemed.
+        benefit.range.cache_catalog_query_contains({result['key']: True for result in response['results']})
+        course_catalog_results = {result['key']: result for result in response['results']}
         products, stock_records = self.retrieve_course_objects(response['results'], course_seat_types)
+        courses = Course.objects.in_bulk({product.course_id for product in products})
         contains_verified_course = (course_seat_types == 'verified')
+
+        # Omit unavailable seats from the offer results so that one seat does not cause an
+        # error message for every seat in the query result.
+        available_products = []
         for product in products:
-            # Omit unavailable seats from the offer results so that one seat does not cause an
-            # error message for every seat in the query result.
-            if not request.strategy.fetch_for_product(product).availability.is_available_to_buy:
+            if request.strategy.fetch_for_product(product).availability.is_available_to_buy:
+                available_products.append(product)
+            else:
                 logger.info('%s is unavailable to buy. Omitting it from the results.', product)
-                continue
 
-            course_id = product.course_id
-            course_catalog_data = next(
-                (result for result in response['results'] if result['key'] == course_id),
-                None
+        if course_seat_types == 'credit':
+            eligibilities = request.user.get_credit_eligibilities(
+                [product.course_id for product in available_products], request.site
             )
+            purchased_product_ids = set(Line.objects.filter(
+                order__user=request.user,
+                product__in=available_products
+            ).values_list('product_id', flat=True))
+            credit_seat_counts = dict(Product.objects.filter(
+                parent__in={product.parent_id for product in available_products},
+                attributes__name='credit_provider'
+            ).order_by().values_list('parent_id').annotate(Count('id')))
+
+        for product in available_products:
+            course_id = product.course_id
+            stock_record = stock_records.get(product.id)
             if course_seat_types == 'credit':
                 # Omit credit seats for which the user is not eligible or which the user already bought.
-                if request.user.is_eligible_for_credit(product.course_id):
-                    if Order.objects.filter(user=request.user, lines__product=product).exists():
-                        continue
-                else:
+                if not eligibilities[course_id] or product.id in purchased_product_ids:
                     continue
-                credit_seats = Product.objects.filter(parent=product.parent, attributes__name='credit_provider')
 
-                if credit_seats.count() > 1:
+                if credit_seat_counts.get(product.parent_id, 0) > 1:
                     multiple_credit_providers = True
                     credit_provider_price = None
                 else:
                     multiple_credit_providers = False
-                    credit_provider_price = StockRecord.objects.get(product=product).price_excl_tax
+                    credit_provider_price = stock_record.price_excl_tax if stock_record else None
 
-            try:
-                stock_record = stock_records.get(product__id=product.id)
-            except StockRecord.DoesNotExist:
-                stock_record = None
+            if not stock_record:
                 logger.error('Stock Record for product %s not found.', product.id)
 
-            try:
-                course = Course.objects.get(id=course_id)
-            except Course.DoesNotExist:  # pragma: no cover
-                course = None
+            course = courses.get(course_id)
+            if not course:  # pragma: no cover
                 logger.error('Course %s not found.', course_id)
 
+            course_catalog_data = course_catalog_results.get(course_id)
             if course_catalog_data and course and stock_record:
                 offers.append(self.get_course_offer_data(
                     benefit=benefit,
@@ -277,7 +303,7 @@ class VoucherViewSet(NonDestroyableModelViewSet):
             'multiple_credit_providers': multiple_credit_providers,
             'organization': CourseKey.from_string(course.id).org,
             'credit_provider_price': credit_provider_price,
-            'seat_type': product.attr.certificate_type,
+            'seat_type': product.seat_attr.certificate_type,
             'stockrecords': serializers.StockRecordSerializer(stock_record).data,
             'title': course.name,
             'voucher_end_date': voucher.end_datetime
@@ -0,0 +1,62 @@
+""" Compares the throughput of API endpoints served with Oscar's basket middleware, which loads the user and
+strategy of every request, against the lazy basket middleware. """
+
+from __future__ import unicode_literals
+import time
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+LAZY_MIDDLEWARE = 'ecommerce.extensions.basket.middleware.BasketMiddleware'
+OSCAR_MIDDLEWARE = 'oscar.apps.basket.middleware.BasketMiddleware'
+PATHS = ('/api/v2/orders/', '/api/v2/courses/')
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Time requests to the orders and courses APIs, with and without the lazy basket middleware.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Username of the staff user the requests are made on behalf of.')
+        parser.add_argument('--requests', type=int, default=100, help='Number of requests made to every endpoint.')
+        parser.add_argument('--host', default='localhost', help='Host of the site the requests are made to.')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError('User [{}] does not exist.'.format(options['username']))
+
+        token = jwt.encode(
+            {'username': user.username, 'email': user.email, 'iss': settings.JWT_AUTH['JWT_ISSUERS'][0]},
+            settings.JWT_AUTH['JWT_SECRET_KEY']
+        )
+        oscar_middleware_classes = [
+            OSCAR_MIDDLEWARE if middleware_class == LAZY_MIDDLEWARE else middleware_class
+            for middleware_class in settings.MIDDLEWARE_CLASSES
+        ]
+
+        for path in PATHS:
+            for name, middleware_classes in (('Oscar', oscar_middleware_classes), ('Lazy', settings.MIDDLEWARE_CLASSES)):
+                with override_settings(MIDDLEWARE_CLASSES=middleware_classes):
+                    # Every client loads the middleware configured when it makes its first request.
+                    client = Client(HTTP_HOST=options['host'], HTTP_AUTHORIZATION='JWT {}'.format(token))
+                    response = client.get(path)
+                    if response.status_code != 200:
+                        raise CommandError('[{}] responded with status [{}].'.format(path, response.status_code))
+
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.time()
+                        for __ in range(options['requests']):
+                            client.get(path)
+                        elapsed = time.time() - start
+
+                self.stdout.write('{} {} basket middleware: {:.1f} requests/s, {:.1f} queries/request'.format(
+                    path, name, options['requests'] / elapsed, len(queries) / float(options['requests'])
+                ))
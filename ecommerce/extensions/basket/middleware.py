@@ -1,10 +1,52 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
 from oscar.apps.basket.middleware import BasketMiddleware as OscarBasketMiddleware
-from oscar.core.loading import get_model
+from oscar.core.loading import get_class, get_model
 
 Basket = get_model('basket', 'basket')
+Selector = get_class('partner.strategy', 'Selector')
 
 
 class BasketMiddleware(OscarBasketMiddleware):
+    def process_request(self, request):
+        """
+        Attaches the stock and price strategy, and the basket, to the request.
+
+        The strategy is not loaded until it is first used, so that requests which never use it do not load
+        the user. Requests to paths starting with one of BASKET_MIDDLEWARE_EXCLUDED_PATHS get no basket at all.
+        """
+        # Cookies can only be deleted once the response is processed.
+        request.cookies_to_delete = []
+        request.strategy = SimpleLazyObject(lambda: Selector().strategy(request=request, user=request.user))
+
+        if request.path.startswith(tuple(settings.BASKET_MIDDLEWARE_EXCLUDED_PATHS)):
+            return
+
+        # The basket is loaded lazily, and cached here for the duration of the request.
+        request._basket_cache = None  # pylint: disable=protected-access
+
+        def load_full_basket():
+            basket = self.get_basket(request)
+            basket.strategy = request.strategy
+            self.apply_offers_to_basket(request, basket)
+            return basket
+
+        def load_basket_hash():
+            basket = self.get_basket(request)
+            if basket.id:
+                return self.get_basket_hash(basket.id)
+            return None
+
+        request.basket = SimpleLazyObject(load_full_basket)
+        request.basket_hash = SimpleLazyObject(load_basket_hash)
+
+    def process_template_response(self, request, response):
+        """ Adds the basket to the context of template responses, except for requests which have no basket. """
+        # DRF responses are template responses too, and requests to excluded paths have no basket.
+        if not hasattr(request, 'basket'):
+            return response
+        return super(BasketMiddleware, self).process_template_response(request, response)
+
     def get_cookie_key(self, request):
         """
         Returns the cookie name to use for storing a cookie basket.
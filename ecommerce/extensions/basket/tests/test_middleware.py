@@ -1,6 +1,10 @@
 from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
 from django.test.client import RequestFactory
+from django.utils.functional import SimpleLazyObject
 from oscar.core.loading import get_model
 from oscar.test.factories import BasketFactory
 
@@ -8,6 +12,7 @@ from ecommerce.extensions.basket import middleware
 from ecommerce.tests.testcases import TestCase
 
 Basket = get_model('basket', 'Basket')
+User = get_user_model()
 
 
 class BasketMiddlewareTests(TestCase):
@@ -89,3 +94,42 @@ class BasketMiddlewareTests(TestCase):
         """ Verify the method returns a site-specific key. """
         expected = '{base}_{site_id}'.format(base=settings.OSCAR_BASKET_COOKIE_OPEN, site_id=self.site.id)
         self.assertEqual(self.middleware.get_cookie_key(self.request), expected)
+
+    def test_basket_and_strategy_loaded_lazily(self):
+        """ Verify neither the user, nor the strategy, nor the basket is loaded until it is first used. """
+        user = self.create_user()
+        request = RequestFactory().get('/basket/')
+        request.user = SimpleLazyObject(lambda: User.objects.get(id=user.id))
+        request.site = self.site
+
+        with self.assertNumQueries(0):
+            self.middleware.process_request(request)
+            self.middleware.process_response(request, HttpResponse())
+
+        self.assertEqual(request.basket.owner, user)
+        self.assertIs(request.basket.strategy, request.strategy)
+        self.assertEqual(request.strategy.user, user)
+
+    def test_excluded_paths(self):
+        """ Verify requests to excluded paths get a strategy, but no basket. """
+        request = RequestFactory().get('/api/v2/orders/')
+        request.user = self.create_user()
+        request.site = self.site
+
+        with self.assertNumQueries(0):
+            self.middleware.process_request(request)
+            self.middleware.process_response(request, HttpResponse())
+
+        self.assertFalse(hasattr(request, 'basket'))
+        self.assertEqual(request.strategy.user, request.user)
+        self.assertFalse(Basket.objects.filter(owner=request.user).exists())
+
+    def test_excluded_paths_api_response(self):
+        """ Verify API responses, which are template responses, are returned for requests without a basket. """
+        user = self.create_user()
+        self.client.login(username=user.username, password=self.password)
+
+        response = self.client.get(reverse('api:v2:order-list'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Basket.objects.filter(owner=user).exists())
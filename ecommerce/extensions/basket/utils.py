@@ -9,6 +9,7 @@ from oscar.core.loading import get_class, get_model
 import pytz
 
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
+from ecommerce.courses.models import Course
 from ecommerce.referrals.models import Referral
 
 Applicator = get_class('offer.utils', 'Applicator')
@@ -55,40 +56,32 @@ def prepare_basket(request, product, voucher=None):
     return basket
 
 
-def get_basket_switch_data(product):
+def get_basket_switch_data(product, stock_record=None):
+    """
+    Returns the text and partner SKU of the link switching the basket between a course seat
+    and the corresponding enrollment code.
+
+    Arguments:
+        product (Product): Seat or enrollment code product in the basket.
+        stock_record (StockRecord): Stock record of the product in the basket. Defaults to the product's first one.
+
+    Returns:
+        tuple: Switch link text and partner SKU, either of which may be None.
+    """
     product_class_name = product.get_product_class().name
-    structure = product.structure
     switch_link_text = None
 
     if product_class_name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
         switch_link_text = _('Click here to just purchase an enrollment for yourself')
-        structure = 'child'
     elif product_class_name == SEAT_PRODUCT_CLASS_NAME:
         switch_link_text = _('Click here to purchase multiple seats in this course')
-        structure = 'standalone'
-
-    stock_records = StockRecord.objects.filter(
-        product__course_id=product.course_id,
-        product__structure=structure
-    )
-
-    # Determine the proper partner SKU to embed in the single/multiple basket switch link
-    # The logic here is a little confusing.  "Seat" products have "certificate_type" attributes, and
-    # "Enrollment Code" products have "seat_type" attributes.  If the basket is in single-purchase
-    # mode, we are working with a Seat product and must present the 'buy multiple' switch link and
-    # SKU from the corresponding Enrollment Code product.  If the basket is in multi-purchase mode,
-    # we are working with an Enrollment Code product and must present the 'buy single' switch link
-    # and SKU from the corresponding Seat product.
+
+    # The seat and enrollment code SKUs of a course are mapped to one another when the
+    # course's seats are created or updated, so the switch SKU is a single cache lookup.
     partner_sku = None
-    product_cert_type = getattr(product.attr, 'certificate_type', None)
-    product_seat_type = getattr(product.attr, 'seat_type', None)
-    for stock_record in stock_records:
-        stock_record_cert_type = getattr(stock_record.product.attr, 'certificate_type', None)
-        stock_record_seat_type = getattr(stock_record.product.attr, 'seat_type', None)
-        if (product_seat_type and product_seat_type == stock_record_cert_type) or \
-           (product_cert_type and product_cert_type == stock_record_seat_type):
-            partner_sku = stock_record.partner_sku
-            break
+    stock_record = stock_record or product.stockrecords.first()
+    if product.course_id and stock_record:
+        partner_sku = Course.get_switch_sku_map(product.course_id).get(stock_record.partner_sku)
     return switch_link_text, partner_sku
 
 
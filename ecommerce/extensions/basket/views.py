@@ -15,8 +15,11 @@ from slumber.exceptions import SlumberBaseException
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
 from ecommerce.core.exceptions import SiteConfigurationError
 from ecommerce.core.url_utils import get_lms_url
-from ecommerce.courses.utils import get_certificate_type_display_value, get_course_info_from_catalog, mode_for_seat
+from ecommerce.courses.utils import (
+    get_certificate_type_display_value, get_course_runs_info_from_catalog, mode_for_seat
+)
 from ecommerce.extensions.analytics.utils import prepare_analytics_data
+from ecommerce.extensions.api import data as data_api
 from ecommerce.extensions.basket.utils import get_basket_switch_data, prepare_basket
 from ecommerce.extensions.offer.utils import format_benefit_value
 from ecommerce.extensions.partner.shortcuts import get_partner_for_site
@@ -25,7 +28,6 @@ from ecommerce.extensions.payment.forms import PaymentForm
 
 Benefit = get_model('offer', 'Benefit')
 logger = logging.getLogger(__name__)
-StockRecord = get_model('partner', 'StockRecord')
 Voucher = get_model('voucher', 'Voucher')
 
 
@@ -46,9 +48,8 @@ class BasketSingleItemView(View):
 
         voucher = Voucher.objects.get(code=code) if code else None
 
-        try:
-            product = StockRecord.objects.get(partner=partner, partner_sku=sku).product
-        except StockRecord.DoesNotExist:
+        product = data_api.get_products([sku], partner=partner).get(sku)
+        if product is None:
             return HttpResponseBadRequest(_('SKU [{sku}] does not exist.').format(sku=sku))
 
         # If the product isn't available then there's no reason to continue with the basket addition
@@ -67,7 +68,7 @@ class BasketSingleItemView(View):
                         'User [%s] attempted to repurchase the [%s] seat of course [%s]',
                         request.user.username,
                         mode_for_seat(product),
-                        product.attr.course_key
+                        product.seat_attr.course_key
                     )
                     msg = _('You are already enrolled in {course}.').format(course=product.course.name)
                     return HttpResponseBadRequest(msg)
@@ -92,35 +93,57 @@ class BasketSummaryView(BasketView):
         """
         seat_type = None
         if product.get_product_class().name == SEAT_PRODUCT_CLASS_NAME:
-            seat_type = get_certificate_type_display_value(product.attr.certificate_type)
+            seat_type = get_certificate_type_display_value(product.seat_attr.certificate_type)
         elif product.get_product_class().name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
-            seat_type = get_certificate_type_display_value(product.attr.seat_type)
+            seat_type = get_certificate_type_display_value(product.seat_attr.seat_type)
         return seat_type
 
-    def _get_course_data(self, product):
+    def _get_course_runs(self, lines):
+        """
+        Return catalog information about the course runs of the given basket lines, retrieved at once.
+
+        Args:
+            lines (list): List of basket lines.
+        Returns:
+            Dictionary mapping course keys to course run information. Empty if the Catalog Service fails.
+        """
+        course_keys = [
+            line.product.seat_attr.course_key for line in lines
+            if line.product.get_product_class().name in (SEAT_PRODUCT_CLASS_NAME, ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
+        ]
+        if not course_keys:
+            return {}
+
+        try:
+            return get_course_runs_info_from_catalog(self.request.site, course_keys)
+        except (ConnectionError, SlumberBaseException, Timeout):
+            for course_key in course_keys:
+                logger.exception('Failed to retrieve data from Catalog Service for course [%s].', course_key)
+            return {}
+
+    def _get_course_data(self, product, course_runs):
         """
         Return course data.
 
         Args:
             product (Product): A product that has course_key as attribute (seat or bulk enrollment coupon)
+            course_runs (dict): Course run information, keyed by course key, as returned by _get_course_runs
         Returns:
             Dictionary containing course name, course key, course image URL and description.
         """
-        course_key = CourseKey.from_string(product.attr.course_key)
+        course_key = CourseKey.from_string(product.seat_attr.course_key)
         course_name = None
         image_url = None
         short_description = None
 
-        try:
-            course = get_course_info_from_catalog(self.request.site, course_key)
+        course = course_runs.get(unicode(course_key))
+        if course:
             try:
                 image_url = course['image']['src']
             except (KeyError, TypeError):
                 image_url = ''
             short_description = course.get('short_description', '')
             course_name = course.get('title', '')
-        except (ConnectionError, SlumberBaseException, Timeout):
-            logger.exception('Failed to retrieve data from Catalog Service for course [%s].', course_key)
 
         return {
             'product_title': course_name,
@@ -148,16 +171,17 @@ class BasketSummaryView(BasketView):
         lines_data = []
         show_voucher_form = True
         switch_link_text = partner_sku = ''
+        course_runs = self._get_course_runs(lines)
 
         for line in lines:
             product_class_name = line.product.get_product_class().name
             if product_class_name == 'Seat':
-                line_data = self._get_course_data(line.product)
-                if (getattr(line.product.attr, 'id_verification_required', False) and
-                        line.product.attr.certificate_type != 'credit'):
+                line_data = self._get_course_data(line.product, course_runs)
+                if (getattr(line.product.seat_attr, 'id_verification_required', False) and
+                        line.product.seat_attr.certificate_type != 'credit'):
                     display_verification_message = True
             elif product_class_name == 'Enrollment Code':
-                line_data = self._get_course_data(line.product)
+                line_data = self._get_course_data(line.product, course_runs)
                 show_voucher_form = False
             else:
                 line_data = {
@@ -169,7 +193,7 @@ class BasketSummaryView(BasketView):
             # TODO: handle these links for multi-line baskets.
             if self.request.site.siteconfiguration.enable_enrollment_codes:
                 # Get variables for the switch link that toggles from enrollment codes and seat.
-                switch_link_text, partner_sku = get_basket_switch_data(line.product)
+                switch_link_text, partner_sku = get_basket_switch_data(line.product, line.stockrecord)
 
             if line.has_discount:
                 benefit = self.request.basket.applied_offers().values()[0].benefit
@@ -0,0 +1,67 @@
+"""
+Management command that stores the seat attribute snapshot of products created before snapshots were stored.
+
+Products without a stored snapshot read their seat attributes from their attribute values.
+"""
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management import BaseCommand
+from django.db.models import Prefetch
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.catalogue.models import SEAT_ATTRIBUTE_CODES
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+class Command(BaseCommand):
+    help = 'Store the seat attribute snapshot of products created before snapshots were stored.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            default=1000,
+                            type=int,
+                            help='Size of each batch of products to be backfilled.')
+        # Sleeping between each batch gives MySQL time to process other connections.
+        parser.add_argument('-s', '--sleep-seconds',
+                            action='store',
+                            dest='sleep_seconds',
+                            default=1,
+                            type=int,
+                            help='Seconds to sleep between each batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Product.objects.filter(seat_attributes__isnull=True).order_by('id').only('id').prefetch_related(
+            Prefetch(
+                'attribute_values',
+                queryset=ProductAttributeValue.objects.filter(
+                    attribute__code__in=SEAT_ATTRIBUTE_CODES
+                ).select_related('attribute'),
+                to_attr='seat_attribute_values'
+            )
+        )
+
+        last_id = 0
+        backfilled = 0
+        while True:
+            products = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not products:
+                break
+
+            for product in products:
+                # Updating the rows directly does not add to the history of the products.
+                seat_attributes = {value.attribute.code: value.value for value in product.seat_attribute_values}
+                Product.objects.filter(id=product.id).update(seat_attributes=seat_attributes)
+
+            last_id = products[-1].id
+            backfilled += len(products)
+            self.stderr.write('Backfilled [{}] products, through product [{}]. Sleeping.'.format(backfilled, last_id))
+            time.sleep(options['sleep_seconds'])
+
+        self.stderr.write('All [{}] products backfilled.'.format(backfilled))
@@ -7,9 +7,9 @@ from django.conf import settings
 from django.contrib.sites.models import Site
 from django.core.management import BaseCommand
 from django.db import transaction
-import requests
 import waffle
 
+from ecommerce.core.http_client import get_http_client
 from ecommerce.courses.models import Course
 
 
@@ -46,7 +46,7 @@ class MigratedCourse(object):
         url = '{}/courses/{}/'.format(self._build_lms_url('api/commerce/v1'), self.course.id)
         timeout = settings.COMMERCE_API_TIMEOUT
 
-        response = requests.get(url, headers=headers, timeout=timeout)
+        response = get_http_client(self.site_configuration).get(url, headers=headers, timeout=timeout)
         if response.status_code != 200:
             raise Exception('Unable to retrieve course name and verification deadline: [{status}] - {body}'.format(
                 status=response.status_code,
@@ -75,7 +75,7 @@ class MigratedCourse(object):
         }
 
         url = self._build_lms_url('api/course_structure/v0/courses/{}/'.format(self.course.id))
-        response = requests.get(url, headers=headers)
+        response = get_http_client(self.site_configuration).get(url, headers=headers)
 
         if response.status_code != 200:
             raise Exception('Unable to retrieve course name: [{status}] - {body}'.format(
@@ -101,7 +101,7 @@ class MigratedCourse(object):
     def _query_enrollment_api(self, headers):
         """Get modes and pricing from Enrollment API."""
         url = self._build_lms_url('api/enrollment/v1/course/{}?include_expired=1'.format(self.course.id))
-        response = requests.get(url, headers=headers)
+        response = get_http_client(self.site_configuration).get(url, headers=headers)
 
         if response.status_code != 200:
             raise Exception('Unable to retrieve course modes: [{status}] - {body}'.format(
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0020_auto_20161025_1446'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalproduct',
+            name='seat_attributes',
+            field=jsonfield.fields.JSONField(help_text='Snapshot of the seat attribute values of the product, kept in sync when they are saved.', null=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='seat_attributes',
+            field=jsonfield.fields.JSONField(help_text='Snapshot of the seat attribute values of the product, kept in sync when they are saved.', null=True, blank=True),
+        ),
+    ]
@@ -1,16 +1,81 @@
 # noinspection PyUnresolvedReferences
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
+from jsonfield.fields import JSONField
 from oscar.apps.catalogue.abstract_models import AbstractProduct, AbstractProductAttributeValue
 from simple_history.models import HistoricalRecords
 
 
+# Codes of the attributes of seats and enrollment codes stored in the seat attribute snapshot of their products.
+SEAT_ATTRIBUTE_CODES = ('certificate_type', 'course_key', 'credit_provider', 'id_verification_required', 'seat_type')
+
+
+class SeatAttributes(object):
+    """ Read-only attribute access to a seat attribute snapshot. Missing attributes raise AttributeError,
+    like those of Oscar's attribute container. """
+
+    def __init__(self, values):
+        self.__dict__.update(values)
+
+
 class Product(AbstractProduct):
     course = models.ForeignKey('courses.Course', null=True, blank=True, related_name='products')
     expires = models.DateTimeField(null=True, blank=True,
                                    help_text=_('Last date/time on which this product can be purchased.'))
+    seat_attributes = JSONField(
+        blank=True,
+        null=True,
+        help_text=_('Snapshot of the seat attribute values of the product, kept in sync when they are saved.')
+    )
     history = HistoricalRecords()
 
+    def save(self, *args, **kwargs):
+        if self.pk is None and self.seat_attributes is None:
+            # The attribute values of a new product are all saved after it, and added to its snapshot.
+            self.seat_attributes = {}
+        super(Product, self).save(*args, **kwargs)
+
+    @property
+    def seat_attr(self):
+        """
+        Returns the seat attributes (see SEAT_ATTRIBUTE_CODES) of the product without querying attribute values.
+
+        Products whose snapshot has not been backfilled yet fall back to their attribute container.
+        """
+        if self.seat_attributes is None:
+            return self.attr
+        return SeatAttributes(self.seat_attributes)
+
+    def read_seat_attributes(self):
+        """ Returns the seat attribute snapshot of the product, read from its stored attribute values. """
+        values = self.attribute_values.filter(attribute__code__in=SEAT_ATTRIBUTE_CODES).select_related('attribute')
+        return {value.attribute.code: value.value for value in values}
+
+    def sync_seat_attribute(self, code, value):
+        """
+        Stores a saved or deleted attribute value in the seat attribute snapshot of the product.
+
+        Arguments:
+            code (str): Code of the attribute.
+            value: The saved value, or None if the value was deleted.
+        """
+        if code not in SEAT_ATTRIBUTE_CODES:
+            return
+
+        if self.seat_attributes is None:
+            seat_attributes = self.read_seat_attributes()
+        else:
+            seat_attributes = dict(self.seat_attributes)
+            if value is None or value == '':
+                seat_attributes.pop(code, None)
+            else:
+                seat_attributes[code] = value
+
+        if seat_attributes != self.seat_attributes:
+            # Updating the row directly does not add to the history of the product.
+            self.seat_attributes = seat_attributes
+            Product.objects.filter(pk=self.pk).update(seat_attributes=seat_attributes)
+
 
 class ProductAttributeValue(AbstractProductAttributeValue):
     history = HistoricalRecords()
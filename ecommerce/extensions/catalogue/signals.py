@@ -0,0 +1,15 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+@receiver(post_save, sender=ProductAttributeValue, dispatch_uid='catalogue.sync_saved_seat_attribute')
+def sync_saved_seat_attribute(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    instance.product.sync_seat_attribute(instance.attribute.code, instance.value)
+
+
+@receiver(post_delete, sender=ProductAttributeValue, dispatch_uid='catalogue.sync_deleted_seat_attribute')
+def sync_deleted_seat_attribute(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    instance.product.sync_seat_attribute(instance.attribute.code, None)
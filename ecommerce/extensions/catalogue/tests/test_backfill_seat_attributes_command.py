@@ -0,0 +1,22 @@
+from django.core.management import call_command
+from oscar.core.loading import get_model
+
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Product = get_model('catalogue', 'Product')
+
+
+class BackfillSeatAttributesCommandTests(CourseCatalogTestMixin, TestCase):
+    def test_backfill(self):
+        """ Verify the command stores the seat attribute snapshot of every product without one, in batches. """
+        course = CourseFactory()
+        seats = [course.create_or_update_seat(seat_type, False, 0, self.partner) for seat_type in ('audit', 'verified')]
+        snapshots = {product.id: product.seat_attributes for product in Product.objects.all()}
+        Product.objects.update(seat_attributes=None)
+
+        call_command('backfill_seat_attributes', batch_size=1, sleep_seconds=0)
+
+        self.assertEqual({product.id: product.seat_attributes for product in Product.objects.all()}, snapshots)
+        self.assertEqual(Product.objects.get(id=seats[1].id).seat_attributes['certificate_type'], 'verified')
@@ -0,0 +1,54 @@
+from oscar.core.loading import get_model
+
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.tests.testcases import TestCase
+
+Product = get_model('catalogue', 'Product')
+
+
+class ProductTests(CourseCatalogTestMixin, TestCase):
+    def setUp(self):
+        super(ProductTests, self).setUp()
+        self.course = CourseFactory()
+        self.seat = self.course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT')
+
+    def test_seat_attributes_synced(self):
+        """ Verify saved and deleted seat attribute values are stored in the snapshot of their product. """
+        expected = {
+            'certificate_type': 'credit',
+            'course_key': self.course.id,
+            'credit_provider': 'MIT',
+            'id_verification_required': True,
+        }
+        self.assertEqual(Product.objects.get(id=self.seat.id).seat_attributes, expected)
+
+        self.seat.attr.credit_provider = None
+        self.seat.attr.id_verification_required = False
+        self.seat.save()
+        expected.pop('credit_provider')
+        expected['id_verification_required'] = False
+        self.assertEqual(Product.objects.get(id=self.seat.id).seat_attributes, expected)
+
+    def test_seat_attr(self):
+        """ Verify seat attributes are read from the snapshot, without querying attribute values. """
+        seat = Product.objects.get(id=self.seat.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(seat.seat_attr.certificate_type, 'credit')
+            self.assertEqual(seat.seat_attr.course_key, self.course.id)
+            self.assertIsNone(getattr(seat.seat_attr, 'seat_type', None))
+
+    def test_seat_attr_without_snapshot(self):
+        """ Verify products without a snapshot read their attribute values, and get a snapshot once one is saved. """
+        Product.objects.filter(id=self.seat.id).update(seat_attributes=None)
+        seat = Product.objects.get(id=self.seat.id)
+        self.assertEqual(seat.seat_attr.certificate_type, 'credit')
+
+        seat.attr.credit_provider = 'Harvard'
+        seat.save()
+        self.assertEqual(Product.objects.get(id=self.seat.id).seat_attributes, {
+            'certificate_type': 'credit',
+            'course_key': self.course.id,
+            'credit_provider': 'Harvard',
+            'id_verification_required': True,
+        })
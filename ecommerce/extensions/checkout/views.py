@@ -145,7 +145,7 @@ class ReceiptResponseView(ThankYouView):
         context.update({
             'payment_method': self.get_payment_method(order),
             'fire_tracking_events': self.request.session.pop('fire_tracking_events', False),
-            'display_credit_messaging': self.order_contains_credit_seat(order),
+            'display_credit_messaging': order.contains_credit_seat,
         })
         context.update(self.get_order_verification_context(order))
         return context
@@ -173,12 +173,6 @@ class ReceiptResponseView(ThankYouView):
             return source.source_type.name
         return None
 
-    def order_contains_credit_seat(self, order):
-        for line in order.lines.all():
-            if getattr(line.product.attr, 'credit_provider', None):
-                return True
-        return False
-
     def get_order_verification_context(self, order):
         context = {}
         verified_course_id = None
@@ -188,8 +182,8 @@ class ReceiptResponseView(ThankYouView):
             for line in order.lines.all():
                 product = line.product
 
-                if not verified_course_id and getattr(product.attr, 'id_verification_required', False):
-                    verified_course_id = product.attr.course_key
+                if not verified_course_id and getattr(product.seat_attr, 'id_verification_required', False):
+                    verified_course_id = product.seat_attr.course_key
 
             if verified_course_id:
                 context.update({
@@ -4,9 +4,10 @@ from django.conf import settings
 from django.contrib import messages
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.dashboard.users.views import UserDetailView as CoreUserDetailView
-import requests
 import waffle
 
+from ecommerce.core.circuit_breaker import LMS_ENROLLMENT_API
+from ecommerce.core.http_client import get_http_client
 from ecommerce.core.url_utils import get_lms_enrollment_api_url
 
 
@@ -34,7 +35,9 @@ class UserDetailView(CoreUserDetailView):
                 'X-Edx-Api-Key': settings.EDX_API_KEY
             }
 
-            response = requests.get(url, headers=headers, timeout=timeout)
+            response = get_http_client(self.request.site.siteconfiguration).get(
+                url, headers=headers, timeout=timeout, circuit=LMS_ENROLLMENT_API
+            )
 
             status_code = response.status_code
             if status_code == 200:
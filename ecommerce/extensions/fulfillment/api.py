@@ -6,10 +6,14 @@ can successfully fulfill the product. Success can be reported back based on each
 
 """
 import logging
+from collections import OrderedDict
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.utils import importlib
 from django.utils.timezone import now
+from oscar.core.loading import get_model
 
 from ecommerce.extensions.fulfillment import exceptions
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
@@ -18,6 +22,11 @@ from ecommerce.extensions.refund.status import REFUND_LINE
 
 logger = logging.getLogger(__name__)
 
+FulfillmentRetry = get_model('fulfillment', 'FulfillmentRetry')
+
+# Relations followed to get the product class of a line's product, see Product.get_product_class.
+LINE_PRODUCT_CLASS_RELATIONS = ('product__product_class', 'product__parent__product_class')
+
 
 def fulfill_order(order, lines):
     """ Fulfills line items in an Order
@@ -43,66 +52,185 @@ def fulfill_order(order, lines):
         logger.error(error_msg)
         raise exceptions.IncorrectOrderStatusError(error_msg)
 
-    # Construct a dict of lines by their product type.
-    line_items = list(lines.all())
+    line_items = list(lines.all().select_related(*LINE_PRODUCT_CLASS_RELATIONS))
 
     try:
-        # Iterate over the Fulfillment Modules defined in our configuration and determine if they support
-        # any of the lines in the order. Fulfill line items in the order they are designated by the configuration.
-        # Remaining line items should be marked with a fulfillment error since we have no configuration that
-        # allows them to be fulfilled.
-        for module_class in get_fulfillment_modules():
-            module = module_class()
-            supported_lines = module.get_supported_lines(line_items)
-            if supported_lines:
-                line_items = list(set(line_items) - set(supported_lines))
-                module.fulfill_product(order, supported_lines)
-
-        # Check to see if any line items in the order have not been accounted for by a FulfillmentModule
-        # Any product does not line up with a module, we have to mark a fulfillment error.
-        for line in line_items:
-            product_type = line.product.get_product_class().name
-            logger.error("Product Type [%s] does not have an associated Fulfillment Module. It cannot be fulfilled.",
-                         product_type)
-            line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+        # Hand every line to the first Fulfillment Module defined in our configuration that supports it. Modules
+        # fulfill their lines in the order they are designated by the configuration. Remaining line items should be
+        # marked with a fulfillment error since we have no configuration that allows them to be fulfilled.
+        lines_by_module, unsupported_lines = get_fulfillment_registry().group_lines(line_items)
+        for module, supported_lines in lines_by_module.items():
+            module.fulfill_product(order, supported_lines)
+
+        _set_unsupported_lines_status(unsupported_lines)
     except Exception:   # pylint: disable=broad-except
         logger.exception('An unexpected error occurred while fulfilling order [%s].', order.number)
     finally:
-        # Check if all lines are successful, or there were errors, and set the status of the Order.
-        order_status = ORDER.COMPLETE
-        for line in lines.all():
-            if line.status != LINE.COMPLETE:
-                logger.error('There was an error while fulfilling order [%s]', order.number)
-                order_status = ORDER.FULFILLMENT_ERROR
-                break
-
-        order.set_status(order_status)
-
-        elapsed = now() - order.date_placed
-        logger.info(
-            "Finished fulfilling order [%s] with status [%s]. [%s] seconds elapsed since placement.",
-            order.number,
-            order.status,
-            elapsed.total_seconds()
+        _set_fulfilled_order_status(order, lines)
+        return order  # pylint: disable=lost-exception
+
+
+def fulfill_orders(orders):
+    """ Fulfills line items in several Orders
+
+    Behaves like calling fulfill_order for every order, except that the lines of all orders supported by a
+    Fulfillment Module are handed to it together, so modules able to fulfill lines in bulk, such as enrolling
+    every student of a course with one request, can do so. Orders which cannot be fulfilled are skipped.
+
+    Args:
+        orders (List of Orders): The Orders to fulfill. The status of every Order may be altered based on
+            fulfilling its line items.
+
+    Returns:
+        The list of Orders which were fulfilled, or attempted to be.
+    """
+    fulfillable_orders = []
+    for order in orders:
+        if ORDER.COMPLETE in order.available_statuses():
+            fulfillable_orders.append(order)
+        else:
+            logger.error(
+                "Order [%s] has a current status of [%s] which cannot be fulfilled.", order.number, order.status
+            )
+
+    logger.info("Attempting to fulfill products for [%d] orders", len(fulfillable_orders))
+    line_items = [
+        line for order in fulfillable_orders
+        for line in order.lines.all().select_related(*LINE_PRODUCT_CLASS_RELATIONS)
+    ]
+
+    try:
+        lines_by_module, unsupported_lines = get_fulfillment_registry().group_lines(line_items)
+        for module, supported_lines in lines_by_module.items():
+            module.fulfill_lines_in_bulk(supported_lines)
+
+        _set_unsupported_lines_status(unsupported_lines)
+    except Exception:   # pylint: disable=broad-except
+        logger.exception('An unexpected error occurred while fulfilling [%d] orders.', len(fulfillable_orders))
+    finally:
+        for order in fulfillable_orders:
+            _set_fulfilled_order_status(order, order.lines)
+
+    return fulfillable_orders
+
+
+def _set_unsupported_lines_status(lines):
+    """ Marks lines which no Fulfillment Module supports with a fulfillment error. """
+    for line in lines:
+        product_type = line.product.get_product_class().name
+        logger.error("Product Type [%s] does not have an associated Fulfillment Module. It cannot be fulfilled.",
+                     product_type)
+        line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+
+
+def _set_fulfilled_order_status(order, lines):
+    """ Sets the status of a fulfilled Order, checking if all lines are successful or there were errors.
+
+    Orders whose lines failed with a network error or timeout are scheduled to be fulfilled again in the background.
+    """
+    order_status = ORDER.COMPLETE
+    for line in lines.all():
+        if line.status != LINE.COMPLETE:
+            logger.error('There was an error while fulfilling order [%s]', order.number)
+            order_status = ORDER.FULFILLMENT_ERROR
+            break
+
+    order.set_status(order_status)
+    if order_status == ORDER.FULFILLMENT_ERROR:
+        FulfillmentRetry.schedule(order)
+
+    elapsed = now() - order.date_placed
+    logger.info(
+        "Finished fulfilling order [%s] with status [%s]. [%s] seconds elapsed since placement.",
+        order.number,
+        order.status,
+        elapsed.total_seconds()
+    )
+
+
+class FulfillmentModuleRegistry(object):
+    """ Fulfillment Modules declared in settings, loaded and instantiated once, and indexed by product class.
+
+    Modules declaring the product_class_names they support are matched to lines by the name of the lines' product
+    class alone. Other modules are asked whether they support every line of a product class they may support.
+    """
+
+    def __init__(self, module_paths):
+        self.module_classes = []
+        for cls_path in module_paths:
+            try:
+                module_path, _, name = cls_path.rpartition('.')
+                self.module_classes.append(getattr(importlib.import_module(module_path), name))
+            except (ImportError, ValueError, AttributeError):
+                logger.exception("Could not load module at [%s]", cls_path)
+
+        self.modules = [module_class() for module_class in self.module_classes]
+        self._modules_by_product_class = {}
+
+    def get_modules_for_product_class(self, product_class_name):
+        """ Returns the modules which may support lines of the given product class, in the order they are declared. """
+        modules = self._modules_by_product_class.get(product_class_name)
+        if modules is None:
+            modules = self._modules_by_product_class[product_class_name] = [
+                module for module in self.modules
+                if module.product_class_names is None or product_class_name in module.product_class_names
+            ]
+        return modules
+
+    def get_modules_for_line(self, line):
+        """ Returns the modules which support the given line, in the order they are declared. """
+        return [
+            module for module in self.get_modules_for_product_class(line.product.get_product_class().name)
+            if module.product_class_names is not None or module.supports_line(line)
+        ]
+
+    def group_lines(self, lines):
+        """ Groups lines by the first module, in the order they are declared, which supports them.
+
+        Args:
+            lines (List of Lines): Order Lines to be fulfilled.
+
+        Returns:
+            tuple: An OrderedDict of the lines supported by every module, in the order the modules are declared,
+                and the list of lines no module supports.
+        """
+        lines_by_module = {}
+        unsupported_lines = []
+        for line in lines:
+            modules = self.get_modules_for_line(line)
+            if modules:
+                lines_by_module.setdefault(modules[0], []).append(line)
+            else:
+                unsupported_lines.append(line)
+
+        lines_by_module = OrderedDict(
+            (module, lines_by_module[module]) for module in self.modules if module in lines_by_module
         )
+        return lines_by_module, unsupported_lines
 
-        return order  # pylint: disable=lost-exception
 
+_registries = {}
 
-def get_fulfillment_modules():
-    """ Retrieves all fulfillment modules declared in settings. """
-    module_paths = getattr(settings, 'FULFILLMENT_MODULES', [])
-    modules = []
 
-    for cls_path in module_paths:
-        try:
-            module_path, _, name = cls_path.rpartition('.')
-            module = getattr(importlib.import_module(module_path), name)
-            modules.append(module)
-        except (ImportError, ValueError, AttributeError):
-            logger.exception("Could not load module at [%s]", cls_path)
+def get_fulfillment_registry():
+    """ Returns the registry of the Fulfillment Modules declared in settings, building it on first use. """
+    module_paths = tuple(getattr(settings, 'FULFILLMENT_MODULES', []))
+    registry = _registries.get(module_paths)
+    if registry is None:
+        registry = _registries[module_paths] = FulfillmentModuleRegistry(module_paths)
+    return registry
 
-    return modules
+
+@receiver(setting_changed, dispatch_uid='fulfillment.reset_fulfillment_registry')
+def reset_fulfillment_registry(setting, **kwargs):  # pylint: disable=unused-argument
+    """ Discards the registries built so far once FULFILLMENT_MODULES changes, e.g. when overridden in tests. """
+    if setting == 'FULFILLMENT_MODULES':
+        _registries.clear()
+
+
+def get_fulfillment_modules():
+    """ Retrieves all fulfillment modules declared in settings. """
+    return list(get_fulfillment_registry().module_classes)
 
 
 def get_fulfillment_modules_for_line(line):
@@ -112,7 +240,7 @@ def get_fulfillment_modules_for_line(line):
     Arguments
         line (Line): Line to be considered for fulfillment.
     """
-    return [module for module in get_fulfillment_modules() if module().supports_line(line)]
+    return [module.__class__ for module in get_fulfillment_registry().get_modules_for_line(line)]
 
 
 def revoke_fulfillment_for_refund(refund):
@@ -122,26 +250,53 @@ def revoke_fulfillment_for_refund(refund):
     Returns
         Boolean: True, if revocation of all lines succeeded; otherwise, False.
     """
-    succeeded = True
-
-    # Refunds corresponding to a total credit of $0 require no revocation. This also
-    # prevents deadlocking with the LMS which occurs when Otto attempts to revoke an
-    # automatically-approved refund.
-    if refund.total_credit_excl_tax == 0:
-        for refund_line in refund.lines.all():
-            refund_line.set_status(REFUND_LINE.COMPLETE)
-    else:
-        # TODO (CCB): As our list of product types and fulfillment modules grows, this may become slow,
-        # and should be updated. Runtime is O(n^2).
-        for refund_line in refund.lines.all():
-            order_line = refund_line.order_line
-            modules = get_fulfillment_modules_for_line(order_line)
-
-            for module in modules:
-                if module().revoke_line(order_line):
-                    refund_line.set_status(REFUND_LINE.COMPLETE)
-                else:
-                    succeeded = False
-                    refund_line.set_status(REFUND_LINE.REVOCATION_ERROR)
+    return refund.id in revoke_fulfillment_for_refunds([refund])
+
+
+def revoke_fulfillment_for_refunds(refunds):
+    """
+    Revokes fulfillment for all lines in several refunds.
+
+    The lines of all refunds supported by a Fulfillment Module are handed to it together, so modules able to
+    revoke lines in bulk, such as unenrolling every student of a cancelled course with one request, can do so.
+
+    Returns
+        set: IDs of the refunds for which revocation of all lines succeeded.
+    """
+    succeeded = set()
+    refund_lines = []
+
+    for refund in refunds:
+        succeeded.add(refund.id)
+
+        # Refunds corresponding to a total credit of $0 require no revocation. This also
+        # prevents deadlocking with the LMS which occurs when Otto attempts to revoke an
+        # automatically-approved refund.
+        if refund.total_credit_excl_tax == 0:
+            for refund_line in refund.lines.all():
+                refund_line.set_status(REFUND_LINE.COMPLETE)
+        else:
+            refund_lines.extend(refund.lines.select_related(
+                'order_line', *('order_line__' + relation for relation in LINE_PRODUCT_CLASS_RELATIONS)
+            ))
+
+    # Every module supporting a line revokes it.
+    registry = get_fulfillment_registry()
+    refund_lines_by_module = OrderedDict((module, []) for module in registry.modules)
+    for refund_line in refund_lines:
+        for module in registry.get_modules_for_line(refund_line.order_line):
+            refund_lines_by_module[module].append(refund_line)
+
+    for module, supported_refund_lines in refund_lines_by_module.items():
+        if not supported_refund_lines:
+            continue
+
+        revoked = module.revoke_lines_in_bulk([refund_line.order_line for refund_line in supported_refund_lines])
+        for refund_line in supported_refund_lines:
+            if revoked[refund_line.order_line.id]:
+                refund_line.set_status(REFUND_LINE.COMPLETE)
+            else:
+                succeeded.discard(refund_line.refund_id)
+                refund_line.set_status(REFUND_LINE.REVOCATION_ERROR)
 
     return succeeded
@@ -10,3 +10,7 @@ class FulfillmentAppConfig(AppConfig):
 
         # noinspection PyUnresolvedReferences
         import ecommerce.extensions.fulfillment.signals  # pylint: disable=unused-variable
+
+        # Load the fulfillment modules once, instead of when the first order is fulfilled.
+        from ecommerce.extensions.fulfillment.api import get_fulfillment_registry
+        get_fulfillment_registry()
@@ -0,0 +1,67 @@
+""" Compares per-line and bulk enrollment of many students in a course against a local Enrollment API stub. """
+
+from __future__ import unicode_literals
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+
+from ecommerce.extensions.fulfillment.modules import EnrollmentFulfillmentModule
+from ecommerce.extensions.fulfillment.tests.stubs import EnrollmentApiStub
+
+User = get_user_model()
+
+COURSE_ID = 'course-v1:edX+Bench+Run'
+MODE = 'verified'
+
+
+class StubEnrollmentFulfillmentModule(EnrollmentFulfillmentModule):
+    """ Enrollment module sending its requests to an Enrollment API stub. """
+
+    def __init__(self, stub):
+        self.stub = stub
+
+    def _get_enrollment_api_url(self):
+        return self.stub.enrollment_api_url
+
+    def _get_bulk_enrollment_api_url(self):
+        return self.stub.bulk_enrollment_api_url
+
+
+class Command(BaseCommand):
+    help = 'Time per-line and bulk enrollment of many students in a course against a local Enrollment API stub.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=200, help='Number of students to enroll.')
+        parser.add_argument('--batch-size', type=int, default=100, help='Students enrolled per bulk request.')
+        parser.add_argument('--latency', type=float, default=0.05, help='Stub response latency in seconds.')
+
+    def handle(self, *args, **options):
+        users = [User(username='bench-student-{}'.format(index)) for index in range(options['students'])]
+        batch_size = options['batch_size']
+
+        with EnrollmentApiStub(latency=options['latency']) as stub, override_settings(EDX_API_KEY='stub'):
+            module = StubEnrollmentFulfillmentModule(stub)
+
+            # pylint: disable=protected-access
+            start = time.time()
+            for user in users:
+                data = {
+                    'user': user.username,
+                    'is_active': True,
+                    'mode': MODE,
+                    'course_details': {'course_id': COURSE_ID},
+                }
+                module._post_to_enrollment_api(data, user=user)
+            per_line = time.time() - start
+
+            start = time.time()
+            for index in range(0, len(users), batch_size):
+                enrollments = [{'user': user.username} for user in users[index:index + batch_size]]
+                module._post_to_bulk_enrollment_api(COURSE_ID, MODE, True, enrollments)
+            bulk = time.time() - start
+
+        self.stdout.write('Enrolled {} students with {:.3f}s stub latency.'.format(len(users), options['latency']))
+        self.stdout.write('Per-line requests: {:.3f}s'.format(per_line))
+        self.stdout.write('Bulk requests of {}: {:.3f}s'.format(batch_size, bulk))
@@ -0,0 +1,67 @@
+""" Compares dispatching order lines to fulfillment modules by loading the modules for every lookup, as
+fulfillment used to, against the fulfillment module registry. """
+
+from __future__ import unicode_literals
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.utils import importlib
+
+from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
+from ecommerce.extensions.fulfillment.api import FulfillmentModuleRegistry
+
+PRODUCT_CLASS_NAMES = ('Seat', 'Coupon', ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
+
+
+class StubLine(object):
+    """ Minimal stand-in for an order Line, exposing the product class used to dispatch it. """
+
+    def __init__(self, product_class_name):
+        self.product = self
+        self.name = product_class_name
+
+    def get_product_class(self):
+        return self
+
+
+def load_modules():
+    module_classes = []
+    for cls_path in settings.FULFILLMENT_MODULES:
+        module_path, _, name = cls_path.rpartition('.')
+        module_classes.append(getattr(importlib.import_module(module_path), name))
+    return module_classes
+
+
+class Command(BaseCommand):
+    help = 'Time dispatching order lines to fulfillment modules, with and without the module registry.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=1000, help='Number of order lines to dispatch.')
+
+    def handle(self, *args, **options):
+        lines = [StubLine(PRODUCT_CLASS_NAMES[index % len(PRODUCT_CLASS_NAMES)]) for index in range(options['lines'])]
+
+        # Fulfilling an order loaded every module and asked it for its supported lines, and revoking a refund
+        # loaded and instantiated every module for every line.
+        start = time.time()
+        remaining_lines = lines
+        for module_class in load_modules():
+            supported_lines = module_class().get_supported_lines(remaining_lines)
+            remaining_lines = list(set(remaining_lines) - set(supported_lines))
+        modules_by_line = [
+            [module_class for module_class in load_modules() if module_class().supports_line(line)] for line in lines
+        ]
+        per_lookup = time.time() - start
+
+        start = time.time()
+        registry = FulfillmentModuleRegistry(settings.FULFILLMENT_MODULES)
+        registry.group_lines(lines)
+        registered_modules_by_line = [registry.get_modules_for_line(line) for line in lines]
+        registered = time.time() - start
+
+        assert [len(modules) for modules in modules_by_line] == [len(modules) for modules in registered_modules_by_line]
+
+        self.stdout.write('Dispatched {} lines to {} fulfillment modules.'.format(len(lines), len(registry.modules)))
+        self.stdout.write('Modules loaded per lookup: {:.3f}s'.format(per_lookup))
+        self.stdout.write('Module registry: {:.3f}s'.format(registered))
@@ -0,0 +1,76 @@
+from __future__ import unicode_literals
+import datetime
+import logging
+import random
+
+from django.conf import settings
+from django.db import models
+from django.utils.timezone import now
+from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
+
+from ecommerce.extensions.fulfillment.status import LINE
+
+logger = logging.getLogger(__name__)
+
+
+class FulfillmentRetry(TimeStampedModel):
+    """ Order whose fulfillment failed with a network error or timeout, retried in the background with backoff. """
+    PENDING, IN_PROGRESS, COMPLETE, FAILED = 'Pending', 'In Progress', 'Complete', 'Failed'
+    status_choices = (
+        (PENDING, _('Pending')),
+        (IN_PROGRESS, _('In Progress')),
+        (COMPLETE, _('Complete')),
+        (FAILED, _('Failed')),
+    )
+    RETRYABLE_LINE_STATUSES = (LINE.FULFILLMENT_NETWORK_ERROR, LINE.FULFILLMENT_TIMEOUT_ERROR)
+
+    order = models.OneToOneField('order.Order', related_name='fulfillment_retry')
+    status = models.CharField(max_length=255, default=PENDING, choices=status_choices, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt = models.DateTimeField(
+        db_index=True,
+        help_text=_('When a pending retry is due, or when a retry in progress is presumed lost.')
+    )
+
+    @classmethod
+    def schedule(cls, order):
+        """ Schedules the fulfillment of an order to be retried, if any of its lines failed with a transient error.
+
+        Orders already waiting for, or being, retried are left alone. Orders whose retries previously completed
+        or failed, and which failed again after being fulfilled by other means, start over.
+
+        Args:
+            order (Order): An order whose fulfillment failed.
+
+        Returns:
+            FulfillmentRetry: The retry of the order, or None if it cannot be retried.
+        """
+        if settings.FULFILLMENT_RETRY_MAX_ATTEMPTS < 1 or not cls.has_retryable_lines(order):
+            return None
+
+        retry, created = cls.objects.get_or_create(order=order, defaults={'next_attempt': cls.get_next_attempt(0)})
+        if created or retry.status in (cls.COMPLETE, cls.FAILED):
+            if not created:
+                retry.status = cls.PENDING
+                retry.attempts = 0
+                retry.next_attempt = cls.get_next_attempt(0)
+                retry.save()
+
+            logger.info('Scheduled fulfillment retry of order [%s] at [%s].', order.number, retry.next_attempt)
+
+        return retry
+
+    @classmethod
+    def has_retryable_lines(cls, order):
+        return order.lines.filter(status__in=cls.RETRYABLE_LINE_STATUSES).exists()
+
+    @staticmethod
+    def get_next_attempt(attempts):
+        """ Returns when to make the next attempt after the given number of attempts.
+
+        The delay doubles with every attempt, up to FULFILLMENT_RETRY_MAX_DELAY, and is randomized between half
+        and all of it so that orders which failed together are not all retried together.
+        """
+        delay = min(settings.FULFILLMENT_RETRY_BASE_DELAY * (2 ** attempts), settings.FULFILLMENT_RETRY_MAX_DELAY)
+        return now() + datetime.timedelta(seconds=random.uniform(delay / 2.0, delay))
@@ -7,16 +7,20 @@ import abc
 import datetime
 import json
 import logging
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 
 from django.conf import settings
 from django.core.urlresolvers import reverse
 from oscar.core.loading import get_model
 from rest_framework import status
-import requests
 from requests.exceptions import ConnectionError, Timeout
+from six.moves import zip
 
+from ecommerce.core.circuit_breaker import LMS_BULK_ENROLLMENT_API, LMS_ENROLLMENT_API
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
-from ecommerce.core.url_utils import get_lms_enrollment_api_url
+from ecommerce.core.http_client import get_http_client
+from ecommerce.core.url_utils import get_lms_enrollment_api_url, get_lms_url
 from ecommerce.courses.models import Course
 from ecommerce.courses.utils import mode_for_seat
 from ecommerce.extensions.analytics.utils import audit_log, parse_tracking_context
@@ -41,6 +45,10 @@ class BaseFulfillmentModule(object):  # pragma: no cover
     """
     __metaclass__ = abc.ABCMeta
 
+    # Names of the product classes whose lines are all supported by this module. Modules which leave this unset
+    # are asked whether they support every line with supports_line.
+    product_class_names = None
+
     @abc.abstractmethod
     def supports_line(self, line):
         """
@@ -99,16 +107,50 @@ class BaseFulfillmentModule(object):  # pragma: no cover
         """
         raise NotImplementedError("Revoke method not implemented!")
 
+    def fulfill_lines_in_bulk(self, lines):
+        """ Fulfills the specified lines of any number of orders.
+
+        Modules able to fulfill the lines of several orders together should override this method. By default,
+        the lines of every order are fulfilled with fulfill_product.
+
+        Args:
+            lines (List of Lines): Order Lines, associated with purchased products in any number of Orders.
+
+        Returns:
+            The original set of lines, with new statuses set based on the success or failure of fulfillment.
+        """
+        lines_by_order = OrderedDict()
+        for line in lines:
+            lines_by_order.setdefault(line.order, []).append(line)
+
+        for order, order_lines in lines_by_order.items():
+            self.fulfill_product(order, order_lines)
+
+        return lines
+
+    def revoke_lines_in_bulk(self, lines):
+        """ Revokes the specified lines of any number of orders.
+
+        Modules able to revoke several lines together should override this method. By default,
+        every line is revoked with revoke_line.
+
+        Args:
+            lines (List of Lines): Order Lines to be revoked.
+
+        Returns:
+            dict: True for the ID of every revoked line; otherwise, False.
+        """
+        return {line.id: self.revoke_line(line) for line in lines}
+
 
 class EnrollmentFulfillmentModule(BaseFulfillmentModule):
     """ Fulfillment Module for enrolling students after a product purchase.
 
     Allows the enrollment of a student via purchase of a 'seat'.
     """
+    product_class_names = ('Seat',)
 
-    def _post_to_enrollment_api(self, data, user):
-        enrollment_api_url = get_lms_enrollment_api_url()
-        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+    def _get_enrollment_api_headers(self, user):
         headers = {
             'Content-Type': 'application/json',
             'X-Edx-Api-Key': settings.EDX_API_KEY
@@ -122,7 +164,132 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         if ip:
             headers['X-Forwarded-For'] = ip
 
-        return requests.post(enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout)
+        return headers
+
+    def _get_enrollment_api_url(self):
+        return get_lms_enrollment_api_url()
+
+    def _get_bulk_enrollment_api_url(self):
+        bulk_enrollment_api_path = settings.ENROLLMENT_BULK_API_PATH
+        return get_lms_url(bulk_enrollment_api_path) if bulk_enrollment_api_path else None
+
+    def _post_to_enrollment_api(self, data, user):
+        enrollment_api_url = self._get_enrollment_api_url()
+        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+        headers = self._get_enrollment_api_headers(user)
+
+        return get_http_client().post(
+            enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout, circuit=LMS_ENROLLMENT_API
+        )
+
+    def _post_enrollments(self, enrollments, user):
+        """ Posts the given enrollments to the Enrollment API.
+
+        Enrollments are posted one at a time, unless ENROLLMENT_FULFILLMENT_MAX_WORKERS allows several
+        of them to be posted concurrently.
+
+        Args:
+            enrollments (list): Enrollment API request data, one per line.
+            user (User): The user being enrolled.
+
+        Returns:
+            An iterable of (response, error) tuples in the order of the given enrollments, where error is
+            the ConnectionError or Timeout raised by the request, if any.
+        """
+        if settings.ENROLLMENT_FULFILLMENT_MAX_WORKERS > 1 and len(enrollments) > 1:
+            return self._post_enrollments_concurrently(enrollments, user)
+        return self._post_enrollments_sequentially(enrollments, user)
+
+    def _post_enrollments_sequentially(self, enrollments, user):
+        for data in enrollments:
+            try:
+                yield self._post_to_enrollment_api(data, user=user), None
+            except (ConnectionError, Timeout) as error:
+                yield None, error
+
+    def _post_enrollments_concurrently(self, enrollments, user):
+        # The URL and client are read from the current request and the headers from the user,
+        # neither of which should be touched by the worker threads.
+        enrollment_api_url = self._get_enrollment_api_url()
+        timeout = settings.ENROLLMENT_FULFILLMENT_TIMEOUT
+        headers = self._get_enrollment_api_headers(user)
+        session = get_http_client().session(LMS_ENROLLMENT_API)
+
+        def post(data):
+            try:
+                return session.post(enrollment_api_url, data=json.dumps(data), headers=headers, timeout=timeout), None
+            except (ConnectionError, Timeout) as error:
+                return None, error
+
+        pool = ThreadPool(min(len(enrollments), settings.ENROLLMENT_FULFILLMENT_MAX_WORKERS))
+        try:
+            return pool.map(post, enrollments)
+        finally:
+            pool.close()
+            pool.join()
+
+    def _post_to_bulk_enrollment_api(self, course_key, mode, is_active, enrollments):
+        """ Enrolls, or unenrolls, several users in a course with one request to the bulk enrollment API.
+
+        The bulk enrollment API, found at ENROLLMENT_BULK_API_PATH on the LMS, takes a course, a mode and the
+        enrollments to update, and reports the outcome of every enrollment:
+
+            POST {"course_id": "...", "mode": "verified", "is_active": true,
+                  "enrollments": [{"user": "...", "enrollment_attributes": [...]}]}
+            200 {"results": [{"user": "...", "status_code": 200, "message": "..."}]}
+
+        Args:
+            course_key (str): The course to update the enrollments of.
+            mode (str): The mode of the enrollments.
+            is_active (bool): Whether the users are enrolled, or unenrolled.
+            enrollments (list): Enrollment data, with the username of every user.
+
+        Returns:
+            dict: The outcome of the enrollment of every user reported on, keyed by username. The dict is empty if
+                the bulk enrollment API is not configured or unavailable.
+        """
+        bulk_enrollment_api_url = self._get_bulk_enrollment_api_url()
+        if not bulk_enrollment_api_url:
+            return {}
+
+        data = {
+            'course_id': course_key,
+            'mode': mode,
+            'is_active': is_active,
+            'enrollments': enrollments,
+        }
+        headers = {
+            'Content-Type': 'application/json',
+            'X-Edx-Api-Key': settings.EDX_API_KEY
+        }
+
+        try:
+            response = get_http_client().post(
+                bulk_enrollment_api_url,
+                data=json.dumps(data),
+                headers=headers,
+                timeout=settings.ENROLLMENT_BULK_API_TIMEOUT,
+                circuit=LMS_BULK_ENROLLMENT_API
+            )
+            if response.status_code == status.HTTP_200_OK:
+                return {
+                    result['user']: result for result in response.json()['results']
+                    if isinstance(result.get('status_code'), int)
+                }
+
+            logger.warning(
+                'Bulk enrollment API returned status code [%d] for [%d] enrollments in course [%s]. '
+                'Falling back to one request per enrollment.',
+                response.status_code, len(enrollments), course_key
+            )
+        except (ConnectionError, Timeout, ValueError, KeyError, TypeError, AttributeError):
+            logger.exception(
+                'Bulk enrollment API is unavailable for [%d] enrollments in course [%s]. '
+                'Falling back to one request per enrollment.',
+                len(enrollments), course_key
+            )
+
+        return {}
 
     def supports_line(self, line):
         return line.product.get_product_class().name == 'Seat'
@@ -161,29 +328,17 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
         """
         logger.info("Attempting to fulfill 'Seat' product types for order [%s]", order.number)
 
-        api_key = getattr(settings, 'EDX_API_KEY', None)
-        if not api_key:
-            logger.error(
-                'EDX_API_KEY must be set to use the EnrollmentFulfillmentModule'
-            )
-            for line in lines:
-                line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
-
+        if not self._is_configured(lines):
             return order, lines
 
+        enrollments = []
         for line in lines:
             try:
-                mode = mode_for_seat(line.product)
-                course_key = line.product.attr.course_key
+                mode, course_key, provider = self._get_seat_details(line)
             except AttributeError:
                 logger.error("Supported Seat Product does not have required attributes, [certificate_type, course_key]")
                 line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
                 continue
-            try:
-                provider = line.product.attr.credit_provider
-            except AttributeError:
-                logger.debug("Seat [%d] has no credit_provider attribute. Defaulted to None.", line.product.id)
-                provider = None
 
             data = {
                 'user': order.user.username,
@@ -192,69 +347,84 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
                 'course_details': {
                     'course_id': course_key
                 },
-                'enrollment_attributes': [
-                    {
-                        'namespace': 'order',
-                        'name': 'order_number',
-                        'value': order.number
-                    }
-                ]
+                'enrollment_attributes': self._get_enrollment_attributes(order, provider)
             }
-            if provider:
-                data['enrollment_attributes'].append(
-                    {
-                        'namespace': 'credit',
-                        'name': 'provider_id',
-                        'value': provider
-                    }
-                )
+            enrollments.append((line, mode, course_key, provider, data))
+
+        results = self._post_enrollments([data for __, __, __, __, data in enrollments], order.user)
+        for (line, mode, course_key, provider, __), (response, error) in zip(enrollments, results):
+            self._set_fulfillment_status(order, line, mode, course_key, provider, response=response, error=error)
+        logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
+        return order, lines
+
+    def fulfill_lines_in_bulk(self, lines):
+        """ Fulfills seats purchased by several orders, enrolling the students of a course in bulk.
+
+        Lines are grouped by course and mode, and every group is enrolled with one request to the bulk
+        enrollment API. Lines whose enrollment the bulk API does not report on, or every line of a group
+        when the bulk API is not configured or unavailable, are enrolled one at a time instead.
+
+        Args:
+            lines (List of Lines): Order Lines of any number of orders. These should only be "Seat" products.
+
+        Returns:
+            The original set of lines, with new statuses set based on the success or failure of fulfillment.
+        """
+        logger.info("Attempting to fulfill [%d] 'Seat' product types in bulk", len(lines))
+
+        if not self._is_configured(lines):
+            return lines
+
+        fulfillable_lines = []
+        for line in lines:
             try:
-                response = self._post_to_enrollment_api(data, user=order.user)
-
-                if response.status_code == status.HTTP_200_OK:
-                    line.set_status(LINE.COMPLETE)
-
-                    audit_log(
-                        'line_fulfilled',
-                        order_line_id=line.id,
-                        order_number=order.number,
-                        product_class=line.product.get_product_class().name,
-                        course_id=course_key,
-                        mode=mode,
-                        user_id=order.user.id,
-                        credit_provider=provider,
-                    )
-                else:
-                    try:
-                        data = response.json()
-                        reason = data.get('message')
-                    except Exception:  # pylint: disable=broad-except
-                        reason = '(No detail provided.)'
-
-                    logger.error(
-                        "Fulfillment of line [%d] on order [%s] failed with status code [%d]: %s",
-                        line.id, order.number, response.status_code, reason
-                    )
-                    line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
-            except ConnectionError:
+                self._get_seat_details(line)
+                fulfillable_lines.append(line)
+            except AttributeError:
                 logger.error(
-                    "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
+                    "Supported Seat Product of Line [%d] does not have required attributes, "
+                    "[certificate_type, course_key]", line.id
                 )
-                line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
-            except Timeout:
-                logger.error(
-                    "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
+                line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+
+        for (course_key, mode), group in self._batch_lines_by_enrollment(fulfillable_lines):
+            enrollments = [
+                {
+                    'user': line.order.user.username,
+                    'enrollment_attributes': self._get_enrollment_attributes(line.order, provider)
+                }
+                for line, provider in group
+            ]
+            results = self._post_to_bulk_enrollment_api(course_key, mode, True, enrollments)
+
+            for (line, provider), enrollment in zip(group, enrollments):
+                result = results.get(enrollment['user'])
+                if result:
+                    self._set_fulfillment_status(
+                        line.order, line, mode, course_key, provider,
+                        status_code=result['status_code'], reason=result.get('message')
+                    )
+                    continue
+
+                data = dict(enrollment, is_active=True, mode=mode, course_details={'course_id': course_key})
+                response = error = None
+                try:
+                    response = self._post_to_enrollment_api(data, user=line.order.user)
+                except (ConnectionError, Timeout) as exception:
+                    error = exception
+                self._set_fulfillment_status(
+                    line.order, line, mode, course_key, provider, response=response, error=error
                 )
-                line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
-        logger.info("Finished fulfilling 'Seat' product types for order [%s]", order.number)
-        return order, lines
+
+        logger.info("Finished fulfilling [%d] 'Seat' product types in bulk", len(lines))
+        return lines
 
     def revoke_line(self, line):
         try:
             logger.info('Attempting to revoke fulfillment of Line [%d]...', line.id)
 
             mode = mode_for_seat(line.product)
-            course_key = line.product.attr.course_key
+            course_key = line.product.seat_attr.course_key
             data = {
                 'user': line.order.user.username,
                 'is_active': False,
@@ -267,36 +437,202 @@ class EnrollmentFulfillmentModule(BaseFulfillmentModule):
             response = self._post_to_enrollment_api(data, user=line.order.user)
 
             if response.status_code == status.HTTP_200_OK:
-                audit_log(
-                    'line_revoked',
-                    order_line_id=line.id,
-                    order_number=line.order.number,
-                    product_class=line.product.get_product_class().name,
-                    course_id=course_key,
-                    certificate_type=getattr(line.product.attr, 'certificate_type', ''),
-                    user_id=line.order.user.id
-                )
-
-                return True
+                return self._set_revocation_result(line, mode, course_key, response.status_code)
             else:
                 # check if the error / message are something we can recover from.
                 data = response.json()
                 detail = data.get('message', '(No details provided.)')
-                if response.status_code == 400 and "Enrollment mode mismatch" in detail:
-                    # The user is currently enrolled in different mode than the one
-                    # we are refunding an order for.  Don't revoke that enrollment.
-                    logger.info('Skipping revocation for line [%d]: %s', line.id, detail)
-                    return True
-                else:
-                    logger.error('Failed to revoke fulfillment of Line [%d]: %s', line.id, detail)
+                return self._set_revocation_result(line, mode, course_key, response.status_code, detail)
         except Exception:  # pylint: disable=broad-except
             logger.exception('Failed to revoke fulfillment of Line [%d].', line.id)
 
         return False
 
+    def revoke_lines_in_bulk(self, lines):
+        """ Revokes seats purchased by several orders, unenrolling the students of a course in bulk.
+
+        Lines are grouped by course and mode, and every group is unenrolled with one request to the bulk
+        enrollment API. Lines whose unenrollment the bulk API does not report on, or every line of a group
+        when the bulk API is not configured or unavailable, are revoked one at a time instead.
+
+        Args:
+            lines (List of Lines): Order Lines to be revoked.
+
+        Returns:
+            dict: True for the ID of every revoked line; otherwise, False.
+        """
+        results = {}
+        revocable_lines = []
+        for line in lines:
+            try:
+                self._get_seat_details(line)
+                revocable_lines.append(line)
+            except AttributeError:
+                logger.exception('Failed to revoke fulfillment of Line [%d].', line.id)
+                results[line.id] = False
+
+        for (course_key, mode), group in self._batch_lines_by_enrollment(revocable_lines):
+            logger.info(
+                'Attempting to revoke fulfillment of Lines [%s] in bulk...',
+                ', '.join(str(line.id) for line, __ in group)
+            )
+            bulk_results = self._post_to_bulk_enrollment_api(
+                course_key, mode, False, [{'user': line.order.user.username} for line, __ in group]
+            )
+
+            for line, __ in group:
+                result = bulk_results.get(line.order.user.username)
+                if result:
+                    detail = result.get('message') or '(No details provided.)'
+                    results[line.id] = self._set_revocation_result(
+                        line, mode, course_key, result['status_code'], detail
+                    )
+                else:
+                    results[line.id] = self.revoke_line(line)
+
+        return results
+
+    def _is_configured(self, lines):
+        """ Returns True if enrollments can be made; otherwise, marks the lines with a configuration error. """
+        api_key = getattr(settings, 'EDX_API_KEY', None)
+        if not api_key:
+            logger.error(
+                'EDX_API_KEY must be set to use the EnrollmentFulfillmentModule'
+            )
+            for line in lines:
+                line.set_status(LINE.FULFILLMENT_CONFIGURATION_ERROR)
+
+            return False
+
+        return True
+
+    def _get_seat_details(self, line):
+        """ Returns the mode, course key and credit provider of the seat purchased by the line.
+
+        Raises:
+            AttributeError, if the seat does not have a certificate type or course key.
+        """
+        mode = mode_for_seat(line.product)
+        course_key = line.product.seat_attr.course_key
+        try:
+            provider = line.product.seat_attr.credit_provider
+        except AttributeError:
+            logger.debug("Seat [%d] has no credit_provider attribute. Defaulted to None.", line.product.id)
+            provider = None
+
+        return mode, course_key, provider
+
+    def _get_enrollment_attributes(self, order, provider):
+        enrollment_attributes = [
+            {
+                'namespace': 'order',
+                'name': 'order_number',
+                'value': order.number
+            }
+        ]
+        if provider:
+            enrollment_attributes.append(
+                {
+                    'namespace': 'credit',
+                    'name': 'provider_id',
+                    'value': provider
+                }
+            )
+        return enrollment_attributes
+
+    def _batch_lines_by_enrollment(self, lines):
+        """ Groups lines by the course and mode of their seats, in batches of at most ENROLLMENT_BULK_API_BATCH_SIZE.
+
+        The seats of the lines must have a certificate type and course key.
+
+        Returns:
+            list: ((course key, mode), batch) tuples, where every batch is a list of (line, credit provider) tuples.
+        """
+        groups = OrderedDict()
+        for line in lines:
+            mode, course_key, provider = self._get_seat_details(line)
+            groups.setdefault((course_key, mode), []).append((line, provider))
+
+        batch_size = settings.ENROLLMENT_BULK_API_BATCH_SIZE
+        return [
+            (enrollment, group[start:start + batch_size])
+            for enrollment, group in groups.items()
+            for start in range(0, len(group), batch_size)
+        ]
+
+    def _set_fulfillment_status(
+            self, order, line, mode, course_key, provider, response=None, error=None, status_code=None, reason=None
+    ):
+        """ Sets the status of a line from the outcome of its enrollment, either an Enrollment API response,
+        the error raised requesting it, or the status code and message reported by the bulk enrollment API.
+        """
+        if response is not None:
+            status_code = response.status_code
+            if status_code != status.HTTP_200_OK:
+                try:
+                    data = response.json()
+                    reason = data.get('message')
+                except Exception:  # pylint: disable=broad-except
+                    reason = '(No detail provided.)'
+
+        if isinstance(error, ConnectionError):
+            logger.error(
+                "Unable to fulfill line [%d] of order [%s] due to a network problem", line.id, order.number
+            )
+            line.set_status(LINE.FULFILLMENT_NETWORK_ERROR)
+        elif isinstance(error, Timeout):
+            logger.error(
+                "Unable to fulfill line [%d] of order [%s] due to a request time out", line.id, order.number
+            )
+            line.set_status(LINE.FULFILLMENT_TIMEOUT_ERROR)
+        elif status_code == status.HTTP_200_OK:
+            line.set_status(LINE.COMPLETE)
+
+            audit_log(
+                'line_fulfilled',
+                order_line_id=line.id,
+                order_number=order.number,
+                product_class=line.product.get_product_class().name,
+                course_id=course_key,
+                mode=mode,
+                user_id=order.user.id,
+                credit_provider=provider,
+            )
+        else:
+            logger.error(
+                "Fulfillment of line [%d] on order [%s] failed with status code [%d]: %s",
+                line.id, order.number, status_code, reason
+            )
+            line.set_status(LINE.FULFILLMENT_SERVER_ERROR)
+
+    def _set_revocation_result(self, line, mode, course_key, status_code, detail=None):
+        """ Returns True if the unenrollment of the line's student succeeded, or can safely be skipped. """
+        if status_code == status.HTTP_200_OK:
+            audit_log(
+                'line_revoked',
+                order_line_id=line.id,
+                order_number=line.order.number,
+                product_class=line.product.get_product_class().name,
+                course_id=course_key,
+                certificate_type=getattr(line.product.seat_attr, 'certificate_type', ''),
+                user_id=line.order.user.id
+            )
+
+            return True
+
+        if status_code == 400 and "Enrollment mode mismatch" in detail:
+            # The user is currently enrolled in different mode than the one
+            # we are refunding an order for.  Don't revoke that enrollment.
+            logger.info('Skipping revocation for line [%d]: %s', line.id, detail)
+            return True
+
+        logger.error('Failed to revoke fulfillment of Line [%d]: %s', line.id, detail)
+        return False
+
 
 class CouponFulfillmentModule(BaseFulfillmentModule):
     """ Fulfillment Module for coupons. """
+    product_class_names = ('Coupon',)
 
     def supports_line(self, line):
         """
@@ -353,6 +689,7 @@ class CouponFulfillmentModule(BaseFulfillmentModule):
 
 
 class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
+    product_class_names = (ENROLLMENT_CODE_PRODUCT_CLASS_NAME,)
 
     def supports_line(self, line):
         """
@@ -396,13 +733,13 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
         logger.info(msg)
 
         for line in lines:
-            name = 'Enrollment Code Range for {}'.format(line.product.attr.course_key)
+            name = 'Enrollment Code Range for {}'.format(line.product.seat_attr.course_key)
             seat = Product.objects.filter(
                 attributes__name='course_key',
-                attribute_values__value_text=line.product.attr.course_key
+                attribute_values__value_text=line.product.seat_attr.course_key
             ).get(
                 attributes__name='certificate_type',
-                attribute_values__value_text=line.product.attr.seat_type
+                attribute_values__value_text=line.product.seat_attr.seat_type
             )
             _range, created = Range.objects.get_or_create(name=name)
             if created:
@@ -422,8 +759,7 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
             )
 
             line_vouchers = OrderLineVouchers.objects.create(line=line)
-            for voucher in vouchers:
-                line_vouchers.vouchers.add(voucher)
+            line_vouchers.vouchers.add(*vouchers)
 
             line.set_status(LINE.COMPLETE)
 
@@ -446,7 +782,7 @@ class EnrollmentCodeFulfillmentModule(BaseFulfillmentModule):
         """ Sends an email with enrollment code order information. """
         # Note (multi-courses): Change from a course_name to a list of course names.
         product = order.lines.first().product
-        course = Course.objects.get(id=product.attr.course_key)
+        course = Course.objects.get(id=product.seat_attr.course_key)
         receipt_page_url = get_receipt_page_url(
             order_number=order.number,
             site_configuration=order.site.siteconfiguration
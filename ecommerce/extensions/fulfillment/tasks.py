@@ -0,0 +1,128 @@
+import datetime
+import logging
+from contextlib import contextmanager
+
+from celery import shared_task
+from django.conf import settings
+from django.db.models import Count
+from django.test import RequestFactory
+from django.utils.timezone import now
+from oscar.core.loading import get_class, get_model
+from threadlocals.threadlocals import get_current_request, set_thread_variable
+
+from ecommerce.extensions.fulfillment.signals import SHIPPING_EVENT_NAME
+from ecommerce.extensions.fulfillment.status import LINE
+
+logger = logging.getLogger(__name__)
+
+EventHandler = get_class('order.processing', 'EventHandler')
+FulfillmentRetry = get_model('fulfillment', 'FulfillmentRetry')
+ShippingEventType = get_model('order', 'ShippingEventType')
+
+
+@contextmanager
+def _site_request(site):
+    """
+    Serve a request of the given site as the current request, for as long as the context lasts.
+
+    Fulfillment modules build LMS URLs and HTTP clients from the site of the current request, which tasks do
+    not have. See ecommerce.core.url_utils for the implementation details.
+
+    Args:
+        site (Site): The site to set, if any.
+    """
+    if site is None:
+        yield
+        return
+
+    previous_request = get_current_request()
+    request = RequestFactory().get('/')
+    request.site = site
+    set_thread_variable('request', request)
+    try:
+        yield
+    finally:
+        set_thread_variable('request', previous_request)
+
+
+@shared_task
+def process_fulfillment_retries_task():
+    """
+    Start the fulfillment retries which are due, oldest first.
+
+    Sites never have more than FULFILLMENT_RETRY_SITE_CONCURRENCY retries in progress, so that a backlog of
+    failed orders drains at a steady pace instead of flooding a recovering service.
+
+    Returns:
+        int: Number of retries started.
+    """
+    current_time = now()
+    in_progress = dict(
+        FulfillmentRetry.objects.filter(status=FulfillmentRetry.IN_PROGRESS, next_attempt__gt=current_time)
+        .order_by()
+        .values_list('order__site_id')
+        .annotate(Count('id'))
+    )
+    due = FulfillmentRetry.objects.filter(
+        status__in=(FulfillmentRetry.PENDING, FulfillmentRetry.IN_PROGRESS),
+        next_attempt__lte=current_time
+    ).order_by('next_attempt').values_list('id', 'status', 'next_attempt', 'order__site_id')
+    claimed_until = current_time + datetime.timedelta(seconds=settings.FULFILLMENT_RETRY_CLAIM_TIMEOUT)
+
+    started = 0
+    for retry_id, status, next_attempt, site_id in due.iterator():
+        if in_progress.get(site_id, 0) >= settings.FULFILLMENT_RETRY_SITE_CONCURRENCY:
+            continue
+
+        # Retries already claimed by an overlapping run are left to it.
+        claimed = FulfillmentRetry.objects.filter(id=retry_id, status=status, next_attempt=next_attempt).update(
+            status=FulfillmentRetry.IN_PROGRESS, next_attempt=claimed_until
+        )
+        if claimed:
+            in_progress[site_id] = in_progress.get(site_id, 0) + 1
+            retry_fulfillment_task.delay(retry_id)
+            started += 1
+
+    logger.info('Started [%d] fulfillment retries.', started)
+    return started
+
+
+@shared_task
+def retry_fulfillment_task(retry_id):
+    """
+    Fulfill the lines of an order which are not complete, and schedule the next retry if any failed again.
+
+    Args:
+        retry_id (int): ID of the FulfillmentRetry of the order.
+    """
+    retry = FulfillmentRetry.objects.select_related('order').get(id=retry_id)
+    order = retry.order
+
+    if order.is_fulfillable:
+        retry.attempts += 1
+        lines = order.lines.exclude(status=LINE.COMPLETE)
+        line_quantities = [line.quantity for line in lines]
+        logger.info(
+            'Retrying fulfillment of [%d] lines of order [%s], attempt [%d].',
+            len(line_quantities), order.number, retry.attempts
+        )
+
+        try:
+            shipping_event, __ = ShippingEventType.objects.get_or_create(name=SHIPPING_EVENT_NAME)
+            with _site_request(order.site):
+                EventHandler().handle_shipping_event(order, shipping_event, lines, line_quantities)
+        except Exception:  # pylint: disable=broad-except
+            logger.exception('Failed to retry fulfillment of order [%s].', order.number)
+
+    if not order.is_fulfillable:
+        logger.info('Order [%s] has status [%s], and is no longer retried.', order.number, order.status)
+        retry.status = FulfillmentRetry.COMPLETE
+    elif retry.attempts < settings.FULFILLMENT_RETRY_MAX_ATTEMPTS and FulfillmentRetry.has_retryable_lines(order):
+        retry.status = FulfillmentRetry.PENDING
+        retry.next_attempt = FulfillmentRetry.get_next_attempt(retry.attempts)
+        logger.info('Scheduled fulfillment retry of order [%s] at [%s].', order.number, retry.next_attempt)
+    else:
+        logger.error('Gave up retrying fulfillment of order [%s] after [%d] attempts.', order.number, retry.attempts)
+        retry.status = FulfillmentRetry.FAILED
+
+    retry.save()
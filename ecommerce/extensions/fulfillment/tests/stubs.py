@@ -0,0 +1,59 @@
+""" Local stand-in for the LMS Enrollment API, used by tests and benchmarks of enrollment fulfillment. """
+import json
+import time
+
+from ecommerce.core.stubs import StubRequestHandler, StubServer
+
+ENROLLMENT_API_PATH = '/api/enrollment/v1/enrollment'
+BULK_ENROLLMENT_API_PATH = '/api/enrollment/v1/bulk_enrollment'
+
+
+class EnrollmentApiStubHandler(StubRequestHandler):
+    """ Answers enrollment and bulk enrollment requests after the latency of the server.
+
+    Enrollments in courses whose ID ends with "Failing" fail with a server error, and those in courses
+    whose ID ends with "Mismatch" fail with an enrollment mode mismatch. All others succeed.
+    """
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        data = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, data))
+        time.sleep(self.server.latency)
+
+        course_id = data['course_details']['course_id'] if self.path == ENROLLMENT_API_PATH else data['course_id']
+        status_code, message = self.get_outcome(course_id)
+
+        if self.path == ENROLLMENT_API_PATH:
+            self.respond(status_code, {'message': message})
+        elif self.path == BULK_ENROLLMENT_API_PATH and self.server.bulk_available:
+            self.respond(200, {
+                'results': [
+                    {'user': enrollment['user'], 'status_code': status_code, 'message': message}
+                    for enrollment in data['enrollments']
+                ]
+            })
+        else:
+            self.respond(404, {'message': 'Not found.'})
+
+    def get_outcome(self, course_id):
+        if course_id.endswith('Failing'):
+            return 500, 'Oops!'
+        if course_id.endswith('Mismatch'):
+            return 400, 'Enrollment mode mismatch: active mode=honor, requested mode=verified.'
+        return 200, ''
+
+
+class EnrollmentApiStub(StubServer):
+    """ Enrollment API stand-in serving every request in a thread of its own, for use as a context manager.
+
+    Args:
+        latency (float): Seconds every request takes to be answered.
+        bulk_available (bool): Whether the bulk enrollment API is available.
+    """
+
+    def __init__(self, latency=0, bulk_available=True):
+        StubServer.__init__(self, EnrollmentApiStubHandler)
+        self.latency = latency
+        self.bulk_available = bulk_available
+        self.enrollment_api_url = self.root_url + ENROLLMENT_API_PATH
+        self.bulk_enrollment_api_url = self.root_url + BULK_ENROLLMENT_API_PATH
@@ -7,7 +7,8 @@ from testfixtures import LogCapture
 
 from ecommerce.extensions.fulfillment import api, exceptions
 from ecommerce.extensions.fulfillment.api import get_fulfillment_modules, get_fulfillment_modules_for_line, \
-    revoke_fulfillment_for_refund
+    get_fulfillment_registry, revoke_fulfillment_for_refund, revoke_fulfillment_for_refunds
+from ecommerce.extensions.fulfillment.modules import EnrollmentFulfillmentModule
 from ecommerce.extensions.fulfillment.status import ORDER, LINE
 from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
 from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
@@ -30,6 +31,26 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         api.fulfill_order(self.order, self.order.lines)
         self.assert_order_fulfilled(self.order)
 
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule', ])
+    def test_fulfill_orders(self):
+        """ Verify the lines of several orders are fulfilled together, skipping orders which cannot be fulfilled. """
+        orders = [self.order, self.generate_open_order()]
+        complete_order = self.generate_open_order()
+        complete_order.set_status(ORDER.COMPLETE)
+        line_statuses = list(complete_order.lines.values_list('status', flat=True))
+
+        self.assertEqual(api.fulfill_orders(orders + [complete_order]), orders)
+        for order in orders:
+            self.assert_order_fulfilled(order)
+        self.assertEqual(list(complete_order.lines.values_list('status', flat=True)), line_statuses)
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FulfillNothingModule', ])
+    def test_fulfill_orders_unknown_product_type(self):
+        """ Verify lines no module supports are marked with a configuration error. """
+        api.fulfill_orders([self.order])
+        self.assertEquals(ORDER.FULFILLMENT_ERROR, self.order.status)
+        self.assertEquals(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
+
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule', ])
     @raises(exceptions.IncorrectOrderStatusError)
     def test_fulfill_order_bad_fulfillment_state(self):
@@ -53,10 +74,10 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         self.assertEquals(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule', ])
-    @patch('ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule.get_supported_lines')
+    @patch('ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule.supports_line')
     def test_fulfill_order_invalid_module(self, mocked_method):
         """Verify an exception is logged when an unexpected error occurs."""
-        mocked_method.return_value = Exception
+        mocked_method.side_effect = Exception
         with patch('ecommerce.extensions.fulfillment.api.logger.exception') as mock_logger:
             api.fulfill_order(self.order, self.order.lines)
             self.assertEquals(ORDER.FULFILLMENT_ERROR, self.order.status)
@@ -91,6 +112,34 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         actual = get_fulfillment_modules_for_line(line)
         self.assertEqual(actual, [FakeFulfillmentModule])
 
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_get_fulfillment_registry(self):
+        """ Verify the registry is built once, and rebuilt when the declared modules change. """
+        registry = get_fulfillment_registry()
+        self.assertIs(get_fulfillment_registry(), registry)
+        self.assertEqual([module.__class__ for module in registry.modules], [FakeFulfillmentModule])
+
+        with override_settings(FULFILLMENT_MODULES=[]):
+            self.assertEqual(get_fulfillment_registry().modules, [])
+        self.assertEqual([module.__class__ for module in get_fulfillment_registry().modules], [FakeFulfillmentModule])
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.modules.EnrollmentFulfillmentModule',
+                                            'ecommerce.extensions.fulfillment.tests.modules.FulfillmentNothingModule',
+                                            'ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
+    def test_group_lines(self):
+        """ Verify lines are grouped by the first module supporting them, without asking modules which declare
+        the product classes they support. """
+        registry = get_fulfillment_registry()
+        lines = list(self.order.lines.all())
+
+        with patch.object(EnrollmentFulfillmentModule, 'supports_line') as mock_supports_line:
+            lines_by_module, unsupported_lines = registry.group_lines(lines)
+
+        self.assertFalse(mock_supports_line.called)
+        self.assertEqual([module.__class__ for module in lines_by_module], [FakeFulfillmentModule])
+        self.assertEqual(list(lines_by_module.values()), [lines])
+        self.assertEqual(unsupported_lines, [])
+
     @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'])
     def test_revoke_fulfillment_for_refund(self):
         """
@@ -124,3 +173,15 @@ class FulfillmentApiTests(FulfillmentTestMixin, TestCase):
         self.assertFalse(revoke_fulfillment_for_refund(refund))
         self.assertEqual(refund.status, REFUND.PAYMENT_REFUNDED)
         self.assertEqual(set([line.status for line in refund.lines.all()]), {REFUND_LINE.REVOCATION_ERROR})
+
+    @override_settings(FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.RevocationFailureModule'])
+    def test_revoke_fulfillment_for_refunds(self):
+        """ Verify the IDs of the refunds whose lines were all revoked are returned. """
+        failed_refund = RefundFactory(status=REFUND.PAYMENT_REFUNDED)
+        free_refund = RefundFactory(status=REFUND.PAYMENT_REFUNDED)
+        free_refund.total_credit_excl_tax = 0
+        free_refund.save()
+
+        self.assertEqual(revoke_fulfillment_for_refunds([failed_refund, free_refund]), {free_refund.id})
+        self.assertEqual(set([line.status for line in failed_refund.lines.all()]), {REFUND_LINE.REVOCATION_ERROR})
+        self.assertEqual(set([line.status for line in free_refund.lines.all()]), {REFUND_LINE.COMPLETE})
@@ -1,10 +1,12 @@
 """Tests of the Fulfillment API's fulfillment modules."""
 import datetime
 import json
+import time
 
 import ddt
 import httpretty
 import mock
+from django.core.cache import cache
 from django.test import override_settings
 from oscar.core.loading import get_class, get_model
 from oscar.test import factories
@@ -12,7 +14,9 @@ from oscar.test.newfactories import UserFactory, BasketFactory
 from requests.exceptions import ConnectionError, Timeout
 from testfixtures import LogCapture
 
+from ecommerce.core.circuit_breaker import LMS_BULK_ENROLLMENT_API, LMS_ENROLLMENT_API
 from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, ENROLLMENT_CODE_SWITCH
+from ecommerce.core.http_client import get_http_client
 from ecommerce.core.tests import toggle_switch
 from ecommerce.core.url_utils import get_lms_enrollment_api_url
 from ecommerce.coupons.tests.mixins import CouponMixin
@@ -24,6 +28,9 @@ from ecommerce.extensions.fulfillment.modules import (
     CouponFulfillmentModule, EnrollmentCodeFulfillmentModule, EnrollmentFulfillmentModule
 )
 from ecommerce.extensions.fulfillment.status import LINE
+from ecommerce.extensions.fulfillment.tests.stubs import (
+    BULK_ENROLLMENT_API_PATH, ENROLLMENT_API_PATH, EnrollmentApiStub
+)
 from ecommerce.extensions.fulfillment.tests.mixins import FulfillmentTestMixin
 from ecommerce.extensions.voucher.models import OrderLineVouchers
 from ecommerce.extensions.voucher.utils import create_vouchers
@@ -156,18 +163,30 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_CONFIGURATION_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=ConnectionError))
+    @mock.patch('requests.Session.request', mock.Mock(side_effect=ConnectionError))
     def test_enrollment_module_network_error(self):
         """Test that lines receive a network error status if a fulfillment request experiences a network error."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_NETWORK_ERROR, self.order.lines.all()[0].status)
 
-    @mock.patch('requests.post', mock.Mock(side_effect=Timeout))
+    @mock.patch('requests.Session.request', mock.Mock(side_effect=Timeout))
     def test_enrollment_module_request_timeout(self):
         """Test that lines receive a timeout error status if a fulfillment request times out."""
         EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
         self.assertEqual(LINE.FULFILLMENT_TIMEOUT_ERROR, self.order.lines.all()[0].status)
 
+    @override_settings(CIRCUIT_BREAKER_FAILURE_THRESHOLD=1)
+    @mock.patch('requests.Session.request')
+    def test_enrollment_module_circuit_open(self, mock_request):
+        """Test that lines receive a network error status, without any request being made, if the circuit of the
+        Enrollment API is open."""
+        self.addCleanup(cache.clear)
+        get_http_client().circuit_breaker(LMS_ENROLLMENT_API)._open()  # pylint: disable=protected-access
+
+        EnrollmentFulfillmentModule().fulfill_product(self.order, list(self.order.lines.all()))
+        self.assertEqual(LINE.FULFILLMENT_NETWORK_ERROR, self.order.lines.all()[0].status)
+        self.assertFalse(mock_request.called)
+
     @httpretty.activate
     @ddt.data(None, '{"message": "Oops!"}')
     def test_enrollment_module_server_error(self, body):
@@ -368,6 +387,141 @@ class EnrollmentFulfillmentModuleTests(CourseCatalogTestMixin, FulfillmentTestMi
             self.assertEqual(exp.request.headers.get('x-edx-ga-client-id'), '123.123')
             self.assertEqual(exp.request.headers.get('x-forwarded-for'), '11.22.33.44')
 
+    def create_order_for_courses(self, course_ids, number, user=None):
+        """ Creates an order, placed by the given user, of a seat in every given course. """
+        user = user or self.user
+        basket = BasketFactory(owner=user)
+        for course_id in course_ids:
+            course, __ = Course.objects.get_or_create(id=course_id, defaults={'name': course_id})
+            basket.add_product(course.create_or_update_seat(self.certificate_type, False, 100, self.partner), 1)
+        return factories.create_order(number=number, basket=basket, user=user)
+
+    def patch_enrollment_api_urls(self, stub):
+        """ Points the module to the given Enrollment API stub. """
+        return mock.patch.multiple(
+            EnrollmentFulfillmentModule,
+            _get_enrollment_api_url=mock.Mock(return_value=stub.enrollment_api_url),
+            _get_bulk_enrollment_api_url=mock.Mock(return_value=stub.bulk_enrollment_api_url)
+        )
+
+    @override_settings(ENROLLMENT_FULFILLMENT_MAX_WORKERS=4)
+    def test_enrollment_module_fulfill_concurrently(self):
+        """ Verify seats are enrolled concurrently, with the same line statuses and audit logs as one at a time. """
+        course_ids = ['edX/Concurrent{}/Course'.format(index) for index in range(3)] + ['edX/Concurrent/Failing']
+        order = self.create_order_for_courses(course_ids, 3)
+
+        with EnrollmentApiStub(latency=0.2) as stub, self.patch_enrollment_api_urls(stub):
+            with LogCapture(LOGGER_NAME) as l:
+                start = time.time()
+                EnrollmentFulfillmentModule().fulfill_product(order, list(order.lines.all()))
+                elapsed = time.time() - start
+
+        self.assertLess(elapsed, stub.latency * len(course_ids))
+
+        lines = {line.product.attr.course_key: line for line in order.lines.all()}
+        self.assertEqual(lines.pop('edX/Concurrent/Failing').status, LINE.FULFILLMENT_SERVER_ERROR)
+        self.assertEqual({line.status for line in lines.values()}, {LINE.COMPLETE})
+        self.assertEqual(
+            [record.getMessage().split(':')[0] for record in l.records],
+            ['line_fulfilled'] * len(lines)
+        )
+
+    @ddt.data(True, False)
+    def test_fulfill_lines_in_bulk(self, bulk_available):
+        """ Verify the seats of several orders are enrolled with one request per course and mode, falling back
+        to one request per line when the bulk enrollment API is unavailable. """
+        course_ids = ['edX/Bulk/Course', 'edX/Bulk/Failing']
+        orders = [
+            self.create_order_for_courses(course_ids, 3),
+            self.create_order_for_courses(course_ids, 4, user=UserFactory()),
+        ]
+        lines = [line for order in orders for line in order.lines.all()]
+
+        with EnrollmentApiStub(bulk_available=bulk_available) as stub, self.patch_enrollment_api_urls(stub):
+            with LogCapture(LOGGER_NAME) as l:
+                EnrollmentFulfillmentModule().fulfill_lines_in_bulk(lines)
+
+        expected_requests = [BULK_ENROLLMENT_API_PATH] * len(course_ids)
+        if not bulk_available:
+            expected_requests += [ENROLLMENT_API_PATH] * len(lines)
+        self.assertEqual(sorted(path for path, __ in stub.requests), sorted(expected_requests))
+
+        for line in lines:
+            line.refresh_from_db()
+            expected_status = LINE.FULFILLMENT_SERVER_ERROR if line.product.attr.course_key.endswith('Failing') \
+                else LINE.COMPLETE
+            self.assertEqual(line.status, expected_status)
+        self.assertEqual(
+            [record.getMessage().split(':')[0] for record in l.records],
+            ['line_fulfilled'] * len(orders)
+        )
+
+    def test_fulfill_lines_in_bulk_not_configured(self):
+        """ Verify every line is enrolled with a request of its own if the bulk enrollment API is not configured. """
+        order = self.create_order_for_courses(['edX/Bulk/Course'], 3)
+
+        with EnrollmentApiStub() as stub:
+            with mock.patch.object(
+                EnrollmentFulfillmentModule, '_get_enrollment_api_url', mock.Mock(return_value=stub.enrollment_api_url)
+            ):
+                EnrollmentFulfillmentModule().fulfill_lines_in_bulk(list(order.lines.all()))
+
+        self.assertEqual([path for path, __ in stub.requests], [ENROLLMENT_API_PATH])
+        self.assertEqual(order.lines.get().status, LINE.COMPLETE)
+
+    @override_settings(CIRCUIT_BREAKER_FAILURE_THRESHOLD=1)
+    def test_fulfill_lines_in_bulk_circuit_open(self):
+        """ Verify every line is enrolled with a request of its own while the circuit of the bulk enrollment API
+        is open, since it does not share a circuit with the Enrollment API. """
+        self.addCleanup(cache.clear)
+        get_http_client().circuit_breaker(LMS_BULK_ENROLLMENT_API)._open()  # pylint: disable=protected-access
+        order = self.create_order_for_courses(['edX/Bulk/Course'], 3)
+
+        with EnrollmentApiStub() as stub, self.patch_enrollment_api_urls(stub):
+            EnrollmentFulfillmentModule().fulfill_lines_in_bulk(list(order.lines.all()))
+
+        self.assertEqual([path for path, __ in stub.requests], [ENROLLMENT_API_PATH])
+        self.assertEqual(order.lines.get().status, LINE.COMPLETE)
+
+    def test_fulfill_lines_in_bulk_bad_attributes(self):
+        """ Verify lines whose seats do not have the required attributes get a configuration error, while the
+        other lines are enrolled. """
+        order = self.create_order_for_courses(['edX/Bulk/Course', 'edX/Bulk/Broken'], 3)
+        lines = list(order.lines.all())
+        broken_line = [line for line in lines if line.product.attr.course_key == 'edX/Bulk/Broken'][0]
+        broken_line.product.attribute_values.filter(attribute__code='course_key').delete()
+
+        with EnrollmentApiStub() as stub, self.patch_enrollment_api_urls(stub):
+            EnrollmentFulfillmentModule().fulfill_lines_in_bulk(list(order.lines.all()))
+
+        self.assertEqual([data['course_id'] for __, data in stub.requests], ['edX/Bulk/Course'])
+        self.assertEqual(
+            {line.id: line.status for line in order.lines.all()},
+            {line.id: LINE.FULFILLMENT_CONFIGURATION_ERROR if line == broken_line else LINE.COMPLETE for line in lines}
+        )
+
+    def test_revoke_lines_in_bulk(self):
+        """ Verify the seats of several orders are unenrolled with one request per course and mode, and enrollment
+        mode mismatches are treated as revoked. """
+        course_ids = ['edX/Bulk/Course', 'edX/Bulk/Mismatch', 'edX/Bulk/Failing']
+        orders = [
+            self.create_order_for_courses(course_ids, 3),
+            self.create_order_for_courses(course_ids, 4, user=UserFactory()),
+        ]
+        lines = [line for order in orders for line in order.lines.all()]
+
+        with EnrollmentApiStub() as stub, self.patch_enrollment_api_urls(stub):
+            results = EnrollmentFulfillmentModule().revoke_lines_in_bulk(lines)
+
+        self.assertEqual(
+            [(path, data['course_id'], data['is_active'], len(data['enrollments'])) for path, data in stub.requests],
+            [(BULK_ENROLLMENT_API_PATH, course_id, False, len(orders)) for course_id in course_ids]
+        )
+        self.assertEqual(
+            results,
+            {line.id: not line.product.attr.course_key.endswith('Failing') for line in lines}
+        )
+
     def test_voucher_usage(self):
         """
         Test that using a voucher applies offer discount to reduce order price
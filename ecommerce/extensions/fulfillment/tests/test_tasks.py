@@ -0,0 +1,174 @@
+import datetime
+
+import mock
+from django.test import override_settings
+from django.utils.timezone import now
+from oscar.core.loading import get_model
+from oscar.test import factories
+from oscar.test.newfactories import BasketFactory
+from threadlocals.threadlocals import get_current_request
+
+from ecommerce.extensions.fulfillment import api
+from ecommerce.extensions.fulfillment.status import ORDER, LINE
+from ecommerce.extensions.fulfillment.tasks import process_fulfillment_retries_task
+from ecommerce.extensions.fulfillment.tests.modules import FakeFulfillmentModule
+from ecommerce.tests.factories import SiteConfigurationFactory
+from ecommerce.tests.testcases import TestCase
+
+FulfillmentRetry = get_model('fulfillment', 'FulfillmentRetry')
+Order = get_model('order', 'Order')
+
+
+@override_settings(
+    FULFILLMENT_MODULES=['ecommerce.extensions.fulfillment.tests.modules.FakeFulfillmentModule'],
+    FULFILLMENT_RETRY_MAX_ATTEMPTS=3,
+    FULFILLMENT_RETRY_BASE_DELAY=60,
+    FULFILLMENT_RETRY_MAX_DELAY=600
+)
+class FulfillmentRetryTests(TestCase):
+    """ Tests for the fulfillment retry queue. """
+
+    def setUp(self):
+        super(FulfillmentRetryTests, self).setUp()
+        self.fulfilled_line_ids = []
+        self.fulfilled_sites = []
+        self.failing_line_status = LINE.FULFILLMENT_NETWORK_ERROR
+
+        patcher = mock.patch.object(
+            FakeFulfillmentModule, 'fulfill_product', autospec=True, side_effect=self.fulfill_product
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def fulfill_product(self, _module, order, lines):
+        """ Fails to fulfill the first line of the order with failing_line_status, if set. """
+        failing_line_id = order.lines.first().id
+        self.fulfilled_sites.append(get_current_request().site)
+        for line in lines:
+            self.fulfilled_line_ids.append(line.id)
+            failed = line.id == failing_line_id and self.failing_line_status
+            line.set_status(self.failing_line_status if failed else LINE.COMPLETE)
+
+    def create_order(self):
+        """ Returns an open order with two lines. """
+        basket = BasketFactory(owner=self.create_user())
+        basket.add_product(factories.ProductFactory(stockrecords__partner=self.partner), 1)
+        basket.add_product(factories.ProductFactory(stockrecords__partner=self.partner), 1)
+        return factories.create_order(basket=basket, user=basket.owner, status=ORDER.OPEN)
+
+    def fulfill_order(self, order):
+        return api.fulfill_order(order, order.lines)
+
+    def process_retries(self, *orders):
+        """ Makes the retries of the given orders due, and starts them. """
+        FulfillmentRetry.objects.filter(order__in=orders).update(next_attempt=now())
+        return process_fulfillment_retries_task()
+
+    def test_retry_scheduled(self):
+        """ Verify orders whose lines fail with a transient error are scheduled to be retried with backoff. """
+        order = self.fulfill_order(self.create_order())
+        self.assertEqual(order.status, ORDER.FULFILLMENT_ERROR)
+
+        retry = order.fulfillment_retry
+        self.assertEqual(retry.status, FulfillmentRetry.PENDING)
+        self.assertEqual(retry.attempts, 0)
+        self.assertGreater(retry.next_attempt, now() + datetime.timedelta(seconds=29))
+        self.assertLess(retry.next_attempt, now() + datetime.timedelta(seconds=61))
+
+    def test_retry_not_scheduled(self):
+        """ Verify orders are not retried if their lines failed with permanent errors, or retries are disabled. """
+        self.failing_line_status = LINE.FULFILLMENT_SERVER_ERROR
+        self.fulfill_order(self.create_order())
+        self.assertFalse(FulfillmentRetry.objects.exists())
+
+        self.failing_line_status = LINE.FULFILLMENT_TIMEOUT_ERROR
+        with override_settings(FULFILLMENT_RETRY_MAX_ATTEMPTS=0):
+            self.fulfill_order(self.create_order())
+        self.assertFalse(FulfillmentRetry.objects.exists())
+
+    def test_get_next_attempt(self):
+        """ Verify the delay before the next attempt doubles with every attempt, up to the maximum delay. """
+        for attempts, delay in ((0, 60), (1, 120), (3, 480), (4, 600), (10, 600)):
+            with mock.patch('random.uniform', side_effect=lambda low, high: high):
+                self.assertAlmostEqual(
+                    (FulfillmentRetry.get_next_attempt(attempts) - now()).total_seconds(), delay, delta=1
+                )
+            with mock.patch('random.uniform', side_effect=lambda low, high: low):
+                self.assertAlmostEqual(
+                    (FulfillmentRetry.get_next_attempt(attempts) - now()).total_seconds(), delay / 2, delta=1
+                )
+
+    def test_retry_completed(self):
+        """ Verify retries only fulfill the lines which are not complete, and complete the order. """
+        order = self.fulfill_order(self.create_order())
+        failed_line, complete_line = order.lines.all()
+        self.fulfilled_line_ids = []
+        self.failing_line_status = None
+
+        self.assertEqual(self.process_retries(order), 1)
+
+        order = Order.objects.get(id=order.id)
+        retry = FulfillmentRetry.objects.get(order=order)
+        self.assertEqual(order.status, ORDER.COMPLETE)
+        self.assertEqual((retry.status, retry.attempts), (FulfillmentRetry.COMPLETE, 1))
+        self.assertEqual(self.fulfilled_line_ids, [failed_line.id])
+        self.assertNotIn(complete_line.id, self.fulfilled_line_ids)
+
+    def test_retry_rescheduled(self):
+        """ Verify orders failing again are rescheduled, until the maximum number of attempts is reached. """
+        order = self.fulfill_order(self.create_order())
+
+        for attempts in range(1, 3):
+            self.assertEqual(self.process_retries(order), 1)
+            retry = FulfillmentRetry.objects.get(order=order)
+            self.assertEqual((retry.status, retry.attempts), (FulfillmentRetry.PENDING, attempts))
+            self.assertGreater(retry.next_attempt, now())
+
+        self.assertEqual(self.process_retries(order), 1)
+        retry = FulfillmentRetry.objects.get(order=order)
+        self.assertEqual((retry.status, retry.attempts), (FulfillmentRetry.FAILED, 3))
+        self.assertEqual(self.process_retries(order), 0)
+
+    def test_retry_of_fulfilled_order(self):
+        """ Verify orders fulfilled by other means are not fulfilled again. """
+        order = self.fulfill_order(self.create_order())
+        self.failing_line_status = None
+        api.fulfill_order(order, order.lines.exclude(status=LINE.COMPLETE))
+        self.assertEqual(order.status, ORDER.COMPLETE)
+        self.fulfilled_line_ids = []
+
+        self.assertEqual(self.process_retries(order), 1)
+        retry = FulfillmentRetry.objects.get(order=order)
+        self.assertEqual((retry.status, retry.attempts), (FulfillmentRetry.COMPLETE, 0))
+        self.assertEqual(self.fulfilled_line_ids, [])
+
+    def test_retry_fulfilled_for_site(self):
+        """ Verify retries fulfill orders on behalf of their own site, rather than the current one. """
+        order = self.fulfill_order(self.create_order())
+        order.site = SiteConfigurationFactory(partner__name='Other').site
+        order.save()
+        self.fulfilled_sites = []
+
+        self.assertEqual(self.process_retries(order), 1)
+        self.assertEqual(self.fulfilled_sites, [order.site])
+        self.assertEqual(get_current_request().site, self.site)
+
+    @override_settings(FULFILLMENT_RETRY_SITE_CONCURRENCY=1)
+    def test_site_concurrency(self):
+        """ Verify sites never have more retries in progress than allowed, unless they are presumed lost. """
+        orders = [self.fulfill_order(self.create_order()) for __ in range(2)]
+        retry = orders[0].fulfillment_retry
+        retry.status = FulfillmentRetry.IN_PROGRESS
+        retry.next_attempt = now() + datetime.timedelta(minutes=5)
+        retry.save()
+        FulfillmentRetry.objects.filter(order=orders[1]).update(next_attempt=now())
+
+        self.assertEqual(process_fulfillment_retries_task(), 0)
+
+        FulfillmentRetry.objects.filter(id=retry.id).update(next_attempt=now() - datetime.timedelta(minutes=1))
+        with mock.patch('ecommerce.extensions.fulfillment.tasks.retry_fulfillment_task.delay') as mock_delay:
+            self.assertEqual(process_fulfillment_retries_task(), 1)
+
+        mock_delay.assert_called_once_with(retry.id)
+        self.assertEqual(FulfillmentRetry.objects.get(id=retry.id).status, FulfillmentRetry.IN_PROGRESS)
+        self.assertEqual(FulfillmentRetry.objects.get(order=orders[1]).status, FulfillmentRetry.PENDING)
@@ -3,3 +3,10 @@ from oscar.apps.offer import config
 
 class OfferConfig(config.OfferConfig):
     name = 'ecommerce.extensions.offer'
+
+    def ready(self):
+        super(OfferConfig, self).ready()
+
+        # Register signal handlers
+        # noinspection PyUnresolvedReferences
+        import ecommerce.extensions.offer.signals  # pylint: disable=unused-variable
@@ -0,0 +1,69 @@
+""" Compares per-product and batched catalog query contains checks against a local Course Catalog stub. """
+
+from __future__ import unicode_literals
+import time
+import uuid
+from urlparse import parse_qs, urlparse
+
+from django.core.management import BaseCommand
+from edx_rest_api_client.client import EdxRestApiClient
+from oscar.core.loading import get_model
+
+from ecommerce.core.stubs import StubRequestHandler, StubServer
+
+Range = get_model('offer', 'Range')
+
+
+class CatalogStubHandler(StubRequestHandler):
+    """ Answers course_runs/contains requests after the latency of the server, reporting every requested course
+    run as contained. """
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        time.sleep(self.server.latency)
+        params = parse_qs(urlparse(self.path).query)
+        course_run_ids = params.get('course_run_ids', [''])[0].split(',')
+        self.respond(200, {'course_runs': {course_run_id: True for course_run_id in course_run_ids}})
+
+
+class StubSite(object):
+    """ Minimal stand-in for a Site, exposing the catalog client and partner used by Range. """
+
+    def __init__(self, api_url):
+        self.siteconfiguration = self
+        self.course_catalog_api_client = EdxRestApiClient(api_url, jwt='stub')
+        self.partner = self
+        self.short_code = 'edX'
+
+
+class Command(BaseCommand):
+    help = 'Time per-product and batched catalog query contains checks against a local catalog stub.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=50, help='Number of course runs to check.')
+        parser.add_argument('--latency', type=float, default=0.05, help='Stub response latency in seconds.')
+
+    def handle(self, *args, **options):
+        server = StubServer(CatalogStubHandler)
+        server.latency = options['latency']
+
+        with server:
+            site = StubSite(server.root_url + '/api/v1/')
+            course_run_ids = ['course-v1:edX+Bench{}+Run'.format(index) for index in range(options['products'])]
+
+            # A unique query per run keeps earlier answers in cache from skewing the timings.
+            product_range = Range(catalog_query='key:{}'.format(uuid.uuid4().hex), course_seat_types='verified')
+            start = time.time()
+            for course_run_id in course_run_ids:
+                product_range.run_catalog_query_for_course_runs([course_run_id], site=site)
+            per_product = time.time() - start
+
+            product_range = Range(catalog_query='key:{}'.format(uuid.uuid4().hex), course_seat_types='verified')
+            start = time.time()
+            product_range.run_catalog_query_for_course_runs(course_run_ids, site=site)
+            batched = time.time() - start
+
+        self.stdout.write('Checked {} course runs with {:.3f}s stub latency.'.format(
+            len(course_run_ids), options['latency']
+        ))
+        self.stdout.write('Per-product requests: {:.3f}s'.format(per_product))
+        self.stdout.write('Batched request: {:.3f}s'.format(batched))
@@ -0,0 +1,55 @@
+""" Compares ConditionalOffer email domain matching with the previous per-domain regex implementation. """
+
+from __future__ import unicode_literals
+import re
+import timeit
+
+from django.core.management import BaseCommand, CommandError
+from oscar.core.loading import get_model
+
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+
+
+def is_email_valid_per_domain(email_domains, email):
+    """ The implementation replaced by the compiled matcher, which compiles and runs one regex per domain. """
+    for domain in email_domains.split(','):
+        pattern = r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain)
+        match = re.match(pattern, email)
+        if match and match.group(0) == email:
+            return True
+    return False
+
+
+class Command(BaseCommand):
+    help = 'Time email domain matching of ConditionalOffer against the previous per-domain implementation.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--domains', type=int, default=100, help='Number of email domains on the offer.')
+        parser.add_argument('--iterations', type=int, default=1000, help='Number of checks per email.')
+
+    def handle(self, *args, **options):
+        domains = ['domain{}.example.com'.format(index) for index in range(options['domains'])]
+        email_domains = ','.join(domains)
+        offer = ConditionalOffer(email_domains=email_domains)
+        emails = [
+            'user@{}'.format(domains[0]),
+            'user@sub.{}'.format(domains[-1]),
+            'user@other.org',
+            'user@sub{}'.format(domains[-1]),
+        ]
+
+        for email in emails:
+            if offer.is_email_valid(email) != is_email_valid_per_domain(email_domains, email):
+                raise CommandError('Matchers disagree on [{}].'.format(email))
+
+        iterations = options['iterations']
+        per_domain = timeit.timeit(
+            lambda: [is_email_valid_per_domain(email_domains, email) for email in emails], number=iterations
+        )
+        compiled = timeit.timeit(lambda: [offer.is_email_valid(email) for email in emails], number=iterations)
+
+        self.stdout.write('Checked {} emails against {} domains {} times.'.format(
+            len(emails), len(domains), iterations
+        ))
+        self.stdout.write('Per-domain regexes: {:.3f}s'.format(per_domain))
+        self.stdout.write('Compiled matcher: {:.3f}s'.format(compiled))
@@ -1,14 +1,19 @@
 from __future__ import unicode_literals
 import hashlib
 import re
+import threading
+from collections import OrderedDict
 
 from django.conf import settings
 from django.core.cache import cache
 from django.db import models
+from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
 from oscar.apps.offer.abstract_models import AbstractBenefit, AbstractConditionalOffer, AbstractRange
+from oscar.core.loading import get_model
 from threadlocals.threadlocals import get_current_request
 
+from ecommerce.core.cache import get_versions, invalidate_versions
 from ecommerce.core.utils import log_message_and_raise_validation_error
 
 
@@ -37,6 +42,31 @@ class Benefit(AbstractBenefit):
             )
 
 
+# Process-level LRU of compiled email domain matchers, keyed by the email_domains string.
+_email_domain_matchers = OrderedDict()
+_email_domain_matchers_lock = threading.Lock()
+_EMAIL_DOMAIN_MATCHERS_MAX_ENTRIES = 512
+
+
+def get_email_domain_matcher(email_domains):
+    """
+    Returns a compiled regex matching the emails allowed by a comma-separated list of email domains.
+
+    A single alternation of all domains accepts exactly the emails accepted by matching each
+    domain's pattern on its own, so the domain list is scanned once per email.
+    """
+    with _email_domain_matchers_lock:
+        matcher = _email_domain_matchers.pop(email_domains, None)
+        if matcher is None:
+            matcher = re.compile(r'(?P<username>.+)@(?P<subdomain>\w+\.)*(?:{domains})\Z'.format(
+                domains='|'.join(email_domains.split(','))
+            ))
+            if len(_email_domain_matchers) >= _EMAIL_DOMAIN_MATCHERS_MAX_ENTRIES:
+                _email_domain_matchers.popitem(last=False)
+        _email_domain_matchers[email_domains] = matcher
+    return matcher
+
+
 class ConditionalOffer(AbstractConditionalOffer):
     UPDATABLE_OFFER_FIELDS = ['email_domains', 'max_uses']
     email_domains = models.CharField(max_length=255, blank=True, null=True)
@@ -128,12 +158,11 @@ class ConditionalOffer(AbstractConditionalOffer):
             False otherwise.
         """
         if self.email_domains:
-            for domain in self.email_domains.split(','):
-                pattern = r'(?P<username>.+)@(?P<subdomain>\w+\.)*{domain}'.format(domain=domain)
-                match = re.match(pattern, email)
-                if match and match.group(0) == email:
-                    return True
-            return False
+            cached = getattr(self, '_email_domain_matcher', None)
+            if cached is None or cached[0] != self.email_domains:
+                cached = (self.email_domains, get_email_domain_matcher(self.email_domains))
+                self._email_domain_matcher = cached
+            return cached[1].match(email) is not None
         return True
 
     def is_condition_satisfied(self, basket):
@@ -164,6 +193,108 @@ def validate_credit_seat_type(course_seat_types, allowed_seat_types):
         )
 
 
+# Process-local copy of catalog product ID sets, keyed by catalog ID and holding (version, product IDs).
+_catalog_product_ids = {}
+_CATALOG_PRODUCT_IDS_MAX_ENTRIES = 1000
+
+
+def _get_catalog_version_cache_key(catalog_id):
+    return 'catalog_product_ids_version_{}'.format(catalog_id)
+
+
+def _get_range_version_cache_key(range_id):
+    return 'range_product_ids_version_{}'.format(range_id)
+
+
+def _get_versions(cache_keys):
+    return get_versions(cache_keys, settings.RANGE_PRODUCTS_CACHE_TIMEOUT)
+
+
+def _get_catalog_version(catalog_id):
+    cache_key = _get_catalog_version_cache_key(catalog_id)
+    return _get_versions([cache_key]).get(cache_key)
+
+
+def invalidate_catalog_product_ids(catalog_ids):
+    """
+    Marks the cached product ID sets of the given catalogs as stale in every process.
+
+    Arguments:
+        catalog_ids (iterable): IDs of the catalogs whose stock records changed.
+    """
+    cache_keys = [_get_catalog_version_cache_key(catalog_id) for catalog_id in catalog_ids]
+    invalidate_versions(cache_keys, settings.RANGE_PRODUCTS_CACHE_TIMEOUT)
+
+
+def invalidate_range_product_ids(range_ids):
+    """
+    Marks the indexed products of the given ranges as stale in every process.
+
+    Arguments:
+        range_ids (iterable): IDs of the ranges whose products changed.
+    """
+    cache_keys = [_get_range_version_cache_key(range_id) for range_id in range_ids]
+    invalidate_versions(cache_keys, settings.RANGE_PRODUCTS_CACHE_TIMEOUT)
+
+
+def get_range_versions(ranges):
+    """
+    Returns a version for each range which changes whenever the products it contains may have changed.
+
+    Arguments:
+        ranges (iterable): Ranges to get the versions of.
+
+    Returns:
+        dict: Mapping of range IDs to version strings.
+    """
+    range_keys = {}
+    for product_range in ranges:
+        range_keys[product_range.id] = [_get_range_version_cache_key(product_range.id)]
+        if product_range.catalog_id:
+            range_keys[product_range.id].append(_get_catalog_version_cache_key(product_range.catalog_id))
+
+    versions = _get_versions([cache_key for cache_keys in range_keys.values() for cache_key in cache_keys])
+    return {
+        range_id: '_'.join(versions.get(cache_key, '') for cache_key in cache_keys)
+        for range_id, cache_keys in range_keys.items()
+    }
+
+
+def get_catalog_product_ids(catalog_id):
+    """
+    Returns the IDs of the products in a catalog.
+
+    The set is kept in process memory and in the shared cache, and is rebuilt from
+    the database only after the catalog's stock records change.
+
+    Arguments:
+        catalog_id (int): ID of the catalog.
+
+    Returns:
+        frozenset: IDs of the products of the catalog's stock records.
+    """
+    version = _get_catalog_version(catalog_id)
+    local = _catalog_product_ids.get(catalog_id)
+    if local and local[0] == version:
+        return local[1]
+
+    cache_key = 'catalog_product_ids_{}_{}'.format(catalog_id, version)
+    product_ids = cache.get(cache_key)
+    if product_ids is None:
+        Catalog = get_model('catalogue', 'Catalog')
+        product_ids = frozenset(
+            Catalog.stock_records.through.objects.filter(catalog_id=catalog_id).values_list(
+                'stockrecord__product_id', flat=True
+            )
+        )
+        cache.set(cache_key, product_ids, settings.RANGE_PRODUCTS_CACHE_TIMEOUT)
+
+    if len(_catalog_product_ids) >= _CATALOG_PRODUCT_IDS_MAX_ENTRIES:
+        _catalog_product_ids.clear()
+    _catalog_product_ids[catalog_id] = (version, product_ids)
+    return product_ids
+
+
 class Range(AbstractRange):
     UPDATABLE_RANGE_FIELDS = [
         'catalog_query',
@@ -206,58 +337,142 @@ class Range(AbstractRange):
         if self.course_seat_types:
             validate_credit_seat_type(self.course_seat_types, self.ALLOWED_SEAT_TYPES)
 
-    def run_catalog_query(self, product):
+    def _get_catalog_query_contains_cache_key(self, course_run_id):
+        return hashlib.md5(
+            'catalog_query_contains [{}] [{}]'.format(self.catalog_query, course_run_id)
+        ).hexdigest()
+
+    def cache_catalog_query_contains(self, course_runs):
         """
-        Retrieve the results from running the query contained in catalog_query field.
+        Stores known catalog query membership of course runs, e.g. from catalog query search results.
+
+        Arguments:
+            course_runs (dict): Mapping of course run IDs to whether the catalog query contains them.
         """
-        cache_key = hashlib.md5(
-            'catalog_query_contains [{}] [{}]'.format(self.catalog_query, product.course_id)
-        ).hexdigest()
-        response = cache.get(cache_key)
-        if not response:  # pragma: no cover
-            request = get_current_request()
+        cache.set_many({
+            self._get_catalog_query_contains_cache_key(course_run_id): {'course_runs': {course_run_id: contained}}
+            for course_run_id, contained in course_runs.items()
+        }, settings.COURSES_API_CACHE_TIMEOUT)
+
+    def run_catalog_query_for_course_runs(self, course_run_ids, site=None):
+        """
+        Retrieve whether the query contained in catalog_query field contains each of the course runs.
+
+        Answers are cached per course run; the course runs missing from cache are checked
+        with a single request to the Course Catalog Service.
+
+        Arguments:
+            course_run_ids (iterable): IDs of the course runs to check.
+            site (Site): Site whose catalog client is used. Defaults to the current request's site.
+
+        Returns:
+            dict: Mapping of course run IDs to booleans.
+        """
+        course_run_ids = set(course_run_ids)
+        cache_keys = {
+            self._get_catalog_query_contains_cache_key(course_run_id): course_run_id
+            for course_run_id in course_run_ids
+        }
+        contains = {
+            cache_keys[cache_key]: response['course_runs'][cache_keys[cache_key]]
+            for cache_key, response in cache.get_many(cache_keys.keys()).items()
+        }
+
+        missing = sorted(course_run_ids - set(contains))
+        if missing:
             try:
-                response = request.site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
+                site = site or get_current_request().site
+                response = site.siteconfiguration.course_catalog_api_client.course_runs.contains.get(
                     query=self.catalog_query,
-                    course_run_ids=product.course_id,
-                    partner=request.site.siteconfiguration.partner.short_code
+                    course_run_ids=','.join(missing),
+                    partner=site.siteconfiguration.partner.short_code
                 )
-                cache.set(cache_key, response, settings.COURSES_API_CACHE_TIMEOUT)
             except:  # pylint: disable=bare-except
                 raise Exception('Could not contact Course Catalog Service.')
 
-        return response
+            fetched = {course_run_id: bool(response['course_runs'].get(course_run_id)) for course_run_id in missing}
+            self.cache_catalog_query_contains(fetched)
+            contains.update(fetched)
+
+        return contains
+
+    def prefetch_catalog_query_contains(self, products, site=None):
+        """
+        Caches whether the catalog query contains each of the products, using at most one catalog request.
+
+        Subsequent contains_product() calls for these products are answered from cache.
+
+        Arguments:
+            products (iterable): Products which are about to be checked against this range.
+            site (Site): Site whose catalog client is used. Defaults to the current request's site.
+        """
+        if not (self.catalog_query and self.course_seat_types):
+            return
+        seat_types = self.course_seat_types.split(',')
+        course_run_ids = [
+            product.course_id for product in products
+            if product.course_id and getattr(product.seat_attr, 'certificate_type', '').lower() in seat_types
+        ]
+        if course_run_ids:
+            self.run_catalog_query_for_course_runs(course_run_ids, site=site)
+
+    def run_catalog_query(self, product):
+        """
+        Retrieve the results from running the query contained in catalog_query field.
+        """
+        contains = self.run_catalog_query_for_course_runs([product.course_id])
+        return {'course_runs': contains}
 
     def contains_product(self, product):
         """
         Assert if the range contains the product.
         """
         if self.catalog_query and self.course_seat_types:
-            if product.attr.certificate_type.lower() in self.course_seat_types:  # pylint: disable=unsupported-membership-test
+            certificate_type = product.seat_attr.certificate_type.lower()
+            if certificate_type in self.course_seat_types:  # pylint: disable=unsupported-membership-test
                 response = self.run_catalog_query(product)
                 # Range can have a catalog query and 'regular' products in it,
                 # therefor an OR is used to check for both possibilities.
                 return ((response['course_runs'][product.course_id]) or
                         super(Range, self).contains_product(product))  # pylint: disable=bad-super-call
-        elif self.catalog:
+        elif self.catalog_id:
             return (
-                product.id in self.catalog.stock_records.values_list('product', flat=True) or
+                product.id in get_catalog_product_ids(self.catalog_id) or
                 super(Range, self).contains_product(product)  # pylint: disable=bad-super-call
             )
         return super(Range, self).contains_product(product)  # pylint: disable=bad-super-call
 
     contains = contains_product
 
+    def get_product_ids(self):
+        """
+        Returns the IDs of the products the range contains, or None if they cannot be listed.
+
+        Ranges defined by a catalog query, product classes, categories or a custom class, or
+        which include all products, match products that are not enumerated here.
+        """
+        if (self.catalog_query and self.course_seat_types) or self.includes_all_products or self.proxy_class:
+            return None
+        if self.classes.exists() or self.included_categories.exists():
+            return None
+        return frozenset(self.all_products().values_list('id', flat=True))
+
     def num_products(self):
-        return len(self.all_products())
+        if self.catalog_query and self.course_seat_types:
+            return 0
+        return self.all_products().count()
 
     def all_products(self):
         if self.catalog_query and self.course_seat_types:
             # Backbone calls the Voucher Offers API endpoint which gets the products from the Course Catalog Service
             return []
-        if self.catalog:
-            catalog_products = [record.product for record in self.catalog.stock_records.all()]
-            return catalog_products + list(super(Range, self).all_products())  # pylint: disable=bad-super-call
+        if self.catalog_id:
+            Product = get_model('catalogue', 'Product')
+            range_products = super(Range, self).all_products()  # pylint: disable=bad-super-call
+            return Product.objects.filter(
+                Q(stockrecords__catalogs__id=self.catalog_id) |
+                Q(id__in=range_products.order_by().values('id'))
+            ).distinct()
         return super(Range, self).all_products()  # pylint: disable=bad-super-call
 
 
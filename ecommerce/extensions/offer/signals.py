@@ -0,0 +1,46 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.core.utils import get_changed_m2m_ids
+from ecommerce.extensions.offer.models import invalidate_catalog_product_ids, invalidate_range_product_ids
+
+Catalog = get_model('catalogue', 'Catalog')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through, dispatch_uid='offer.invalidate_catalog_product_ids')
+def invalidate_catalog_stock_records(sender, instance, action, reverse, model, pk_set,
+                                     **kwargs):  # pylint: disable=unused-argument
+    catalog_ids = get_changed_m2m_ids(sender, instance, action, reverse, model, pk_set)
+    if catalog_ids is not None:
+        invalidate_catalog_product_ids(catalog_ids)
+
+
+@receiver(pre_delete, sender=StockRecord, dispatch_uid='offer.invalidate_deleted_stock_record_catalogs')
+def invalidate_deleted_stock_record(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    # Deleting a stock record removes it from its catalogs without sending m2m_changed.
+    invalidate_catalog_product_ids(instance.catalogs.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Range, dispatch_uid='offer.invalidate_range_product_ids')
+def invalidate_range(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_range_product_ids([instance.id])
+
+
+@receiver(post_save, sender=RangeProduct, dispatch_uid='offer.invalidate_range_product_saved')
+@receiver(post_delete, sender=RangeProduct, dispatch_uid='offer.invalidate_range_product_deleted')
+def invalidate_range_product(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_range_product_ids([instance.range_id])
+
+
+@receiver(m2m_changed, sender=Range.excluded_products.through, dispatch_uid='offer.invalidate_range_excludes')
+@receiver(m2m_changed, sender=Range.classes.through, dispatch_uid='offer.invalidate_range_classes')
+@receiver(m2m_changed, sender=Range.included_categories.through, dispatch_uid='offer.invalidate_range_categories')
+def invalidate_range_relations(sender, instance, action, reverse, model, pk_set,
+                               **kwargs):  # pylint: disable=unused-argument
+    range_ids = get_changed_m2m_ids(sender, instance, action, reverse, model, pk_set)
+    if range_ids is not None:
+        invalidate_range_product_ids(range_ids)
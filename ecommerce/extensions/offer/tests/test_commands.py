@@ -56,3 +56,11 @@ class SetMaxApplicationsToNoneCommandTest(TestCase):
         unaffected_offer = ConditionalOffer.objects.get(id=offer.id)
         self.assertEqual(unaffected_offer.max_global_applications, 1)
         self.assertEqual(unaffected_offer.vouchers.first().usage, Voucher.MULTI_USE)
+
+
+class BenchmarkEmailDomainMatchingCommandTest(TestCase):
+    def test_matchers_agree(self):
+        """Verify the benchmark compares both implementations and reports their timings."""
+        output = StringIO()
+        call_command('benchmark_email_domain_matching', domains=10, iterations=1, stdout=output)
+        self.assertIn('Compiled matcher:', output.getvalue())
@@ -1,19 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 import hashlib
+from urlparse import parse_qs, urlparse
 
 import ddt
 import httpretty
 import mock
+from django.conf import settings
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 from oscar.core.loading import get_model
 from oscar.test import factories
 
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CourseCatalogMockMixin, CouponMixin
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
+from ecommerce.extensions.offer.models import get_email_domain_matcher
 from ecommerce.tests.testcases import TestCase
 
 Catalog = get_model('catalogue', 'Catalog')
@@ -65,6 +70,46 @@ class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, Te
         self.assertIn(self.product, self.range_with_catalog.all_products())
         self.assertEqual(len(self.range_with_catalog.all_products()), 1)
 
+    def test_catalog_range_contains_product_cached(self):
+        """ Verify catalog membership is checked without querying the database once cached. """
+        self.assertTrue(self.range_with_catalog.contains_product(self.product))
+        with self.assertNumQueries(0):
+            self.assertTrue(self.range_with_catalog.contains_product(self.product))
+
+    def test_catalog_range_contains_product_invalidation(self):
+        """ Verify changes to the catalog's stock records are reflected by contains_product(). """
+        product = factories.create_product()
+        stock_record = factories.create_stockrecord(product)
+        self.assertFalse(self.range_with_catalog.contains_product(product))
+
+        self.catalog.stock_records.add(stock_record)
+        self.assertTrue(self.range_with_catalog.contains_product(product))
+
+        stock_record.catalogs.clear()
+        self.assertFalse(self.range_with_catalog.contains_product(product))
+
+        self.assertTrue(self.range_with_catalog.contains_product(self.product))
+        self.stock_record.delete()
+        self.assertFalse(self.range_with_catalog.contains_product(self.product))
+
+    def test_catalog_range_all_products_query_count(self):
+        """ Verify the number of queries made by all_products() does not grow with the catalog. """
+        # Ranges keep the IDs of their included and excluded products, classes and categories once read,
+        # so each count is taken with a fresh range.
+        self.range_with_catalog.save()
+        product_range = Range.objects.get(id=self.range_with_catalog.id)
+        with CaptureQueriesContext(connection) as single_product_queries:
+            self.assertEqual(len(product_range.all_products()), 1)
+
+        for __ in range(3):
+            self.catalog.stock_records.add(factories.create_stockrecord(factories.create_product()))
+
+        product_range = Range.objects.get(id=self.range_with_catalog.id)
+        with CaptureQueriesContext(connection) as many_products_queries:
+            self.assertEqual(len(product_range.all_products()), 4)
+        self.assertEqual(len(single_product_queries), len(many_products_queries))
+        self.assertEqual(self.range_with_catalog.num_products(), 4)
+
     def test_large_query(self):
         """Verify the range can store large queries."""
         large_query = """
@@ -127,6 +172,46 @@ class RangeTests(CouponMixin, CourseCatalogTestMixin, CourseCatalogMockMixin, Te
         response = self.range.contains_product(seat)
         self.assertTrue(response)
 
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_prefetch_catalog_query_contains(self):
+        """
+        prefetch_catalog_query_contains() should check all products with one request and cache the answers.
+        """
+        course, seat = self.create_course_and_seat()
+        other_course, other_seat = self.create_course_and_seat(course_id='course-v1:test-org+other+run')
+        self.mock_dynamic_catalog_contains_api(query='key:*', course_run_ids=[course.id])
+        self.range.catalog_query = 'key:*'
+        self.range.course_seat_types = 'verified'
+        self.range.prefetch_catalog_query_contains([seat, other_seat])
+
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+        # httpretty decodes a + in the querystring to a space, so the course run IDs are read from the raw one.
+        self.assertEqual(
+            parse_qs(urlparse(httpretty.last_request().path).query)['course_run_ids'],
+            [','.join(sorted([course.id, other_course.id]))]
+        )
+        self.assertTrue(self.range.contains_product(seat))
+        self.assertFalse(self.range.contains_product(other_seat))
+        self.assertEqual(len(httpretty.httpretty.latest_requests), 1)
+
+    @httpretty.activate
+    @mock_course_catalog_api_client
+    def test_prefetch_catalog_query_contains_failure(self):
+        """ Verify failures to contact the Course Catalog Service are raised, and no answer is cached. """
+        course, seat = self.create_course_and_seat()
+        httpretty.register_uri(
+            httpretty.GET, '{}course_runs/contains/'.format(settings.COURSE_CATALOG_API_URL), status=500
+        )
+        self.range.catalog_query = 'key:*'
+        self.range.course_seat_types = 'verified'
+
+        with self.assertRaisesRegexp(Exception, 'Could not contact Course Catalog Service.'):
+            self.range.prefetch_catalog_query_contains([seat])
+
+        self.mock_dynamic_catalog_contains_api(query='key:*', course_run_ids=[course.id])
+        self.assertTrue(self.range.contains_product(seat))
+
     @httpretty.activate
     @mock_course_catalog_api_client
     def test_query_range_all_products(self):
@@ -258,6 +343,17 @@ class ConditionalOfferTests(TestCase):
         valid_email_2 = 'test@sub2.{domain}'.format(domain=self.valid_domain)
         self.assertTrue(self.offer.is_email_valid(valid_email_2))
 
+    def test_email_domain_matcher_cached(self):
+        """Verify offers with the same email domains share a compiled matcher, which follows domain changes."""
+        offer = factories.ConditionalOfferFactory(email_domains=self.email_domains)
+        self.assertIs(get_email_domain_matcher(offer.email_domains), get_email_domain_matcher(self.email_domains))
+
+        email = 'test@{domain}'.format(domain=self.valid_domain)
+        self.assertTrue(offer.is_email_valid(email))
+        offer.email_domains = 'other.org'
+        self.assertFalse(offer.is_email_valid(email))
+        self.assertTrue(offer.is_email_valid('test@sub.other.org'))
+
     @ddt.data(
         'domain.com', 'multi.it,domain.hr', 'sub.domain.net', '例如.com', 'val-id.例如', 'valid1.co例如',
         'valid-domain.com', 'çççç.рф', 'çç-ççç32.中国', 'ççç.ççç.இலங்கை'
@@ -7,7 +7,9 @@ from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wild
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.checkout.utils import add_currency
-from ecommerce.extensions.offer.utils import _remove_exponent_and_trailing_zeros, format_benefit_value
+from ecommerce.extensions.offer.utils import (
+    Applicator, _remove_exponent_and_trailing_zeros, format_benefit_value
+)
 from ecommerce.tests.testcases import TestCase
 
 Benefit = get_model('offer', 'Benefit')
@@ -50,3 +52,57 @@ class UtilTests(CourseCatalogTestMixin, TestCase):
         """
         decimal = _remove_exponent_and_trailing_zeros(Decimal(value))
         self.assertEqual(decimal, Decimal(expected))
+
+
+class ApplicatorTests(CourseCatalogTestMixin, TestCase):
+    """ Tests for the product-indexed Applicator. """
+
+    def setUp(self):
+        super(ApplicatorTests, self).setUp()
+        self.user = self.create_user()
+        self.seat = CourseFactory().create_or_update_seat('verified', False, 100, self.partner)
+        self.basket = BasketFactory(owner=self.user)
+        self.basket.add_product(self.seat)
+
+        self.matching_offer = self.create_site_offer('Matching offer', RangeFactory(products=[self.seat]))
+        self.other_range = RangeFactory()
+        self.other_offer = self.create_site_offer('Other offer', self.other_range)
+
+    def create_site_offer(self, name, product_range):
+        return ConditionalOfferFactory(
+            name=name,
+            benefit=BenefitFactory(range=product_range),
+            condition=ConditionFactory(value=1, range=product_range)
+        )
+
+    def test_get_offers(self):
+        """ Verify only offers whose range contains a basket product are evaluated. """
+        self.assertEqual(Applicator().get_offers(self.basket, self.user), [self.matching_offer])
+
+    def test_get_offers_after_range_change(self):
+        """ Verify the index picks up products added to a range. """
+        Applicator().get_offers(self.basket, self.user)
+        self.other_range.add_product(self.seat)
+        self.assertEqual(
+            set(Applicator().get_offers(self.basket, self.user)), {self.matching_offer, self.other_offer}
+        )
+
+    def test_get_offers_parent_range(self):
+        """ Verify offers whose range includes the parent of a basket product are evaluated. """
+        self.other_range.add_product(self.seat.parent)
+        self.assertEqual(
+            set(Applicator().get_offers(self.basket, self.user)), {self.matching_offer, self.other_offer}
+        )
+
+    def test_get_offers_unindexed_range(self):
+        """ Verify offers whose range cannot be listed are always evaluated. """
+        self.other_range.includes_all_products = True
+        self.other_range.save()
+        self.assertEqual(
+            set(Applicator().get_offers(self.basket, self.user)), {self.matching_offer, self.other_offer}
+        )
+
+    def test_apply(self):
+        """ Verify the candidate offers are applied to the basket. """
+        Applicator().apply(self.basket, self.user)
+        self.assertEqual([discount['offer'] for discount in self.basket.offer_discounts], [self.matching_offer])
@@ -1,12 +1,20 @@
 """Offer Utility Methods. """
+import logging
+import threading
+from collections import defaultdict
 from decimal import Decimal
 
+from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy as _
+from oscar.apps.offer.utils import Applicator as CoreApplicator
 from oscar.core.loading import get_model
 
 from ecommerce.extensions.checkout.utils import add_currency
+from ecommerce.extensions.offer.models import get_range_versions
 
 Benefit = get_model('offer', 'Benefit')
+logger = logging.getLogger(__name__)
 
 
 def _remove_exponent_and_trailing_zeros(decimal):
@@ -63,3 +71,114 @@ def format_benefit_value(benefit):
         converted_benefit = add_currency(Decimal(benefit.value))
         benefit_value = _('${benefit_value}'.format(benefit_value=converted_benefit))
     return benefit_value
+
+
+class ProductOfferIndex(object):
+    """
+    Process-level index from product IDs to the offer condition ranges containing them.
+
+    Each range is re-read only when its version changes, and only that range's entries
+    are replaced. Ranges whose products cannot be listed match every product.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Range ID to (version, frozenset of product IDs, or None if the range cannot be indexed).
+        self._ranges = {}
+        self._product_ranges = defaultdict(set)
+
+    def _get_range_product_ids(self, product_range, version):
+        cache_key = 'range_product_ids_{}_{}'.format(product_range.id, version)
+        cached = cache.get(cache_key)
+        if cached is None:
+            cached = {'product_ids': product_range.get_product_ids()}
+            cache.set(cache_key, cached, settings.RANGE_PRODUCTS_CACHE_TIMEOUT)
+        return cached['product_ids']
+
+    def _set_range(self, range_id, version, product_ids):
+        __, previous_product_ids = self._ranges.get(range_id, (None, None))
+        for product_id in previous_product_ids or []:
+            range_ids = self._product_ranges[product_id]
+            range_ids.discard(range_id)
+            if not range_ids:
+                del self._product_ranges[product_id]
+
+        self._ranges[range_id] = (version, product_ids)
+        for product_id in product_ids or []:
+            self._product_ranges[product_id].add(range_id)
+
+    def get_candidate_range_ids(self, ranges, product_ids):
+        """
+        Returns the IDs of the ranges which contain, or may contain, any of the products.
+
+        Arguments:
+            ranges (iterable): Ranges to consider.
+            product_ids (iterable): IDs of the products being checked.
+
+        Returns:
+            set: IDs of the candidate ranges.
+        """
+        ranges = {product_range.id: product_range for product_range in ranges}
+        versions = get_range_versions(ranges.values())
+        for range_id, product_range in ranges.items():
+            if self._ranges.get(range_id, (None, None))[0] != versions[range_id]:
+                product_range_ids = self._get_range_product_ids(product_range, versions[range_id])
+                with self._lock:
+                    self._set_range(range_id, versions[range_id], product_range_ids)
+
+        with self._lock:
+            candidates = {range_id for range_id in ranges if self._ranges[range_id][1] is None}
+            for product_id in product_ids:
+                candidates.update(self._product_ranges.get(product_id, set()))
+        return candidates.intersection(ranges)
+
+    def filter_offers(self, offers, products):
+        """
+        Returns the offers which may apply to the products, in their original order.
+
+        Offers whose condition uses a custom class or has no range are always returned.
+
+        Arguments:
+            offers (list): ConditionalOffers to filter.
+            products (list): Products in the basket.
+
+        Returns:
+            list: The candidate offers.
+        """
+        ranges = {}
+        for offer in offers:
+            condition = offer.condition
+            if condition.range_id and not condition.proxy_class:
+                ranges[condition.range_id] = condition.range
+
+        # Ranges which include a parent product contain its children too.
+        product_ids = {product.id for product in products}
+        product_ids.update(product.parent_id for product in products if product.parent_id)
+        candidate_range_ids = self.get_candidate_range_ids(ranges.values(), product_ids)
+        for range_id in candidate_range_ids:
+            # Answer catalog query membership for all lines with one request instead of one per line.
+            try:
+                ranges[range_id].prefetch_catalog_query_contains(products)
+            except Exception:  # pylint: disable=broad-except
+                # The offer is still evaluated, checking each line on its own.
+                logger.exception('Failed to prefetch catalog query membership for range [%d].', range_id)
+
+        return [
+            offer for offer in offers
+            if offer.condition.range_id not in ranges or offer.condition.range_id in candidate_range_ids
+        ]
+
+
+product_offer_index = ProductOfferIndex()
+
+
+class Applicator(CoreApplicator):
+    """ Applicator which only evaluates offers that can apply to the products in the basket. """
+
+    def get_site_offers(self):
+        return super(Applicator, self).get_site_offers().select_related('condition__range')
+
+    def get_offers(self, basket, user=None, request=None):
+        offers = super(Applicator, self).get_offers(basket, user, request)
+        products = [line.product for line in basket.all_lines()]
+        return product_offer_index.filter_offers(offers, products)
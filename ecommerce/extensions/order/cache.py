@@ -0,0 +1,95 @@
+""" Cache of the serialized representations of completed orders.
+
+Completed orders rarely change, so their representations are cached once serialized. Every cached
+representation records the version of its order, which changes whenever the order, its lines or its
+refunds change, so that stale representations are never served.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ecommerce.core.cache import get_counters, get_versions, increment_counter, invalidate_versions
+from ecommerce.extensions.fulfillment.status import ORDER
+
+HITS_CACHE_KEY = 'serialized_order_cache_hits'
+MISSES_CACHE_KEY = 'serialized_order_cache_misses'
+
+
+def _get_version_cache_key(number):
+    return 'serialized_order_version_{}'.format(number)
+
+
+def _get_serialized_order_cache_key(number, version, variant):
+    return 'serialized_order_{}_{}_{}'.format(number, version, hashlib.md5(variant.encode('utf-8')).hexdigest())
+
+
+def _get_versions(numbers):
+    """ Returns the version tokens of the given orders, keyed by order number, creating tokens not cached yet. """
+    cache_keys = {_get_version_cache_key(number): number for number in numbers}
+    versions = get_versions(list(cache_keys), settings.SERIALIZED_ORDER_CACHE_TIMEOUT)
+    return {cache_keys[cache_key]: version for cache_key, version in versions.items()}
+
+
+def invalidate_serialized_orders(numbers):
+    """
+    Marks the cached representations of the given orders as stale.
+
+    Arguments:
+        numbers (iterable): Numbers of the changed orders.
+    """
+    cache_keys = [_get_version_cache_key(number) for number in numbers]
+    invalidate_versions(cache_keys, settings.SERIALIZED_ORDER_CACHE_TIMEOUT)
+
+
+def get_serialized_orders(orders, variant, serialize):
+    """
+    Returns the serialized representations of the given orders, from cache if possible.
+
+    Only the representations of completed orders are cached. Caching is disabled when
+    SERIALIZED_ORDER_CACHE_TIMEOUT is 0.
+
+    Arguments:
+        orders (list): Orders to serialize.
+        variant (str): Everything, besides the order, the representation depends on, such as the host
+            and user of the request.
+        serialize (callable): Function serializing a list of orders, returning a list of representations.
+
+    Returns:
+        list: The representation of every order, in the same order.
+    """
+    cache_keys = {}
+    representations = {}
+
+    if settings.SERIALIZED_ORDER_CACHE_TIMEOUT:
+        numbers = [order.number for order in orders if order.status == ORDER.COMPLETE]
+        versions = _get_versions(numbers) if numbers else {}
+        cache_keys = {
+            number: _get_serialized_order_cache_key(number, version, variant) for number, version in versions.items()
+        }
+        cached = cache.get_many(cache_keys.values())
+        representations = {
+            number: cached[cache_key] for number, cache_key in cache_keys.items() if cache_key in cached
+        }
+        increment_counter(HITS_CACHE_KEY, len(representations))
+        increment_counter(MISSES_CACHE_KEY, len(cache_keys) - len(representations))
+
+    missing = [order for order in orders if order.number not in representations]
+    if missing:
+        serialized = dict(zip([order.number for order in missing], serialize(missing)))
+        representations.update(serialized)
+        cache.set_many({
+            cache_keys[number]: representation for number, representation in serialized.items()
+            if number in cache_keys
+        }, settings.SERIALIZED_ORDER_CACHE_TIMEOUT)
+
+    return [representations[order.number] for order in orders]
+
+
+def get_serialized_order_cache_stats():
+    """ Returns the numbers of hits and misses of the serialized order cache, counted by all processes. """
+    counts = get_counters([HITS_CACHE_KEY, MISSES_CACHE_KEY])
+    return {
+        'hits': counts[HITS_CACHE_KEY],
+        'misses': counts[MISSES_CACHE_KEY],
+    }
@@ -0,0 +1,67 @@
+"""
+Management command that stores the summary of the ordered products of orders placed before summaries were stored.
+
+Orders without a stored summary work out the summary from their lines whenever it is read.
+"""
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management import BaseCommand
+from django.db.models import Prefetch
+from oscar.core.loading import get_model
+
+Line = get_model('order', 'Line')
+Order = get_model('order', 'Order')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+
+
+class Command(BaseCommand):
+    help = 'Store the summary of the ordered products of orders placed before summaries were stored.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-b', '--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            default=1000,
+                            type=int,
+                            help='Size of each batch of orders to be summarized.')
+        # Sleeping between each batch gives MySQL time to process other connections.
+        parser.add_argument('-s', '--sleep-seconds',
+                            action='store',
+                            dest='sleep_seconds',
+                            default=1,
+                            type=int,
+                            help='Seconds to sleep between each batch.')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Order.objects.filter(product_summary__isnull=True).order_by('id').prefetch_related(
+            Prefetch(
+                'lines',
+                queryset=Line.objects.select_related('product__product_class', 'product__parent__product_class')
+            ),
+            Prefetch(
+                'lines__product__attribute_values',
+                queryset=ProductAttributeValue.objects.select_related('attribute')
+            )
+        )
+
+        last_id = 0
+        summarized = 0
+        while True:
+            orders = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not orders:
+                break
+
+            for order in orders:
+                # Updating the rows directly does not add to the history of the orders.
+                summary = Order.summarize_products(line.product for line in order.lines.all())
+                Order.objects.filter(id=order.id).update(product_summary=summary)
+
+            last_id = orders[-1].id
+            summarized += len(orders)
+            self.stderr.write('Summarized [{}] orders, through order [{}]. Sleeping.'.format(summarized, last_id))
+            time.sleep(options['sleep_seconds'])
+
+        self.stderr.write('All [{}] orders summarized.'.format(summarized))
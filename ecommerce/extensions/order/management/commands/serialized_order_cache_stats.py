@@ -0,0 +1,17 @@
+""" Reports how often serialized orders are served from cache. """
+from django.core.management import BaseCommand
+
+from ecommerce.extensions.order.cache import get_serialized_order_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Report the numbers of hits and misses of the serialized order cache.'
+
+    def handle(self, *args, **options):
+        stats = get_serialized_order_cache_stats()
+        total = stats['hits'] + stats['misses']
+        hit_rate = 100.0 * stats['hits'] / total if total else 0
+
+        self.stdout.write('Hits: {hits}'.format(**stats))
+        self.stdout.write('Misses: {misses}'.format(**stats))
+        self.stdout.write('Hit rate: {:.1f}%'.format(hit_rate))
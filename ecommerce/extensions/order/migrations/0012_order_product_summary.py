@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+import jsonfield.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0011_auto_20161025_1446'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalorder',
+            name='product_summary',
+            field=jsonfield.fields.JSONField(help_text='Summary of the ordered products, computed when the order is placed.', null=True, blank=True),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='product_summary',
+            field=jsonfield.fields.JSONField(help_text='Summary of the ordered products, computed when the order is placed.', null=True, blank=True),
+        ),
+    ]
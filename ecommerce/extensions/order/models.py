@@ -1,13 +1,21 @@
 # noinspection PyUnresolvedReferences
 from django.db import models
 from django.utils.translation import ugettext_lazy as _
+from jsonfield.fields import JSONField
 from oscar.apps.order.abstract_models import AbstractOrder, AbstractPaymentEvent, AbstractLine
 from simple_history.models import HistoricalRecords
 
+from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME, SEAT_PRODUCT_CLASS_NAME
 from ecommerce.extensions.fulfillment.status import ORDER
+from ecommerce.extensions.order.cache import invalidate_serialized_orders
 
 
 class Order(AbstractOrder):
+    product_summary = JSONField(
+        blank=True,
+        null=True,
+        help_text=_('Summary of the ordered products, computed when the order is placed.')
+    )
     history = HistoricalRecords()
 
     @property
@@ -15,11 +23,72 @@ class Order(AbstractOrder):
         """Returns a boolean indicating if order can be fulfilled."""
         return self.status in (ORDER.OPEN, ORDER.FULFILLMENT_ERROR)
 
+    @classmethod
+    def summarize_products(cls, products):
+        """
+        Returns the summary of the given products stored with the orders containing them.
+
+        Arguments:
+            products (iterable): The ordered products.
+
+        Returns:
+            dict: Whether the products include a coupon, a credit seat or an enrollment code, and the IDs of
+                the courses of the seats among them.
+        """
+        summary = {
+            'contains_coupon': False,
+            'contains_credit_seat': False,
+            'contains_enrollment_code': False,
+            'seat_course_ids': [],
+        }
+
+        for product in products:
+            # Lines keep their order when their product is deleted.
+            if product is None:
+                continue
+
+            product_class_name = product.get_product_class().name
+            if product_class_name == 'Coupon':
+                summary['contains_coupon'] = True
+            elif product_class_name == ENROLLMENT_CODE_PRODUCT_CLASS_NAME:
+                summary['contains_enrollment_code'] = True
+            elif product_class_name == SEAT_PRODUCT_CLASS_NAME:
+                summary['seat_course_ids'].append(product.course_id)
+                if getattr(product.seat_attr, 'credit_provider', None):
+                    summary['contains_credit_seat'] = True
+
+        return summary
+
+    def get_product_summary(self):
+        """ Returns the stored summary of the ordered products, summarizing them for orders placed before
+        summaries were stored. """
+        if self.product_summary is None:
+            self.product_summary = self.summarize_products(line.product for line in self.lines.all())
+        return self.product_summary
+
     @property
     def contains_coupon(self):
         """ Return a boolean if the order contains a Coupon. """
-        return any(line.product.get_product_class().name == 'Coupon' for line in
-                   self.basket.all_lines())
+        return self.get_product_summary()['contains_coupon']
+
+    @property
+    def contains_credit_seat(self):
+        """ Return a boolean if the order contains a credit Seat. """
+        return self.get_product_summary()['contains_credit_seat']
+
+    @property
+    def contains_enrollment_code(self):
+        """ Return a boolean if the order contains an Enrollment Code. """
+        return self.get_product_summary()['contains_enrollment_code']
+
+    @property
+    def seat_course_ids(self):
+        """ Return the IDs of the courses of the Seats the order contains. """
+        return self.get_product_summary()['seat_course_ids']
+
+    def set_status(self, new_status):
+        super(Order, self).set_status(new_status)
+        invalidate_serialized_orders([self.number])
 
 
 class PaymentEvent(AbstractPaymentEvent):
@@ -29,6 +98,10 @@ class PaymentEvent(AbstractPaymentEvent):
 class Line(AbstractLine):
     history = HistoricalRecords()
 
+    def set_status(self, new_status):
+        super(Line, self).set_status(new_status)
+        invalidate_serialized_orders([self.order.number])
+
 
 # If two models with the same name are declared within an app, Django will only use the first one.
 # noinspection PyUnresolvedReferences
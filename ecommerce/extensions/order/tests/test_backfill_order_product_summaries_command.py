@@ -0,0 +1,20 @@
+from django.core.management import call_command
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.tests.testcases import TestCase
+
+Order = get_model('order', 'Order')
+
+
+class BackfillOrderProductSummariesCommandTests(TestCase):
+    def test_backfill(self):
+        """ Verify the command stores the product summary of every order without one, in batches. """
+        orders = [factories.create_order() for __ in range(3)]
+        summary = Order.summarize_products(line.product for line in orders[0].lines.all())
+        Order.objects.filter(id__in=[order.id for order in orders[1:]]).update(product_summary=None)
+
+        call_command('backfill_order_product_summaries', batch_size=1, sleep_seconds=0)
+
+        for order in Order.objects.all():
+            self.assertEqual(order.product_summary, summary)
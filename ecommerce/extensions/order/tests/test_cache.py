@@ -0,0 +1,83 @@
+import mock
+from django.core.cache import cache
+from django.core.signals import request_finished
+from django.test import override_settings
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.fulfillment.status import LINE, ORDER
+from ecommerce.extensions.order.cache import get_serialized_order_cache_stats, get_serialized_orders
+from ecommerce.tests.testcases import TestCase
+
+Refund = get_model('refund', 'Refund')
+
+VARIANT = 'testserver_1'
+
+
+@override_settings(SERIALIZED_ORDER_CACHE_TIMEOUT=3600)
+class SerializedOrderCacheTests(TestCase):
+    def setUp(self):
+        super(SerializedOrderCacheTests, self).setUp()
+        self.addCleanup(cache.clear)
+        self.serialize = mock.Mock(side_effect=lambda orders: [{'number': order.number} for order in orders])
+
+        self.order = factories.create_order(user=self.create_user())
+        self.order.set_status(ORDER.COMPLETE)
+
+    def get_serialized_orders(self, orders, variant=VARIANT):
+        self.serialize.reset_mock()
+        return get_serialized_orders(orders, variant, self.serialize)
+
+    def assert_served_from_cache(self, order, cached=True):
+        self.assertEqual(self.get_serialized_orders([order]), [{'number': order.number}])
+        self.assertEqual(self.serialize.called, not cached)
+
+    def test_completed_orders_cached(self):
+        """ Verify completed orders are only serialized once, and representations are returned in order. """
+        open_order = factories.create_order()
+        self.assert_served_from_cache(self.order, cached=False)
+
+        orders = [open_order, self.order]
+        self.assertEqual(self.get_serialized_orders(orders), [{'number': order.number} for order in orders])
+        self.serialize.assert_called_once_with([open_order])
+
+        self.assert_served_from_cache(open_order, cached=False)
+        self.assert_served_from_cache(self.order)
+        self.assertEqual(get_serialized_order_cache_stats(), {'hits': 2, 'misses': 1})
+
+    def test_variants_cached_separately(self):
+        """ Verify representations are cached for every variant, e.g. every host and user. """
+        self.assert_served_from_cache(self.order, cached=False)
+        self.get_serialized_orders([self.order], variant='testserver_2')
+        self.assertTrue(self.serialize.called)
+        self.assert_served_from_cache(self.order)
+
+    def test_line_status_change(self):
+        """ Verify representations are invalidated when the status of a line of the order changes. """
+        self.assert_served_from_cache(self.order, cached=False)
+        self.order.lines.first().set_status(LINE.COMPLETE)
+        self.assert_served_from_cache(self.order, cached=False)
+        self.assert_served_from_cache(self.order)
+
+    def test_refund_creation(self):
+        """ Verify representations are invalidated when a refund of the order is created. """
+        self.assert_served_from_cache(self.order, cached=False)
+        Refund.create_with_lines(self.order, list(self.order.lines.all()))
+        self.assert_served_from_cache(self.order, cached=False)
+
+    def test_invalidated_after_commit(self):
+        """ Verify representations cached while the transaction changing the order is open are invalidated
+        once it is over. """
+        self.order.lines.first().set_status(LINE.COMPLETE)
+        self.assert_served_from_cache(self.order, cached=False)
+        self.assert_served_from_cache(self.order)
+
+        request_finished.send(sender=self.__class__)
+        self.assert_served_from_cache(self.order, cached=False)
+
+    @override_settings(SERIALIZED_ORDER_CACHE_TIMEOUT=0)
+    def test_disabled(self):
+        """ Verify orders are always serialized when the cache is disabled. """
+        self.assert_served_from_cache(self.order, cached=False)
+        self.assert_served_from_cache(self.order, cached=False)
+        self.assertEqual(get_serialized_order_cache_stats(), {'hits': 0, 'misses': 0})
@@ -1,10 +1,15 @@
 import ddt
+from oscar.core.loading import get_model
 from oscar.test import factories
 
+from ecommerce.core.constants import ENROLLMENT_CODE_PRODUCT_CLASS_NAME
 from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.tests.testcases import TestCase
 
 
+Order = get_model('order', 'Order')
+
+
 @ddt.ddt
 class OrderTests(TestCase):
     def setUp(self):
@@ -38,3 +43,18 @@ class OrderTests(TestCase):
         basket.add_product(product)
         order = factories.create_order(basket=basket)
         self.assertTrue(order.contains_coupon)
+
+    def test_product_summary_not_stored(self):
+        """ Verify orders placed before product summaries were stored summarize their lines instead. """
+        product = factories.create_product(product_class=ENROLLMENT_CODE_PRODUCT_CLASS_NAME)
+        basket = factories.create_basket(empty=True)
+        factories.create_stockrecord(product, num_in_stock=1)
+        basket.add_product(product)
+        order = factories.create_order(basket=basket)
+        Order.objects.filter(id=order.id).update(product_summary=None)
+
+        order = Order.objects.get(id=order.id)
+        self.assertTrue(order.contains_enrollment_code)
+        self.assertFalse(order.contains_coupon)
+        self.assertFalse(order.contains_credit_seat)
+        self.assertEqual(order.seat_course_ids, [])
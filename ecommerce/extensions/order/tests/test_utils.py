@@ -3,11 +3,13 @@ import logging
 import mock
 
 from django.test.client import RequestFactory
-from oscar.core.loading import get_class
+from oscar.core.loading import get_class, get_model
 from oscar.test.factories import create_basket as oscar_create_basket
 from oscar.test.newfactories import BasketFactory
 from testfixtures import LogCapture
 
+from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.status import ORDER
 from ecommerce.referrals.models import Referral
 from ecommerce.tests.factories import SiteConfigurationFactory, PartnerFactory
@@ -17,6 +19,7 @@ LOGGER_NAME = 'ecommerce.extensions.order.utils'
 
 Country = get_class('address.models', 'Country')
 NoShippingRequired = get_class('shipping.methods', 'NoShippingRequired')
+Order = get_model('order', 'Order')
 OrderCreator = get_class('order.utils', 'OrderCreator')
 OrderNumberGenerator = get_class('order.utils', 'OrderNumberGenerator')
 OrderTotalCalculator = get_class('checkout.calculators', 'OrderTotalCalculator')
@@ -64,7 +67,7 @@ class OrderNumberGeneratorTests(TestCase):
         self.assertEqual(self.generator.basket_id('ACME-101001'), 1001)
 
 
-class OrderCreatorTests(TestCase):
+class OrderCreatorTests(CourseCatalogTestMixin, TestCase):
     order_creator = OrderCreator()
 
     def setUp(self):
@@ -126,6 +129,23 @@ class OrderCreatorTests(TestCase):
         order = self.create_order_model(basket)
         self.assertEqual(order.site, site)
 
+    def test_create_order_model_product_summary(self):
+        """ Verify the create_order_model method stores the summary of the ordered products with the order. """
+        course = CourseFactory()
+        basket = self.create_basket(self.site)
+        basket.add_product(course.create_or_update_seat('verified', True, 50, self.partner))
+        basket.add_product(
+            course.create_or_update_seat('credit', True, 100, self.partner, credit_provider='MIT', credit_hours=2)
+        )
+
+        order = self.create_order_model(basket)
+        self.assertEqual(Order.objects.get(id=order.id).product_summary, {
+            'contains_coupon': False,
+            'contains_credit_seat': True,
+            'contains_enrollment_code': False,
+            'seat_course_ids': [course.id, course.id],
+        })
+
     def test_create_order_model_basket_referral(self):
         """ Verify the create_order_model method associates the order with the basket's site. """
         site_configuration = SiteConfigurationFactory(site__domain='star.fake', partner__name='star')
@@ -69,7 +69,8 @@ class OrderCreator(OscarOrderCreator):
         Create an order model.
 
         This override ensures the order's site is set to that of the basket. If the basket has no site, the default
-        site is used. The site value can be overridden by setting the `site` kwarg.
+        site is used. The site value can be overridden by setting the `site` kwarg. The summary of the ordered
+        products is stored with the order, so that it is not recomputed whenever the order is processed.
         """
 
         # If a site was not passed in with extra_order_fields,
@@ -88,7 +89,8 @@ class OrderCreator(OscarOrderCreator):
                       'shipping_incl_tax': shipping_charge.incl_tax,
                       'shipping_excl_tax': shipping_charge.excl_tax,
                       'shipping_method': shipping_method.name,
-                      'shipping_code': shipping_method.code}
+                      'shipping_code': shipping_method.code,
+                      'product_summary': Order.summarize_products(line.product for line in basket.all_lines())}
         if shipping_address:
             order_data['shipping_address'] = shipping_address
         if billing_address:
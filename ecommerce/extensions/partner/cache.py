@@ -0,0 +1,239 @@
+""" Cache of the stock records identified by partner SKUs.
+
+SKUs are effectively immutable once published, so the product, stock record and price a SKU refers to are
+cached in two tiers: a small LRU local to every process, in front of the shared cache. Changes to stock records
+and products remove their SKUs from the shared cache and from the local cache of the process making the change;
+entries cached by other processes expire after SKU_CACHE_LOCAL_TIMEOUT seconds.
+"""
+from collections import defaultdict, OrderedDict
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from oscar.core.loading import get_model
+
+from ecommerce.core.cache import get_counters, increment_counter
+from ecommerce.core.transactions import run_now_and_after_commit
+
+HITS_CACHE_KEY = 'sku_cache_hits'
+LOCAL_HITS_CACHE_KEY = 'sku_cache_local_hits'
+MISSES_CACHE_KEY = 'sku_cache_misses'
+# Number of lookups counted by a process before its counts are added to the shared counters.
+_COUNTS_FLUSH_INTERVAL = 100
+
+# Process-level LRU of stock record data, keyed by SKU, holding the time every entry expires.
+_local_cache = OrderedDict()
+_local_counts = {LOCAL_HITS_CACHE_KEY: 0, HITS_CACHE_KEY: 0, MISSES_CACHE_KEY: 0}
+_lock = threading.Lock()
+
+
+def _get_cache_key(sku):
+    return u'sku_stock_record_{}'.format(sku)
+
+
+def _get_stock_record_data(stock_record):
+    return {
+        'partner_id': stock_record.partner_id,
+        'price_currency': stock_record.price_currency,
+        'price_excl_tax': stock_record.price_excl_tax,
+        'product_id': stock_record.product_id,
+        'stock_record_id': stock_record.id,
+    }
+
+
+def _cache_locally(sku, data):
+    with _lock:
+        _local_cache.pop(sku, None)
+        if len(_local_cache) >= settings.SKU_CACHE_LOCAL_MAX_ENTRIES:
+            _local_cache.popitem(last=False)
+        _local_cache[sku] = (time.time() + settings.SKU_CACHE_LOCAL_TIMEOUT, data)
+
+
+def _get_locally(sku):
+    with _lock:
+        entry = _local_cache.pop(sku, None)
+        if entry is None or entry[0] < time.time():
+            return None
+        _local_cache[sku] = entry
+        return entry[1]
+
+
+def _count(cache_key):
+    with _lock:
+        _local_counts[cache_key] += 1
+        if sum(_local_counts.values()) < _COUNTS_FLUSH_INTERVAL:
+            return
+        counts = dict(_local_counts)
+        _local_counts.update({key: 0 for key in _local_counts})
+
+    for key, count in counts.items():
+        increment_counter(key, count)
+
+
+def get_stock_record_data(sku):
+    """
+    Returns data about the stock record with the given partner SKU, from cache if possible.
+
+    Caching is disabled when SKU_CACHE_TIMEOUT is 0.
+
+    Arguments:
+        sku (str): Partner SKU of the stock record.
+
+    Returns:
+        dict: The ID, price and currency of the stock record, and the IDs of its partner and product.
+
+    Raises:
+        StockRecord.DoesNotExist: If no stock record has the SKU.
+        StockRecord.MultipleObjectsReturned: If the stock records of several partners have the SKU. SKUs are
+            only unique per partner, so such SKUs are never cached.
+    """
+    StockRecord = get_model('partner', 'StockRecord')
+    if not settings.SKU_CACHE_TIMEOUT:
+        return _get_stock_record_data(StockRecord.objects.get(partner_sku=sku))
+
+    data = _get_locally(sku)
+    if data is not None:
+        _count(LOCAL_HITS_CACHE_KEY)
+        return data
+
+    data = cache.get(_get_cache_key(sku))
+    if data is not None:
+        _count(HITS_CACHE_KEY)
+    else:
+        _count(MISSES_CACHE_KEY)
+        data = _get_stock_record_data(StockRecord.objects.get(partner_sku=sku))
+        cache.set(_get_cache_key(sku), data, settings.SKU_CACHE_TIMEOUT)
+
+    _cache_locally(sku, data)
+    return data
+
+
+def get_stock_records_data(skus):
+    """
+    Returns data about the stock records with the given partner SKUs, from cache if possible.
+
+    SKUs are looked up in the local cache first, then together in the shared cache, and those which are not
+    cached are loaded from the database with a single query.
+
+    Arguments:
+        skus (iterable): Partner SKUs of the stock records.
+
+    Returns:
+        dict: Data about the stock records, as returned by get_stock_record_data, keyed by SKU. SKUs which no
+            stock record has, or which the stock records of several partners have, are omitted.
+    """
+    StockRecord = get_model('partner', 'StockRecord')
+    skus = set(skus)
+    data = {}
+    if settings.SKU_CACHE_TIMEOUT:
+        for sku in skus:
+            sku_data = _get_locally(sku)
+            if sku_data is not None:
+                _count(LOCAL_HITS_CACHE_KEY)
+                data[sku] = sku_data
+
+        cache_keys = {_get_cache_key(sku): sku for sku in skus.difference(data)}
+        for cache_key, sku_data in cache.get_many(cache_keys.keys()).items():
+            _count(HITS_CACHE_KEY)
+            data[cache_keys[cache_key]] = sku_data
+            _cache_locally(cache_keys[cache_key], sku_data)
+
+    missing_skus = skus.difference(data)
+    if missing_skus:
+        stock_records = defaultdict(list)
+        for stock_record in StockRecord.objects.filter(partner_sku__in=missing_skus):
+            stock_records[stock_record.partner_sku].append(stock_record)
+        loaded = {
+            sku: _get_stock_record_data(sku_stock_records[0])
+            for sku, sku_stock_records in stock_records.items() if len(sku_stock_records) == 1
+        }
+        data.update(loaded)
+
+        if settings.SKU_CACHE_TIMEOUT:
+            for __ in missing_skus:
+                _count(MISSES_CACHE_KEY)
+            cache.set_many(
+                {_get_cache_key(sku): sku_data for sku, sku_data in loaded.items()}, settings.SKU_CACHE_TIMEOUT
+            )
+            for sku, sku_data in loaded.items():
+                _cache_locally(sku, sku_data)
+
+    return data
+
+
+def get_product_by_sku(sku):
+    """
+    Returns the product of the stock record with the given partner SKU.
+
+    The SKU is resolved to a product ID from cache if possible, so the product is loaded by primary key.
+
+    Raises:
+        Product.DoesNotExist: If no stock record has the SKU.
+        StockRecord.MultipleObjectsReturned: If the stock records of several partners have the SKU.
+    """
+    Product = get_model('catalogue', 'Product')
+    StockRecord = get_model('partner', 'StockRecord')
+    try:
+        product_id = get_stock_record_data(sku)['product_id']
+    except StockRecord.DoesNotExist:
+        raise Product.DoesNotExist('No stock record has SKU [{}].'.format(sku))
+    return Product.objects.get(id=product_id)
+
+
+def invalidate_skus(skus):
+    """
+    Removes the given SKUs from the shared cache, and from the local cache of this process.
+
+    The SKUs are removed from the shared cache again once the current transaction is over, so that entries
+    cached in the meantime from data which was not committed yet are removed too.
+
+    Arguments:
+        skus (iterable): Partner SKUs of the changed stock records.
+    """
+    skus = list(skus)
+    with _lock:
+        for sku in skus:
+            _local_cache.pop(sku, None)
+    run_now_and_after_commit(cache.delete_many, [_get_cache_key(sku) for sku in skus])
+
+
+def warm_sku_cache(stock_records):
+    """
+    Stores data about the given stock records in the shared cache.
+
+    SKUs shared with the stock records of other partners are skipped, since they do not identify one stock record.
+
+    Arguments:
+        stock_records (iterable): Stock records to cache.
+
+    Returns:
+        int: Number of cached stock records.
+    """
+    StockRecord = get_model('partner', 'StockRecord')
+    stock_records = list(stock_records)
+    shared_skus = set(
+        StockRecord.objects.filter(partner_sku__in={stock_record.partner_sku for stock_record in stock_records})
+        .order_by()
+        .values('partner_sku')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .values_list('partner_sku', flat=True)
+    )
+    data = {
+        _get_cache_key(stock_record.partner_sku): _get_stock_record_data(stock_record)
+        for stock_record in stock_records if stock_record.partner_sku not in shared_skus
+    }
+    cache.set_many(data, settings.SKU_CACHE_TIMEOUT)
+    return len(data)
+
+
+def get_sku_cache_stats():
+    """ Returns the numbers of local hits, shared hits and misses of the SKU cache, counted by all processes. """
+    counts = get_counters([LOCAL_HITS_CACHE_KEY, HITS_CACHE_KEY, MISSES_CACHE_KEY])
+    return {
+        'local_hits': counts[LOCAL_HITS_CACHE_KEY],
+        'hits': counts[HITS_CACHE_KEY],
+        'misses': counts[MISSES_CACHE_KEY],
+    }
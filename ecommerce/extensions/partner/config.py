@@ -3,3 +3,10 @@ from oscar.apps.partner import config
 
 class PartnerConfig(config.PartnerConfig):
     name = 'ecommerce.extensions.partner'
+
+    def ready(self):  # pragma: no cover
+        super(PartnerConfig, self).ready()
+
+        # Register signal handlers
+        # noinspection PyUnresolvedReferences
+        import ecommerce.extensions.partner.signals  # pylint: disable=unused-variable
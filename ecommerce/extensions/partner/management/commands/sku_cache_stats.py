@@ -0,0 +1,18 @@
+""" Reports how often stock records are served from the SKU cache. """
+from django.core.management import BaseCommand
+
+from ecommerce.extensions.partner.cache import get_sku_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Report the numbers of local hits, shared hits and misses of the SKU cache.'
+
+    def handle(self, *args, **options):
+        stats = get_sku_cache_stats()
+        total = stats['local_hits'] + stats['hits'] + stats['misses']
+        hit_rate = 100.0 * (stats['local_hits'] + stats['hits']) / total if total else 0
+
+        self.stdout.write('Local hits: {local_hits}'.format(**stats))
+        self.stdout.write('Shared hits: {hits}'.format(**stats))
+        self.stdout.write('Misses: {misses}'.format(**stats))
+        self.stdout.write('Hit rate: {:.1f}%'.format(hit_rate))
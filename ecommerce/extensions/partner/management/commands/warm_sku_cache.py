@@ -0,0 +1,48 @@
+""" Stores every stock record in the shared SKU cache, e.g. after a deployment flushed it. """
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.partner.cache import warm_sku_cache
+
+StockRecord = get_model('partner', 'StockRecord')
+
+
+class Command(BaseCommand):
+    help = 'Store the stock records of all SKUs, or of the SKUs of a partner, in the shared SKU cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partner',
+                            action='store',
+                            dest='partner',
+                            default=None,
+                            help='Short code of the partner whose stock records are cached.')
+        parser.add_argument('-b', '--batch-size',
+                            action='store',
+                            dest='batch_size',
+                            default=1000,
+                            type=int,
+                            help='Number of stock records cached at once.')
+
+    def handle(self, *args, **options):
+        if not settings.SKU_CACHE_TIMEOUT:
+            raise CommandError('The SKU cache is disabled.')
+
+        stock_records = StockRecord.objects.order_by('id').only(
+            'id', 'partner_sku', 'price_currency', 'price_excl_tax', 'product_id'
+        )
+        if options['partner']:
+            stock_records = stock_records.filter(partner__short_code=options['partner'])
+
+        count = 0
+        last_id = 0
+        while True:
+            batch = list(stock_records.filter(id__gt=last_id)[:options['batch_size']])
+            if not batch:
+                break
+            count += warm_sku_cache(batch)
+            last_id = batch[-1].id
+
+        self.stdout.write('Cached {} stock records.'.format(count))
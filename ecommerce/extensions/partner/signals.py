@@ -0,0 +1,55 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.courses.models import Course
+from ecommerce.extensions.partner.cache import invalidate_skus
+
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+StockRecord = get_model('partner', 'StockRecord')
+
+# Attributes read to map the seats of a course to its enrollment codes.
+SWITCH_SKU_MAP_ATTRIBUTE_CODES = ('certificate_type', 'id_verification_required', 'seat_type')
+
+
+@receiver(pre_save, sender=StockRecord, dispatch_uid='partner.invalidate_previous_stock_record_sku')
+def invalidate_previous_stock_record_sku(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    # The SKU of a stock record may be changed, in which case its previous SKU is no longer valid either.
+    if instance.pk:
+        invalidate_skus(StockRecord.objects.filter(pk=instance.pk).values_list('partner_sku', flat=True))
+
+
+@receiver(post_save, sender=StockRecord, dispatch_uid='partner.invalidate_stock_record_sku')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='partner.invalidate_deleted_stock_record_sku')
+def invalidate_stock_record_sku(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_skus([instance.partner_sku])
+
+
+@receiver(post_save, sender=Product, dispatch_uid='partner.invalidate_product_skus')
+def invalidate_product_skus(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    if not created:
+        invalidate_skus(instance.stockrecords.values_list('partner_sku', flat=True))
+
+
+@receiver(post_save, sender=StockRecord, dispatch_uid='partner.invalidate_stock_record_switch_sku_map')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='partner.invalidate_deleted_stock_record_switch_sku_map')
+def invalidate_stock_record_switch_sku_map(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    for course_id in Product.objects.filter(id=instance.product_id).values_list('course_id', flat=True):
+        if course_id:
+            Course.invalidate_switch_sku_map(course_id)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='partner.invalidate_product_switch_sku_map')
+@receiver(post_delete, sender=Product, dispatch_uid='partner.invalidate_deleted_product_switch_sku_map')
+def invalidate_product_switch_sku_map(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    # Products are mapped by the SKUs of their stock records, which new products do not have yet.
+    if instance.course_id and not kwargs.get('created'):
+        Course.invalidate_switch_sku_map(instance.course_id)
+
+
+@receiver(post_save, sender=ProductAttributeValue, dispatch_uid='partner.invalidate_attribute_switch_sku_map')
+@receiver(post_delete, sender=ProductAttributeValue, dispatch_uid='partner.invalidate_deleted_attribute_sku_map')
+def invalidate_attribute_switch_sku_map(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    if instance.attribute.code in SWITCH_SKU_MAP_ATTRIBUTE_CODES and instance.product.course_id:
+        Course.invalidate_switch_sku_map(instance.product.course_id)
@@ -0,0 +1,137 @@
+from decimal import Decimal
+
+import mock
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from oscar.core.loading import get_model
+from oscar.test import factories
+
+from ecommerce.extensions.partner import cache as sku_cache
+from ecommerce.tests.factories import PartnerFactory
+from ecommerce.tests.testcases import TestCase
+
+Product = get_model('catalogue', 'Product')
+StockRecord = get_model('partner', 'StockRecord')
+
+
+@override_settings(SKU_CACHE_TIMEOUT=3600)
+class SkuCacheTests(TestCase):
+    def setUp(self):
+        super(SkuCacheTests, self).setUp()
+        self.addCleanup(cache.clear)
+        self.addCleanup(sku_cache._local_cache.clear)  # pylint: disable=protected-access
+        sku_cache._local_counts.update({key: 0 for key in sku_cache._local_counts})  # pylint: disable=protected-access
+        self.product = factories.ProductFactory(stockrecords__partner=self.partner)
+        self.stock_record = self.product.stockrecords.first()
+        self.sku = self.stock_record.partner_sku
+
+    def assert_stock_record_data(self, stock_record, num_queries):
+        with self.assertNumQueries(num_queries):
+            data = sku_cache.get_stock_record_data(stock_record.partner_sku)
+        self.assertEqual(data, {
+            'partner_id': stock_record.partner_id,
+            'price_currency': stock_record.price_currency,
+            'price_excl_tax': stock_record.price_excl_tax,
+            'product_id': stock_record.product_id,
+            'stock_record_id': stock_record.id,
+        })
+
+    def test_local_and_shared_tiers(self):
+        """ Verify stock records are loaded once, then served locally or from the shared cache. """
+        self.assert_stock_record_data(self.stock_record, 1)
+        self.assert_stock_record_data(self.stock_record, 0)
+
+        sku_cache._local_cache.clear()  # pylint: disable=protected-access
+        with mock.patch.object(sku_cache.cache, 'get', wraps=cache.get) as mock_get:
+            self.assert_stock_record_data(self.stock_record, 0)
+            self.assertTrue(mock_get.called)
+
+    def test_local_entries_expire(self):
+        """ Verify local entries are only served for SKU_CACHE_LOCAL_TIMEOUT seconds. """
+        self.assert_stock_record_data(self.stock_record, 1)
+        sku_cache._local_cache.clear()  # pylint: disable=protected-access
+        with override_settings(SKU_CACHE_LOCAL_TIMEOUT=-1):
+            sku_cache.get_stock_record_data(self.sku)
+        with mock.patch.object(sku_cache.cache, 'get', wraps=cache.get) as mock_get:
+            self.assert_stock_record_data(self.stock_record, 0)
+            self.assertTrue(mock_get.called)
+
+    def test_stock_record_changes_invalidate(self):
+        """ Verify saved and deleted stock records, including renamed SKUs, are no longer served from cache. """
+        self.assert_stock_record_data(self.stock_record, 1)
+        self.stock_record.price_excl_tax = Decimal('12.34')
+        self.stock_record.save()
+        self.assert_stock_record_data(self.stock_record, 1)
+
+        previous_sku = self.sku
+        self.stock_record.partner_sku = 'renamed-sku'
+        self.stock_record.save()
+        self.assertRaises(StockRecord.DoesNotExist, sku_cache.get_stock_record_data, previous_sku)
+        self.assert_stock_record_data(self.stock_record, 1)
+
+        self.stock_record.delete()
+        self.assertRaises(StockRecord.DoesNotExist, sku_cache.get_stock_record_data, 'renamed-sku')
+
+    def test_product_changes_invalidate(self):
+        """ Verify the SKUs of saved products are no longer served from cache. """
+        self.assert_stock_record_data(self.stock_record, 1)
+        self.product.save()
+        self.assert_stock_record_data(self.stock_record, 1)
+
+    def test_get_stock_records_data(self):
+        """ Verify stock records are looked up locally, then together in the shared cache, then in one query. """
+        other_stock_record = factories.ProductFactory(stockrecords__partner=self.partner).stockrecords.first()
+        skus = [self.sku, other_stock_record.partner_sku, 'not-a-sku']
+        with self.assertNumQueries(1):
+            data = sku_cache.get_stock_records_data(skus)
+        self.assertEqual(data, {
+            self.sku: sku_cache.get_stock_record_data(self.sku),
+            other_stock_record.partner_sku: sku_cache.get_stock_record_data(other_stock_record.partner_sku),
+        })
+
+        sku_cache._local_cache.pop(self.sku)  # pylint: disable=protected-access
+        with mock.patch.object(sku_cache.cache, 'get_many', wraps=cache.get_many) as mock_get_many:
+            with self.assertNumQueries(1):
+                self.assertEqual(sku_cache.get_stock_records_data(skus), data)
+        self.assertEqual(mock_get_many.call_count, 1)
+        self.assertEqual(
+            set(mock_get_many.call_args[0][0]),
+            {sku_cache._get_cache_key(sku) for sku in (self.sku, 'not-a-sku')}  # pylint: disable=protected-access
+        )
+
+    def test_get_product_by_sku(self):
+        """ Verify products are loaded by the ID of their cached SKU. """
+        self.assertEqual(sku_cache.get_product_by_sku(self.sku), self.product)
+        with self.assertNumQueries(1):
+            self.assertEqual(sku_cache.get_product_by_sku(self.sku), self.product)
+        self.assertRaises(Product.DoesNotExist, sku_cache.get_product_by_sku, 'not-a-sku')
+
+    @mock.patch.object(sku_cache, '_COUNTS_FLUSH_INTERVAL', 1)
+    def test_stats(self):
+        """ Verify local hits, shared hits and misses are counted. """
+        sku_cache.get_stock_record_data(self.sku)
+        sku_cache.get_stock_record_data(self.sku)
+        sku_cache._local_cache.clear()  # pylint: disable=protected-access
+        sku_cache.get_stock_record_data(self.sku)
+        self.assertEqual(sku_cache.get_sku_cache_stats(), {'local_hits': 1, 'hits': 1, 'misses': 1})
+
+    def test_warm_sku_cache(self):
+        """ Verify the management command stores every stock record in the shared cache. """
+        other_stock_record = factories.ProductFactory().stockrecords.first()
+        call_command('warm_sku_cache', batch_size=1)
+
+        self.assert_stock_record_data(self.stock_record, 0)
+        self.assert_stock_record_data(other_stock_record, 0)
+
+    def test_shared_skus_not_cached(self):
+        """ Verify SKUs shared by the stock records of several partners are neither cached nor served. """
+        factories.ProductFactory(stockrecords__partner=PartnerFactory(), stockrecords__partner_sku=self.sku)
+        other_stock_record = factories.ProductFactory().stockrecords.first()
+        call_command('warm_sku_cache')
+
+        with self.assertNumQueries(1):
+            self.assertRaises(StockRecord.MultipleObjectsReturned, sku_cache.get_stock_record_data, self.sku)
+        self.assertRaises(StockRecord.MultipleObjectsReturned, sku_cache.get_product_by_sku, self.sku)
+        self.assertNotIn(self.sku, sku_cache.get_stock_records_data([self.sku]))
+        self.assert_stock_record_data(other_stock_record, 0)
@@ -11,6 +11,7 @@ from simple_history.models import HistoricalRecords
 
 from ecommerce.extensions.analytics.utils import audit_log
 from ecommerce.extensions.fulfillment.api import revoke_fulfillment_for_refund
+from ecommerce.extensions.order.cache import invalidate_serialized_orders
 from ecommerce.extensions.order.constants import PaymentEventTypeName
 from ecommerce.extensions.payment.helpers import get_processor_class_by_name
 from ecommerce.extensions.refund.exceptions import InvalidStatus
@@ -131,6 +132,8 @@ class Refund(StatusMixin, TimeStampedModel):
                     status=status
                 )
 
+            invalidate_serialized_orders([order.number])
+
             if total_credit_excl_tax == 0:
                 refund.approve()
 
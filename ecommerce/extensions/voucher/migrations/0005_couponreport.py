@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.db import migrations, models
+import django.utils.timezone
+import django_extensions.db.fields
+
+from ecommerce.core.constants import ASYNC_COUPON_REPORTS_SWITCH
+
+
+def create_switch(apps, schema_editor):
+    """Create a switch for generating coupon reports in the background."""
+    Switch = apps.get_model('waffle', 'Switch')
+    Switch.objects.get_or_create(name=ASYNC_COUPON_REPORTS_SWITCH, defaults={'active': False})
+
+
+def remove_switch(apps, schema_editor):
+    """Remove the background coupon reports switch."""
+    Switch = apps.get_model('waffle', 'Switch')
+    Switch.objects.filter(name=ASYNC_COUPON_REPORTS_SWITCH).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalogue', '0020_auto_20161025_1446'),
+        ('sites', '0001_initial'),
+        ('waffle', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('voucher', '0004_auto_20160517_0930'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CouponReport',
+            fields=[
+                ('id', models.AutoField(verbose_name='ID', serialize=False, auto_created=True, primary_key=True)),
+                ('created', django_extensions.db.fields.CreationDateTimeField(default=django.utils.timezone.now, verbose_name='created', editable=False, blank=True)),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(default=django.utils.timezone.now, verbose_name='modified', editable=False, blank=True)),
+                ('status', models.CharField(default=b'Pending', max_length=255, choices=[(b'Pending', 'Pending'), (b'In Progress', 'In Progress'), (b'Complete', 'Complete'), (b'Failed', 'Failed')])),
+                ('fingerprint', models.CharField(help_text='Hash of the coupon state the report was generated from.', max_length=32, db_index=True)),
+                ('compressed', models.BooleanField(default=False)),
+                ('file_name', models.CharField(max_length=255, blank=True)),
+                ('total_vouchers', models.PositiveIntegerField(default=0)),
+                ('processed_vouchers', models.PositiveIntegerField(default=0)),
+                ('coupon', models.ForeignKey(related_name='coupon_reports', to='catalogue.Product')),
+                ('requested_by', models.ForeignKey(blank=True, to=settings.AUTH_USER_MODEL, null=True)),
+                ('site', models.ForeignKey(blank=True, to='sites.Site', null=True)),
+            ],
+            options={
+                'ordering': ('-modified', '-created'),
+                'abstract': False,
+                'get_latest_by': 'modified',
+            },
+        ),
+        migrations.RunPython(create_switch, remove_switch),
+    ]
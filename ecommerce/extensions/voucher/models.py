@@ -1,7 +1,10 @@
 import datetime
 import logging
 
+from django.conf import settings
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
+from django_extensions.db.models import TimeStampedModel
 from oscar.apps.voucher.abstract_models import AbstractVoucher
 
 from ecommerce.core.utils import log_message_and_raise_validation_error
@@ -24,6 +27,38 @@ class OrderLineVouchers(models.Model):
     vouchers = models.ManyToManyField('voucher.Voucher', related_name='order_line_vouchers')
 
 
+class CouponReport(TimeStampedModel):
+    """ Coupon report CSV generated in the background and stored in COUPON_REPORT_STORAGE_CLASS. """
+    PENDING, IN_PROGRESS, COMPLETE, FAILED = 'Pending', 'In Progress', 'Complete', 'Failed'
+    status_choices = (
+        (PENDING, _('Pending')),
+        (IN_PROGRESS, _('In Progress')),
+        (COMPLETE, _('Complete')),
+        (FAILED, _('Failed')),
+    )
+    coupon = models.ForeignKey('catalogue.Product', related_name='coupon_reports')
+    site = models.ForeignKey('sites.Site', null=True, blank=True)
+    requested_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True)
+    status = models.CharField(max_length=255, default=PENDING, choices=status_choices)
+    fingerprint = models.CharField(
+        max_length=32, db_index=True,
+        help_text=_('Hash of the coupon state the report was generated from.')
+    )
+    compressed = models.BooleanField(default=False)
+    file_name = models.CharField(max_length=255, blank=True)
+    total_vouchers = models.PositiveIntegerField(default=0)
+    processed_vouchers = models.PositiveIntegerField(default=0)
+
+    @property
+    def progress(self):
+        """ Percentage of the coupon's vouchers written to the report. """
+        if self.status == self.COMPLETE:
+            return 100
+        if not self.total_vouchers:
+            return 0
+        return min(100, self.processed_vouchers * 100 // self.total_vouchers)
+
+
 class Voucher(AbstractVoucher):
     def save(self, *args, **kwargs):
         self.clean()
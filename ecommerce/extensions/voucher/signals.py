@@ -0,0 +1,76 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from oscar.core.loading import get_model
+
+from ecommerce.core.utils import get_changed_m2m_ids
+from ecommerce.extensions.voucher.utils import (
+    invalidate_voucher_redemption_bundle, invalidate_voucher_redemption_cache
+)
+
+Benefit = get_model('offer', 'Benefit')
+Catalog = get_model('catalogue', 'Catalog')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
+Product = get_model('catalogue', 'Product')
+ProductAttributeValue = get_model('catalogue', 'ProductAttributeValue')
+Range = get_model('offer', 'Range')
+RangeProduct = get_model('offer', 'RangeProduct')
+StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
+
+
+@receiver(post_save, sender=Voucher, dispatch_uid='voucher.invalidate_voucher_redemption_cache')
+def invalidate_voucher(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_bundle(instance.code)
+    invalidate_voucher_redemption_cache('voucher', [instance.id])
+
+
+@receiver(m2m_changed, sender=Voucher.offers.through, dispatch_uid='voucher.invalidate_voucher_offers')
+def invalidate_voucher_offers(sender, instance, action, reverse, model, pk_set,
+                              **kwargs):  # pylint: disable=unused-argument
+    voucher_ids = get_changed_m2m_ids(sender, instance, action, reverse, model, pk_set)
+    if voucher_ids is not None:
+        invalidate_voucher_redemption_cache('voucher', voucher_ids)
+
+
+@receiver(post_save, sender=ConditionalOffer, dispatch_uid='voucher.invalidate_offer_redemption_cache')
+def invalidate_offer(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_cache('offer', [instance.id])
+
+
+@receiver(post_save, sender=Benefit, dispatch_uid='voucher.invalidate_benefit_redemption_cache')
+def invalidate_benefit(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_cache('benefit', [instance.id])
+
+
+@receiver(post_save, sender=Range, dispatch_uid='voucher.invalidate_range_redemption_cache')
+def invalidate_range(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_cache('range', [instance.id])
+
+
+@receiver(post_save, sender=RangeProduct, dispatch_uid='voucher.invalidate_range_product_saved')
+@receiver(post_delete, sender=RangeProduct, dispatch_uid='voucher.invalidate_range_product_deleted')
+def invalidate_range_products(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_cache('range', [instance.range_id])
+
+
+@receiver(m2m_changed, sender=Catalog.stock_records.through, dispatch_uid='voucher.invalidate_catalog_stock_records')
+def invalidate_catalog_stock_records(sender, instance, action, reverse, model, pk_set,
+                                     **kwargs):  # pylint: disable=unused-argument
+    catalog_ids = get_changed_m2m_ids(sender, instance, action, reverse, model, pk_set)
+    if catalog_ids:
+        range_ids = Range.objects.filter(catalog__in=catalog_ids).values_list('id', flat=True)
+        invalidate_voucher_redemption_cache('range', range_ids)
+
+
+@receiver(post_save, sender=Product, dispatch_uid='voucher.invalidate_product_redemption_cache')
+def invalidate_product(sender, instance, created, **kwargs):  # pylint: disable=unused-argument
+    if not created:
+        invalidate_voucher_redemption_cache('product', [instance.id])
+
+
+@receiver(post_save, sender=StockRecord, dispatch_uid='voucher.invalidate_stock_record_saved')
+@receiver(post_delete, sender=StockRecord, dispatch_uid='voucher.invalidate_stock_record_deleted')
+@receiver(post_save, sender=ProductAttributeValue, dispatch_uid='voucher.invalidate_attribute_value_saved')
+@receiver(post_delete, sender=ProductAttributeValue, dispatch_uid='voucher.invalidate_attribute_value_deleted')
+def invalidate_product_relations(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    invalidate_voucher_redemption_cache('product', [instance.product_id])
@@ -0,0 +1,27 @@
+import logging
+
+from celery import shared_task
+from oscar.core.loading import get_model
+
+from ecommerce.extensions.voucher.utils import write_coupon_report
+
+logger = logging.getLogger(__name__)
+
+CouponReport = get_model('voucher', 'CouponReport')
+
+
+@shared_task
+def generate_coupon_report_task(report_id):
+    """
+    Generate and store the CSV of a coupon report.
+
+    Args:
+        report_id (int): ID of the CouponReport to generate.
+    """
+    report = CouponReport.objects.get(id=report_id)
+
+    try:
+        write_coupon_report(report)
+    except Exception:  # pylint: disable=broad-except
+        logger.exception('Failed to generate report [%d] for coupon [%d].', report.id, report.coupon_id)
+        CouponReport.objects.filter(id=report.id).update(status=CouponReport.FAILED)
@@ -3,9 +3,11 @@ from __future__ import unicode_literals
 
 import ddt
 import httpretty
+import pytz
 from django.core.exceptions import ValidationError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import ugettext_lazy as _
 from oscar.templatetags.currency_filters import currency
 from oscar.test.factories import *  # pylint:disable=wildcard-import,unused-wildcard-import
@@ -14,11 +16,13 @@ from ecommerce.core.url_utils import get_ecommerce_url
 from ecommerce.core.tests.decorators import mock_course_catalog_api_client
 from ecommerce.coupons.tests.mixins import CouponMixin, CourseCatalogMockMixin
 from ecommerce.courses.tests.factories import CourseFactory
+from ecommerce.extensions.api import exceptions
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
 from ecommerce.extensions.fulfillment.modules import CouponFulfillmentModule
 from ecommerce.extensions.fulfillment.status import LINE
 from ecommerce.extensions.voucher.utils import (
-    create_vouchers, generate_coupon_report, get_voucher_discount_info, update_voucher_offer
+    _get_voucher_offer, create_vouchers, generate_coupon_report, get_voucher_and_products_from_code,
+    get_voucher_discount_info, get_voucher_redemption_bundle, iter_coupon_report, update_voucher_offer
 )
 from ecommerce.tests.mixins import LmsApiMockMixin
 from ecommerce.tests.testcases import TestCase
@@ -26,6 +30,7 @@ from ecommerce.tests.testcases import TestCase
 Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Catalog = get_model('catalogue', 'Catalog')
+ConditionalOffer = get_model('offer', 'ConditionalOffer')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
@@ -191,6 +196,58 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(voucher.start_datetime, self.data['start_datetime'])
         self.assertEqual(voucher.usage, Voucher.SINGLE_USE)
 
+    @override_settings(VOUCHER_BULK_CREATE_BATCH_SIZE=3)
+    def test_create_vouchers_in_batches(self):
+        """ Verify vouchers spanning several batches get unique codes and are linked to the offer and coupon. """
+        vouchers = create_vouchers(**self.data)
+
+        self.assertEqual(len(vouchers), 10)
+        self.assertEqual(len(set(voucher.code for voucher in vouchers)), 10)
+        self.assertTrue(all(voucher.id for voucher in vouchers))
+
+        coupon_voucher = CouponVouchers.objects.get(coupon=self.coupon)
+        self.assertEqual(coupon_voucher.vouchers.filter(id__in=[voucher.id for voucher in vouchers]).count(), 10)
+
+        offer = vouchers[0].offers.get()
+        for voucher in vouchers:
+            self.assertEqual(list(voucher.offers.all()), [offer])
+
+    @ddt.data(Voucher.MULTI_USE, Voucher.ONCE_PER_CUSTOMER)
+    def test_create_vouchers_with_individual_offers(self, voucher_type):
+        """ Verify multi-use and once-per-customer vouchers each get their own offer. """
+        self.data.update({
+            'benefit_value': 50.00,
+            'max_uses': 5,
+            'voucher_type': voucher_type,
+        })
+        vouchers = create_vouchers(**self.data)
+        offers = [voucher.offers.get() for voucher in vouchers]
+
+        self.assertEqual(len(set(offer.id for offer in offers)), 10)
+        self.assertEqual(len(set(offer.slug for offer in offers)), 10)
+        for offer in offers:
+            self.assertEqual(offer.max_global_applications, 5)
+            self.assertEqual(offer.benefit.value, 50.00)
+            self.assertEqual(offer.status, ConditionalOffer.OPEN)
+            self.assertTrue(offer.slug)
+
+        # Offers are reused when vouchers are created again for the same coupon.
+        vouchers = create_vouchers(**self.data)
+        self.assertEqual([voucher.offers.get() for voucher in vouchers], offers)
+
+    def test_create_vouchers_query_count(self):
+        """ Verify the number of queries does not grow with the number of vouchers in a batch. """
+        create_vouchers(**self.data)
+
+        query_counts = []
+        for quantity in (10, 100):
+            self.data['quantity'] = quantity
+            with CaptureQueriesContext(connection) as context:
+                create_vouchers(**self.data)
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
     @ddt.data(
         {'end_datetime': ''},
         {'end_datetime': 3},
@@ -458,6 +515,49 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertIn('Redeemed For Course ID', field_names)
         self.assertNotIn('Redeemed For Course ID', rows[0])
 
+    def create_redeemed_coupon(self, quantity):
+        """ Create a coupon with the given number of vouchers and redeem every voucher once. """
+        coupon = self.create_coupon(title='Tešt product', catalog=self.catalog, note='Tešt note', quantity=quantity)
+        coupon.history.all().update(history_user=self.user)
+        for index, voucher in enumerate(coupon.attr.coupon_vouchers.vouchers.all()):
+            self.use_voucher('TEST-{}-{}'.format(coupon.id, index), voucher, self.user)
+        return coupon
+
+    def test_iter_coupon_report_chunks(self):
+        """ Verify walking vouchers in chunks yields the same rows as building the whole report. """
+        coupon = self.create_redeemed_coupon(quantity=5)
+        coupon_vouchers = [coupon.attr.coupon_vouchers]
+
+        expected_field_names, expected_rows = generate_coupon_report(coupon_vouchers)
+        field_names, rows = iter_coupon_report(coupon_vouchers, chunk_size=2)
+
+        self.assertEqual(field_names, expected_field_names)
+        self.assertEqual(list(rows), expected_rows)
+        self.assertEqual(len(expected_rows), 11)
+
+    def test_coupon_report_query_count(self):
+        """ Verify the number of queries does not grow with the number of vouchers and redemptions. """
+        query_counts = []
+        for quantity in (2, 6):
+            coupon_vouchers = [self.create_redeemed_coupon(quantity).attr.coupon_vouchers]
+            with CaptureQueriesContext(connection) as context:
+                __, rows = generate_coupon_report(coupon_vouchers)
+            query_counts.append(len(context.captured_queries))
+            self.assertEqual(len(rows), 1 + quantity * 2)
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+    def test_get_voucher_offer(self):
+        """ Verify the prefetched offer of a voucher is the one voucher.offers.first() returns. """
+        voucher = VoucherFactory()
+        voucher.offers.add(ConditionalOfferFactory(priority=0), ConditionalOfferFactory(priority=5))
+        expected = voucher.offers.first()
+        self.assertEqual(expected.priority, 5)
+
+        voucher = Voucher.objects.prefetch_related('offers').get(id=voucher.id)
+        with self.assertNumQueries(0):
+            self.assertEqual(_get_voucher_offer(voucher), expected)
+
     def test_get_voucher_discount_info(self):
         """ Verify that get_voucher_discount_info() returns correct info. """
         benefits = self.create_benefits()
@@ -571,3 +671,50 @@ class UtilTests(CouponMixin, CourseCatalogMockMixin, CourseCatalogTestMixin, Lms
         self.assertEqual(new_offer.benefit.value, 50.00)
         self.assertEqual(new_offer.benefit.range.catalog, self.catalog)
         self.assertEqual(new_offer.email_domains, new_email_domains)
+
+    def test_voucher_redemption_bundle_cached(self):
+        """ Verify the redemption bundle is served from cache once built, loading only the voucher, offer and
+        products by primary key. """
+        code = self.coupon.coupon_vouchers.first().vouchers.first().code
+        bundle = get_voucher_redemption_bundle(code)
+        self.assertEqual(bundle['voucher'].code, code)
+        self.assertEqual(bundle['product_ids'], [self.verified_seat.id])
+        self.assertEqual(bundle['skus'], [self.stock_record.partner_sku])
+
+        with self.assertNumQueries(3):
+            voucher, products = get_voucher_and_products_from_code(code)
+        self.assertEqual(voucher.code, code)
+        self.assertEqual(products, [self.verified_seat])
+
+    def test_voucher_redemption_bundle_invalidation(self):
+        """ Verify changes to the voucher, its offer, benefit and range invalidate the cached bundle. """
+        voucher = self.coupon.coupon_vouchers.first().vouchers.first()
+        offer = voucher.offers.first()
+        get_voucher_redemption_bundle(voucher.code)
+
+        voucher.name = 'Updated name'
+        voucher.save()
+        self.assertEqual(get_voucher_redemption_bundle(voucher.code)['voucher'].name, 'Updated name')
+
+        offer.max_global_applications = 5
+        offer.save()
+        self.assertEqual(get_voucher_redemption_bundle(voucher.code)['offer'].max_global_applications, 5)
+
+        offer.benefit.value = 42
+        offer.benefit.save()
+        self.assertEqual(get_voucher_redemption_bundle(voucher.code)['offer'].benefit.value, 42)
+
+        expires = datetime.datetime(2030, 1, 1, tzinfo=pytz.UTC)
+        self.verified_seat.expires = expires
+        self.verified_seat.save()
+        self.assertEqual(get_voucher_redemption_bundle(voucher.code)['products'][0].expires, expires)
+
+        audit_seat = self.course.create_or_update_seat('audit', False, 0, self.partner)
+        self.catalog.stock_records.add(StockRecord.objects.get(product=audit_seat))
+        self.assertEqual(
+            set(get_voucher_redemption_bundle(voucher.code)['product_ids']), {self.verified_seat.id, audit_seat.id}
+        )
+
+        self.catalog.stock_records.clear()
+        with self.assertRaises(exceptions.ProductNotFoundError):
+            get_voucher_and_products_from_code(voucher.code)
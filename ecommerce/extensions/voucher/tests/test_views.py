@@ -1,8 +1,21 @@
+import datetime
+import gzip
+import json
+import shutil
+import tempfile
+from StringIO import StringIO
+
 import httpretty
-from django.test import RequestFactory
+from django.conf import settings
+from django.core.urlresolvers import reverse
+from django.http import StreamingHttpResponse
+from django.test import RequestFactory, override_settings
+from django.utils.timezone import now
 from oscar.core.loading import get_model
 from oscar.test import factories
 
+from ecommerce.core.constants import ASYNC_COUPON_REPORTS_SWITCH
+from ecommerce.core.tests import toggle_switch
 from ecommerce.coupons.tests.mixins import CouponMixin
 from ecommerce.courses.tests.factories import CourseFactory
 from ecommerce.extensions.catalogue.tests.mixins import CourseCatalogTestMixin
@@ -13,6 +26,7 @@ from ecommerce.tests.testcases import TestCase
 
 Basket = get_model('basket', 'Basket')
 Catalog = get_model('catalogue', 'Catalog')
+CouponReport = get_model('voucher', 'CouponReport')
 StockRecord = get_model('partner', 'StockRecord')
 
 
@@ -62,6 +76,24 @@ class CouponReportCSVViewTest(CouponMixin, CourseCatalogTestMixin, LmsApiMockMix
         self.request_specific_voucher_report(self.coupon1)
         self.request_specific_voucher_report(self.coupon2)
 
+    @httpretty.activate
+    @override_settings(COUPON_REPORT_STREAMING_THRESHOLD=0)
+    def test_streamed_csv_report(self):
+        """ Verify reports for coupons above the streaming threshold are streamed. """
+        self.mock_course_api_response(course=self.course)
+        client = factories.UserFactory()
+        basket = Basket.get_basket(client, self.site)
+        basket.add_product(self.coupon1)
+
+        response = CouponReportCSVView().get(RequestFactory(), coupon_id=self.coupon1.id)
+
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content)
+        self.assertEqual(len(content.splitlines()), 7)
+        self.assertTrue(content.startswith(b'Code,Coupon Name,'))
+
     def test_report_missing_stockrecord_raises_http404(self):
         """ Verify that Http404 is raised when no StockRecord for coupon """
         StockRecord.objects.get(product=self.coupon1).delete()
@@ -70,3 +102,96 @@ class CouponReportCSVViewTest(CouponMixin, CourseCatalogTestMixin, LmsApiMockMix
         self.assertEqual(response.content,
                          'Failed to find a matching stock record for coupon, report download canceled.')
         self.assertEqual(response.status_code, 404)
+
+
+@httpretty.activate
+class BackgroundCouponReportTests(CouponMixin, CourseCatalogTestMixin, LmsApiMockMixin, TestCase):
+    """Tests for coupon reports generated by a Celery task."""
+
+    def setUp(self):
+        super(BackgroundCouponReportTests, self).setUp()
+        toggle_switch(ASYNC_COUPON_REPORTS_SWITCH, True)
+
+        self.user = self.create_user(full_name="Test User", is_staff=True)
+        self.client.login(username=self.user.username, password=self.password)
+
+        course = CourseFactory()
+        self.mock_course_api_response(course=course)
+        seat = course.create_or_update_seat('verified', False, 0, self.partner)
+        catalog = Catalog.objects.create(name="Test catalog", partner=self.partner)
+        catalog.stock_records.add(StockRecord.objects.get(product=seat))
+        self.coupon = self.create_coupon(catalog=catalog)
+        self.coupon.history.all().update(history_user=self.user)
+
+        report_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, report_dir)
+        storage_settings = override_settings(COUPON_REPORT_STORAGE_KWARGS={'location': report_dir})
+        storage_settings.enable()
+        self.addCleanup(storage_settings.disable)
+
+    def request_report(self):
+        response = self.client.get(reverse('api:v2:coupons:coupon_reports', args=[self.coupon.id]))
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.content)
+
+    def download_report(self, data):
+        response = self.client.get(data['download_url'])
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_report_generated_in_background(self):
+        """ Verify the report is generated by the task and can be downloaded once complete. """
+        data = self.request_report()
+        report = CouponReport.objects.get(id=data['id'])
+
+        self.assertEqual(data['status'], CouponReport.COMPLETE)
+        self.assertEqual(data['progress'], 100)
+        self.assertEqual(report.total_vouchers, 5)
+        self.assertEqual(report.processed_vouchers, 5)
+        self.assertEqual(report.requested_by, self.user)
+        self.assertEqual(len(self.download_report(data).splitlines()), 7)
+
+        response = self.client.get(reverse('api:v2:coupons:coupon_report_status', args=[report.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['status'], CouponReport.COMPLETE)
+
+    def test_report_reused_for_unchanged_coupon(self):
+        """ Verify a stored report is reused until the coupon changes. """
+        report_id = self.request_report()['id']
+        self.assertEqual(self.request_report()['id'], report_id)
+        self.assertEqual(CouponReport.objects.count(), 1)
+
+        self.coupon.save()
+        self.assertNotEqual(self.request_report()['id'], report_id)
+        self.assertEqual(CouponReport.objects.count(), 2)
+
+    def test_stale_report_replaced(self):
+        """ Verify reports which have made no progress for COUPON_REPORT_STALE_TIMEOUT seconds are not reused. """
+        report_id = self.request_report()['id']
+        CouponReport.objects.filter(id=report_id).update(
+            status=CouponReport.PENDING,
+            modified=now() - datetime.timedelta(seconds=settings.COUPON_REPORT_STALE_TIMEOUT + 1)
+        )
+
+        self.assertNotEqual(self.request_report()['id'], report_id)
+        self.assertEqual(CouponReport.objects.get(id=report_id).status, CouponReport.FAILED)
+
+    @override_settings(COUPON_REPORT_GZIP=True)
+    def test_compressed_report(self):
+        """ Verify compressed reports are stored and downloaded gzip-compressed. """
+        data = self.request_report()
+        self.assertTrue(data['compressed'])
+
+        content = gzip.GzipFile(fileobj=StringIO(self.download_report(data))).read()
+        self.assertEqual(len(content.splitlines()), 7)
+
+    def test_download_incomplete_report(self):
+        """ Verify reports which are not complete cannot be downloaded. """
+        report = CouponReport.objects.create(coupon=self.coupon, fingerprint='abc')
+        response = self.client.get(reverse('api:v2:coupons:coupon_report_download', args=[report.id]))
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(reverse('api:v2:coupons:coupon_report_status', args=[report.id]))
+        data = json.loads(response.content)
+        self.assertEqual(data['status'], CouponReport.PENDING)
+        self.assertIsNone(data['download_url'])
@@ -1,21 +1,33 @@
 """Voucher Utility Methods. """
 from decimal import Decimal, DecimalException
 import base64
+import csv
 import datetime
+import gzip
 import hashlib
+import json
 import logging
+import tempfile
+import time
 import uuid
 
 import dateutil.parser
 from django.conf import settings
 from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import get_storage_class
 from django.core.urlresolvers import reverse
+from django.db.models import Case, Count, IntegerField, Max, Sum, Value, When
+from django.utils import timezone
+from django.utils.text import slugify
 from django.utils.translation import ugettext_lazy as _
 from opaque_keys.edx.keys import CourseKey
 from oscar.core.loading import get_model
 from oscar.templatetags.currency_filters import currency
 import pytz
 
+from ecommerce.core.cache import get_versions, invalidate_versions
+from ecommerce.core.transactions import run_now_and_after_commit
 from ecommerce.core.url_utils import get_ecommerce_url
 from ecommerce.core.utils import log_message_and_raise_validation_error
 from ecommerce.extensions.api import exceptions
@@ -28,7 +40,9 @@ Basket = get_model('basket', 'Basket')
 Benefit = get_model('offer', 'Benefit')
 Condition = get_model('offer', 'Condition')
 ConditionalOffer = get_model('offer', 'ConditionalOffer')
+CouponReport = get_model('voucher', 'CouponReport')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
+Line = get_model('order', 'Line')
 Order = get_model('order', 'Order')
 Product = get_model('catalogue', 'Product')
 ProductCategory = get_model('catalogue', 'ProductCategory')
@@ -82,10 +96,22 @@ def _get_discount_info(discount_data):
     return None, None, None
 
 
+def _get_voucher_offer(voucher):
+    """
+    Return the first offer of a voucher, using prefetched offers when they are available.
+
+    Unlike voucher.offers.first(), this does not issue a query when offers were
+    loaded with prefetch_related('offers'). Offers are ordered as ConditionalOffer orders
+    them, by descending priority, with ties broken by primary key.
+    """
+    offers = sorted(voucher.offers.all(), key=lambda offer: (-offer.priority, offer.pk))
+    return offers[0] if offers else None
+
+
 def _get_info_for_coupon_report(coupon, voucher):
     history = coupon.history.first()
     author = history.history_user.full_name
-    category_name = ProductCategory.objects.get(product=coupon).category.name
+    category_name = ProductCategory.objects.select_related('category').get(product=coupon).category.name
 
     try:
         note = coupon.attr.note
@@ -97,7 +123,7 @@ def _get_info_for_coupon_report(coupon, voucher):
     invoiced_amount = currency(coupon_stockrecord.price_excl_tax)
     if offer.condition.range.catalog:
         seat_stockrecord = offer.condition.range.catalog.stock_records.first()
-        course_id = seat_stockrecord.product.attr.course_key
+        course_id = seat_stockrecord.product.seat_attr.course_key
         course_organization = CourseKey.from_string(course_id).org
         price = currency(seat_stockrecord.price_excl_tax)
         discount_data = get_voucher_discount_info(offer.benefit, seat_stockrecord.price_excl_tax)
@@ -144,11 +170,10 @@ def _get_info_for_coupon_report(coupon, voucher):
     return coupon_data
 
 
-def _get_voucher_info_for_coupon_report(voucher):
-    offer = voucher.offers.first()
+def _get_voucher_info_for_coupon_report(voucher, redeem_url):
+    offer = _get_voucher_offer(voucher)
     status = _get_voucher_status(voucher, offer)
-    path = '{path}?code={code}'.format(path=reverse('coupons:offer'), code=voucher.code)
-    url = get_ecommerce_url(path)
+    url = '{url}?code={code}'.format(url=redeem_url, code=voucher.code)
 
     # Set the max_uses_count for single-use vouchers to 1,
     # for other usage limitations (once per customer and multi-use)
@@ -175,18 +200,16 @@ def _get_voucher_info_for_coupon_report(voucher):
     return coupon_data
 
 
-def generate_coupon_report(coupon_vouchers):
+def _get_coupon_report_field_names(is_catalog_query_coupon):
     """
-    Generate coupon report data
+    Return the coupon report CSV header.
 
     Args:
-        coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+        is_catalog_query_coupon (bool): Whether the report is generated for a dynamic (catalog query) coupon.
 
     Returns:
         List[str]
-        List[dict]
     """
-
     field_names = [
         _('Code'),
         _('Coupon Name'),
@@ -215,78 +238,279 @@ def generate_coupon_report(coupon_vouchers):
         _('Coupon Expiry Date'),
         _('Email Domains'),
     ]
-    rows = []
 
-    for coupon_voucher in coupon_vouchers:
-        coupon = coupon_voucher.coupon
-        client = Invoice.objects.get(order__lines__product=coupon).business_client.name
-        rows.append(_get_info_for_coupon_report(coupon, coupon_voucher.vouchers.first()))
-        rows[0]['Client'] = client
+    if is_catalog_query_coupon:
+        field_names.remove('Course ID')
+        field_names.remove('Organization')
+    else:
+        field_names.remove('Catalog Query')
+        field_names.remove('Course Seat Types')
+        field_names.remove('Redeemed For Course ID')
+
+    return field_names
+
+
+def _get_coupon_header_row(coupon_voucher):
+    coupon = coupon_voucher.coupon
+    row = _get_info_for_coupon_report(coupon, coupon_voucher.vouchers.first())
+    row['Client'] = Invoice.objects.select_related('business_client').get(
+        order__lines__product=coupon
+    ).business_client.name
+    return row
+
+
+def _get_voucher_redemptions(vouchers, include_course_ids):
+    """
+    Load the applications of a chunk of vouchers with a bounded number of queries.
+
+    Args:
+        vouchers (List[Voucher]): Vouchers of the chunk.
+        include_course_ids (bool): Whether the course ID of each redemption's first order line is needed.
+
+    Returns:
+        dict: Voucher ID mapped to a list of (VoucherApplication, course ID) tuples.
+    """
+    redemptions = {}
+    voucher_ids = [voucher.id for voucher in vouchers if voucher.num_orders > 0]
+    if not voucher_ids:
+        return redemptions
+
+    applications = list(
+        VoucherApplication.objects.filter(voucher_id__in=voucher_ids).select_related('user', 'order').order_by('id')
+    )
+
+    course_ids = {}
+    if include_course_ids and applications:
+        order_lines = Line.objects.filter(
+            order_id__in=set(application.order_id for application in applications)
+        ).order_by('order_id', 'id').values_list('order_id', 'product__course_id')
+        for order_id, course_id in order_lines:
+            course_ids.setdefault(order_id, course_id)
+
+    for application in applications:
+        redemptions.setdefault(application.voucher_id, []).append(
+            (application, course_ids.get(application.order_id))
+        )
+    return redemptions
+
 
-        for voucher in coupon_voucher.vouchers.all().prefetch_related('offers'):
-            row = _get_voucher_info_for_coupon_report(voucher)
+def _iter_coupon_voucher_rows(coupon_voucher, redeem_url, is_catalog_query_coupon, chunk_size,
+                              progress_callback=None):
+    """
+    Yield the voucher and redemption rows of a coupon.
+
+    Vouchers are walked in keyset-paginated chunks ordered by ID; every chunk loads its
+    offers, applications, users and order lines with a fixed number of queries.
+    """
+    last_voucher_id = 0
+    while True:
+        vouchers = list(
+            coupon_voucher.vouchers.filter(id__gt=last_voucher_id).order_by('id').prefetch_related('offers')[
+                :chunk_size
+            ]
+        )
+        if not vouchers:
+            return
+        last_voucher_id = vouchers[-1].id
+
+        redemptions = _get_voucher_redemptions(vouchers, include_course_ids=is_catalog_query_coupon)
+        for voucher in vouchers:
+            row = _get_voucher_info_for_coupon_report(voucher, redeem_url)
 
             for item in ('Order Number', 'Redeemed By Username',):
                 row[item] = ''
 
-            rows.append(row)
-            if voucher.num_orders > 0:
-                voucher_applications = VoucherApplication.objects.filter(
-                    voucher=voucher).prefetch_related('user', 'order__lines')
-                for application in voucher_applications:
-                    redemption_user_username = application.user.username
-                    redemption_course_id = application.order.lines.first().product.course_id
+            yield row
+            for application, redemption_course_id in redemptions.get(voucher.id, []):
+                new_row = row.copy()
 
-                    new_row = row.copy()
+                if is_catalog_query_coupon:
+                    new_row['Redeemed For Course ID'] = redemption_course_id
 
-                    if 'Catalog Query' in rows[0]:
-                        new_row['Redeemed For Course ID'] = redemption_course_id
+                new_row.update({
+                    'Status': _('Redeemed'),
+                    'Order Number': application.order.number,
+                    'Redeemed By Username': application.user.username,
+                    'Maximum Coupon Usage': 1,
+                    'Redemption Count': 1,
+                })
 
-                    new_row.update({
-                        'Status': _('Redeemed'),
-                        'Order Number': application.order.number,
-                        'Redeemed By Username': redemption_user_username,
-                        'Maximum Coupon Usage': 1,
-                        'Redemption Count': 1,
-                    })
+                yield new_row
 
-                    rows.append(new_row)
+        if progress_callback:
+            progress_callback(len(vouchers))
 
-    if 'Catalog Query' in rows[0]:
-        field_names.remove('Course ID')
-        field_names.remove('Organization')
-    else:
-        field_names.remove('Catalog Query')
-        field_names.remove('Course Seat Types')
-        field_names.remove('Redeemed For Course ID')
 
-    return field_names, rows
+def iter_coupon_report(coupon_vouchers, chunk_size=None, redeem_url=None, progress_callback=None):
+    """
+    Generate coupon report data lazily.
 
+    The coupon information rows are built up front, while voucher rows are produced by a
+    generator which reads vouchers in chunks, so memory use does not depend on the number
+    of vouchers.
 
-def _get_or_create_offer(
-        product_range, benefit_type, benefit_value, coupon_id=None,
-        max_uses=None, offer_number=None, email_domains=None
-):
+    Args:
+        coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+        chunk_size (int): Number of vouchers loaded per chunk. Defaults to COUPON_REPORT_CHUNK_SIZE.
+        redeem_url (str): Absolute URL of the coupon offer page. Defaults to the offer page
+                          of the current request's site.
+        progress_callback (callable): Called with the number of vouchers processed after each chunk.
+
+    Returns:
+        List[str]
+        Iterator[dict]
     """
-    Return an offer for a catalog with condition and benefit.
+    chunk_size = chunk_size or settings.COUPON_REPORT_CHUNK_SIZE
+    # Resolved while the request is still available, since rows may be produced after the view returns.
+    redeem_url = redeem_url or get_ecommerce_url(reverse('coupons:offer'))
+    coupon_vouchers = [
+        (coupon_voucher, _get_coupon_header_row(coupon_voucher)) for coupon_voucher in coupon_vouchers
+    ]
+    is_catalog_query_coupon = bool(coupon_vouchers) and 'Catalog Query' in coupon_vouchers[0][1]
+
+    def rows():
+        for coupon_voucher, header_row in coupon_vouchers:
+            yield header_row
+            voucher_rows = _iter_coupon_voucher_rows(
+                coupon_voucher, redeem_url, is_catalog_query_coupon, chunk_size, progress_callback
+            )
+            for row in voucher_rows:
+                yield row
 
-    If offer doesn't exist, new offer will be created and associated with
-    provided Offer condition and benefit.
+    return _get_coupon_report_field_names(is_catalog_query_coupon), rows()
+
+
+def generate_coupon_report(coupon_vouchers):
+    """
+    Generate coupon report data
+
+    Args:
+        coupon_vouchers (List[CouponVouchers]): List of coupon_vouchers the report should be generated for
+
+    Returns:
+        List[str]
+        List[dict]
+    """
+    field_names, rows = iter_coupon_report(coupon_vouchers)
+    return field_names, list(rows)
+
+
+def encode_coupon_report_row(row):
+    """ Encode unicode values of a report row, since the csv module does not support unicode. """
+    for key, value in row.items():
+        if isinstance(value, unicode):
+            row[key] = value.encode('utf-8')
+    return row
+
+
+def get_coupon_report_storage():
+    """ Return the storage coupon reports generated in the background are saved to. """
+    storage_class = get_storage_class(settings.COUPON_REPORT_STORAGE_CLASS)
+    return storage_class(**settings.COUPON_REPORT_STORAGE_KWARGS)
+
+
+def get_coupon_report_fingerprint(coupon):
+    """
+    Compute a hash of the coupon state a coupon report depends on.
+
+    The hash changes when vouchers are added or redeemed, when offers are replaced or applied,
+    when the coupon itself is updated (every update adds a history record) and when vouchers
+    become active or expire, so a stored report with the same fingerprint can be reused.
+
+    Args:
+        coupon (Product): Coupon product.
+
+    Returns:
+        str
+    """
+    now = timezone.now()
+    voucher_state = Voucher.objects.filter(coupon_vouchers__coupon=coupon).aggregate(
+        count=Count('id'),
+        last_id=Max('id'),
+        num_orders=Sum('num_orders'),
+        num_active=Sum(
+            Case(
+                When(start_datetime__lt=now, end_datetime__gt=now, then=Value(1)),
+                default=Value(0),
+                output_field=IntegerField()
+            )
+        ),
+    )
+    offer_state = ConditionalOffer.objects.filter(vouchers__coupon_vouchers__coupon=coupon).aggregate(
+        last_id=Max('id'),
+        num_applications=Sum('num_applications'),
+    )
+    history_state = coupon.history.aggregate(last_id=Max('history_id'))
+
+    state = json.dumps([coupon.id, voucher_state, offer_state, history_state], sort_keys=True)
+    return hashlib.md5(state).hexdigest()
+
+
+def write_coupon_report(report):
+    """
+    Generate the CSV of a coupon report, store it and record progress on the report.
+
+    Args:
+        report (CouponReport): The report to generate.
+
+    Returns:
+        CouponReport
+    """
+    coupon = report.coupon
+    report.status = CouponReport.IN_PROGRESS
+    report.total_vouchers = Voucher.objects.filter(coupon_vouchers__coupon=coupon).count()
+    report.processed_vouchers = 0
+    report.save()
+
+    def update_progress(processed_vouchers):
+        report.processed_vouchers += processed_vouchers
+        # Progress is recorded as a modification, so that reports in progress are not presumed lost.
+        CouponReport.objects.filter(id=report.id).update(
+            processed_vouchers=report.processed_vouchers, modified=timezone.now()
+        )
+
+    redeem_url = report.site.siteconfiguration.build_ecommerce_url(reverse('coupons:offer'))
+    field_names, rows = iter_coupon_report(
+        CouponVouchers.objects.filter(coupon=coupon),
+        redeem_url=redeem_url,
+        progress_callback=update_progress
+    )
+
+    file_name = 'coupon_reports/{coupon_id}/{name}-{report_id}.csv{extension}'.format(
+        coupon_id=coupon.id,
+        name=slugify(unicode(coupon.title)),
+        report_id=report.id,
+        extension='.gz' if report.compressed else ''
+    )
+    with tempfile.TemporaryFile() as report_file:
+        output = gzip.GzipFile(fileobj=report_file, mode='wb') if report.compressed else report_file
+        writer = csv.DictWriter(output, fieldnames=field_names)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(encode_coupon_report_row(row))
+        if report.compressed:
+            output.close()
+
+        report_file.seek(0)
+        report.file_name = get_coupon_report_storage().save(file_name, File(report_file))
+
+    report.status = CouponReport.COMPLETE
+    report.save()
+    logger.info('Stored report [%d] with [%d] vouchers for coupon [%d].', report.id, report.total_vouchers, coupon.id)
+    return report
+
+
+def _get_or_create_condition_and_benefit(product_range, benefit_type, benefit_value):
+    """
+    Return the count condition and the benefit shared by all offers of a coupon.
 
     Args:
         product_range (Range): Range of products associated with condition
         benefit_type (str): Type of benefit associated with the offer
         benefit_value (Decimal): Value of benefit associated with the offer
-    Kwargs:
-        coupon_id (int): ID of the coupon
-        max_uses (int): number of maximum global application number an offer can have
-        offer_number (int): number of the consecutive offer - used in case of a multiple
-                            multi-use coupon
-        email_domains (str): a comma-separated string of email domains allowed to apply
-                            this offer
 
     Returns:
-        Offer
+        Condition, Benefit
     """
     offer_condition, __ = Condition.objects.get_or_create(
         range=product_range,
@@ -305,102 +529,326 @@ def _get_or_create_offer(
             'Failed to create Benefit. Benefit value must be a positive number or 0.'
         )
 
-    offer_name = "Coupon [{}]-{}-{}".format(coupon_id, offer_benefit.type, offer_benefit.value)
+    return offer_condition, offer_benefit
+
+
+def _get_offer_name(coupon_id, offer_benefit, offer_number=None):
+    # Benefit values read from the database have two decimal places, while those of new benefits have the
+    # precision of the value they were created with, so the value is normalized for names to match.
+    benefit_value = Decimal(offer_benefit.value).quantize(Decimal('0.01'))
+    offer_name = "Coupon [{}]-{}-{}".format(coupon_id, offer_benefit.type, benefit_value)
     if offer_number:
         offer_name = "{} [{}]".format(offer_name, offer_number)
+    return offer_name
 
-    offer, __ = ConditionalOffer.objects.get_or_create(
-        name=offer_name,
-        offer_type=ConditionalOffer.VOUCHER,
-        condition=offer_condition,
-        benefit=offer_benefit,
-        max_global_applications=max_uses,
-        email_domains=email_domains
+
+def _get_or_create_offer(
+        product_range, benefit_type, benefit_value, coupon_id=None,
+        max_uses=None, offer_number=None, email_domains=None
+):
+    """
+    Return an offer for a catalog with condition and benefit.
+
+    Offers are identified by their name, which is unique. If the offer doesn't exist,
+    a new offer will be created and associated with provided Offer condition and benefit,
+    otherwise the existing offer is updated to match them.
+
+    Args:
+        product_range (Range): Range of products associated with condition
+        benefit_type (str): Type of benefit associated with the offer
+        benefit_value (Decimal): Value of benefit associated with the offer
+    Kwargs:
+        coupon_id (int): ID of the coupon
+        max_uses (int): number of maximum global application number an offer can have
+        offer_number (int): number of the consecutive offer - used in case of a multiple
+                            multi-use coupon
+        email_domains (str): a comma-separated string of email domains allowed to apply
+                            this offer
+
+    Returns:
+        Offer
+    """
+    offer_condition, offer_benefit = _get_or_create_condition_and_benefit(
+        product_range, benefit_type, benefit_value
+    )
+
+    attributes = _get_offer_attributes(offer_condition, offer_benefit, max_uses, email_domains)
+    offer, created = ConditionalOffer.objects.get_or_create(
+        name=_get_offer_name(coupon_id, offer_benefit, offer_number),
+        defaults=attributes
     )
+    if not created:
+        _update_offer(offer, attributes)
 
     return offer
 
 
-def _generate_code_string(length):
+def _get_offer_attributes(offer_condition, offer_benefit, max_uses, email_domains):
+    return {
+        'offer_type': ConditionalOffer.VOUCHER,
+        'condition_id': offer_condition.id,
+        'benefit_id': offer_benefit.id,
+        'max_global_applications': max_uses,
+        'email_domains': email_domains,
+    }
+
+
+def _update_offer(offer, attributes):
+    """ Saves the given attributes on an existing offer, if any of them changed. """
+    changed = {field: value for field, value in attributes.items() if getattr(offer, field) != value}
+    if changed:
+        for field, value in changed.items():
+            setattr(offer, field, value)
+        offer.save()
+
+
+def _get_or_create_offers(
+        product_range, benefit_type, benefit_value, quantity, coupon_id=None,
+        max_uses=None, email_domains=None
+):
+    """
+    Batched version of _get_or_create_offer, used for the per-voucher offers
+    of multi-use and once-per-customer coupons.
+
+    The condition and benefit are shared by all offers, so they are fetched once.
+    Existing offers are looked up by name with a single query, and updated if they
+    do not match the condition, benefit and limits. The missing ones are inserted
+    with bulk_create.
+
+    Args:
+        product_range (Range): Range of products associated with condition
+        benefit_type (str): Type of benefit associated with the offers
+        benefit_value (Decimal): Value of benefit associated with the offers
+        quantity (int): Number of offers, numbered from 0 to quantity - 1
+    Kwargs:
+        coupon_id (int): ID of the coupon
+        max_uses (int): number of maximum global application number an offer can have
+        email_domains (str): a comma-separated string of email domains allowed to apply
+                            these offers
+
+    Returns:
+        List[Offer] ordered by offer number
+    """
+    offer_condition, offer_benefit = _get_or_create_condition_and_benefit(
+        product_range, benefit_type, benefit_value
+    )
+    names = [_get_offer_name(coupon_id, offer_benefit, num) for num in range(quantity)]
+    attributes = _get_offer_attributes(offer_condition, offer_benefit, max_uses, email_domains)
+
+    offers = {}
+    taken_slugs = None
+    for batch in _chunks(names, settings.VOUCHER_BULK_CREATE_BATCH_SIZE):
+        existing = {offer.name: offer for offer in ConditionalOffer.objects.filter(name__in=batch)}
+        new_offers = []
+        for name in batch:
+            if name in existing:
+                _update_offer(existing[name], attributes)
+            else:
+                if taken_slugs is None:
+                    taken_slugs = _get_taken_offer_slugs(_get_offer_name(coupon_id, offer_benefit))
+                # bulk_create bypasses ConditionalOffer.save, which validates the offer and sets its status,
+                # and the slug is set here so that it is not looked up once per offer.
+                offer = ConditionalOffer(name=name, slug=_get_unique_offer_slug(name, taken_slugs), **attributes)
+                offer.clean()
+                offer.status = ConditionalOffer.CONSUMED if offer.get_max_applications() == 0 \
+                    else ConditionalOffer.OPEN
+                new_offers.append(offer)
+
+        if new_offers:
+            # bulk_create does not return primary keys on all backends, so the rows are read back.
+            ConditionalOffer.objects.bulk_create(new_offers)
+            existing.update({
+                offer.name: offer for offer in ConditionalOffer.objects.filter(
+                    name__in=[offer.name for offer in new_offers]
+                )
+            })
+        offers.update(existing)
+
+    return [offers[name] for name in names]
+
+
+def _get_taken_offer_slugs(name_prefix):
+    """ Returns the slugs of the offers whose slug starts with the slug of the given name, with one query. """
+    slug_field = ConditionalOffer._meta.get_field('slug')
+    slug_prefix = slug_field.slugify_func(name_prefix)[:slug_field.max_length]
+    return set(ConditionalOffer.objects.filter(slug__startswith=slug_prefix).values_list('slug', flat=True))
+
+
+def _get_unique_offer_slug(name, taken_slugs):
+    """
+    Returns a slug for an offer with the given name which is not in taken_slugs, and adds it to them.
+
+    Like the AutoSlugField of ConditionalOffer, slugs which are taken are suffixed with a number.
+    """
+    slug_field = ConditionalOffer._meta.get_field('slug')
+    original_slug = slug_field.slugify_func(name)[:slug_field.max_length]
+    slug = original_slug
+    number = 2
+    while not slug or slug in taken_slugs:
+        suffix = '-{}'.format(number)
+        slug = original_slug[:slug_field.max_length - len(suffix)] + suffix
+        number += 1
+    taken_slugs.add(slug)
+    return slug
+
+
+def _chunks(items, size):
+    """ Yield successive slices of items, each at most size long. """
+    for index in range(0, len(items), size):
+        yield items[index:index + size]
+
+
+def _generate_code_strings(length, quantity):
     """
-    Create a string of random characters of specified length
+    Create a list of unique strings of random characters of specified length.
+
+    Candidate codes are checked against existing vouchers with one query per
+    round; codes which collide are regenerated in the following round.
 
     Args:
-        length (int): Defines the length of randomly generated string.
+        length (int): Defines the length of randomly generated strings.
+        quantity (int): Number of codes to generate.
 
     Raises:
         ValueError raised if length is less than one.
 
     Returns:
-        str
+        List[str]
     """
     if length < 1:
         raise ValueError("Voucher code length must be a positive number.")
 
-    h = hashlib.sha256()
-    h.update(uuid.uuid4().get_bytes())
-    voucher_code = base64.b32encode(h.digest())[0:length]
-    if Voucher.objects.filter(code__iexact=voucher_code).exists():
-        return _generate_code_string(length)
+    codes = []
+    unique_codes = set()
+    while len(codes) < quantity:
+        candidates = set()
+        while len(candidates) < quantity - len(codes):
+            h = hashlib.sha256()
+            h.update(uuid.uuid4().get_bytes())
+            code = base64.b32encode(h.digest())[0:length]
+            if code not in unique_codes:
+                candidates.add(code)
+
+        taken = set(
+            existing_code.upper() for existing_code in
+            Voucher.objects.filter(code__in=candidates).values_list('code', flat=True)
+        )
+        for code in candidates - taken:
+            codes.append(code)
+            unique_codes.add(code)
 
-    return voucher_code
+    return codes
 
 
-def _create_new_voucher(code, coupon, end_datetime, name, offer, start_datetime, voucher_type):
+def _parse_voucher_datetime(value, field_name):
     """
-    Creates a voucher.
+    Parse a voucher start or end datetime.
 
-    If randomly generated voucher code already exists, new code will be generated and reverified.
+    Args:
+        value (datetime or str): Datetime value or its string representation.
+        field_name (str): Either 'start' or 'end', used in error messages.
+
+    Returns:
+        datetime
+    """
+    if not value:
+        log_message_and_raise_validation_error(
+            'Failed to create Voucher. Voucher {field} datetime field must be set.'.format(field=field_name)
+        )
+    elif not isinstance(value, datetime.datetime):
+        try:
+            value = dateutil.parser.parse(value)
+        except (AttributeError, ValueError):
+            error_message = {
+                'end': 'Failed to create Voucher. Voucher end datetime value [{date}] is invalid.',
+                'start': 'Failed to create Voucher. Voucher start datetime [{date}] is invalid.',
+            }[field_name]
+            log_message_and_raise_validation_error(error_message.format(date=value))
+    return value
+
+
+def _create_new_vouchers(code, coupon, end_datetime, name, offers, quantity, start_datetime, voucher_type):
+    """
+    Creates vouchers in batches.
+
+    For every batch of VOUCHER_BULK_CREATE_BATCH_SIZE vouchers the codes are generated and
+    checked for uniqueness with one query, and the vouchers as well as their offer and coupon
+    relations are inserted with bulk_create.
 
     Args:
-        code (str): Code associated with vouchers. If not provided, one will be generated.
-        coupon (Product): Coupon product associated with voucher.
+        code (str): Code associated with vouchers. If not provided, codes will be generated.
+        coupon (Product): Coupon product associated with vouchers.
         end_datetime (datetime): Voucher end date.
         name (str): Voucher name.
-        offer (Offer): Offer associated with voucher.
+        offers (List[Offer]): Offers associated with vouchers. Either a single offer shared
+                              by all vouchers, or one offer per voucher.
+        quantity (int): Number of vouchers to be created.
         start_datetime (datetime): Voucher start date.
         voucher_type (str): Voucher usage.
 
     Returns:
-        Voucher
+        List[Voucher]
     """
+    if not quantity:
+        return []
+
+    offer = offers[0]
     if offer.benefit.type == Benefit.PERCENTAGE and offer.benefit.value == 100 and code:
         log_message_and_raise_validation_error('Failed to create Voucher. Code may not be set for enrollment coupon.')
-    voucher_code = code or _generate_code_string(settings.VOUCHER_CODE_LENGTH)
 
-    if not end_datetime:
-        log_message_and_raise_validation_error('Failed to create Voucher. Voucher end datetime field must be set.')
-    elif not isinstance(end_datetime, datetime.datetime):
-        try:
-            end_datetime = dateutil.parser.parse(end_datetime)
-        except (AttributeError, ValueError):
-            log_message_and_raise_validation_error(
-                'Failed to create Voucher. Voucher end datetime value [{date}] is invalid.'.format(date=end_datetime)
-            )
-
-    if not start_datetime:
-        log_message_and_raise_validation_error('Failed to create Voucher. Voucher start datetime field must be set.')
-    elif not isinstance(start_datetime, datetime.datetime):
-        try:
-            start_datetime = dateutil.parser.parse(start_datetime)
-        except (AttributeError, ValueError):
-            log_message_and_raise_validation_error(
-                'Failed to create Voucher. Voucher start datetime [{date}] is invalid.'.format(date=start_datetime)
-            )
-
-    voucher = Voucher.objects.create(
-        name=name,
-        code=voucher_code,
-        usage=voucher_type,
-        start_datetime=start_datetime,
-        end_datetime=end_datetime
-    )
-    voucher.offers.add(offer)
+    end_datetime = _parse_voucher_datetime(end_datetime, 'end')
+    start_datetime = _parse_voucher_datetime(start_datetime, 'start')
 
     coupon_voucher, __ = CouponVouchers.objects.get_or_create(coupon=coupon)
-    coupon_voucher.vouchers.add(voucher)
+    VoucherOffers = Voucher.offers.through
+    CouponVouchersVouchers = CouponVouchers.vouchers.through
 
-    return voucher
+    vouchers = []
+    batch_size = settings.VOUCHER_BULK_CREATE_BATCH_SIZE
+    for batch_start in range(0, quantity, batch_size):
+        batch_quantity = min(batch_size, quantity - batch_start)
+        if code:
+            codes = [code] * batch_quantity
+        else:
+            codes = _generate_code_strings(settings.VOUCHER_CODE_LENGTH, batch_quantity)
+
+        new_vouchers = []
+        for voucher_code in codes:
+            voucher = Voucher(
+                name=name,
+                code=voucher_code.upper(),
+                usage=voucher_type,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime
+            )
+            # bulk_create bypasses Voucher.save, which is where validation normally happens.
+            voucher.clean()
+            new_vouchers.append(voucher)
+        Voucher.objects.bulk_create(new_vouchers)
+
+        # bulk_create does not set primary keys on all backends, so they are read back. The vouchers built
+        # here are returned, rather than those read back, so that callers get the datetimes they passed in.
+        created_ids = dict(Voucher.objects.filter(code__in=set(codes)).values_list('code', 'id'))
+        for voucher in new_vouchers:
+            voucher.id = created_ids[voucher.code]
+            voucher._state.adding = False  # pylint: disable=protected-access
+            voucher._state.db = Voucher.objects.db  # pylint: disable=protected-access
+        batch_vouchers = new_vouchers
+
+        VoucherOffers.objects.bulk_create([
+            VoucherOffers(
+                voucher_id=voucher.id,
+                conditionaloffer_id=offers[batch_start + index].id if len(offers) > 1 else offer.id
+            )
+            for index, voucher in enumerate(batch_vouchers)
+        ])
+        CouponVouchersVouchers.objects.bulk_create([
+            CouponVouchersVouchers(couponvouchers_id=coupon_voucher.id, voucher_id=voucher.id)
+            for voucher in batch_vouchers
+        ])
+        vouchers.extend(batch_vouchers)
+
+    return vouchers
 
 
 def create_vouchers(
@@ -424,6 +872,9 @@ def create_vouchers(
     """
     Create vouchers.
 
+    Vouchers and their relations are inserted in batches of VOUCHER_BULK_CREATE_BATCH_SIZE,
+    so the number of queries grows with the number of batches rather than the number of vouchers.
+
     Arguments:
         benefit_type (str): Type of benefit associated with vouchers.
         benefit_value (Decimal): Value of benefit associated with vouchers.
@@ -447,8 +898,7 @@ def create_vouchers(
         List[Voucher]
     """
     logger.info("Creating [%d] vouchers product [%s]", quantity, coupon.id)
-    vouchers = []
-    offers = []
+    start_time = time.time()
 
     if _range:
         # Enrollment codes use a custom range.
@@ -474,30 +924,43 @@ def create_vouchers(
     multi_offer = True if (
         voucher_type == Voucher.MULTI_USE or voucher_type == Voucher.ONCE_PER_CUSTOMER
     ) else False
-    num_of_offers = quantity if multi_offer else 1
-    for num in range(num_of_offers):
-        offer = _get_or_create_offer(
+    if multi_offer:
+        offers = _get_or_create_offers(
             product_range=product_range,
             benefit_type=benefit_type,
             benefit_value=benefit_value,
+            quantity=quantity,
             max_uses=max_uses,
             coupon_id=coupon.id,
-            offer_number=num,
             email_domains=email_domains
         )
-        offers.append(offer)
-
-    for i in range(quantity):
-        voucher = _create_new_voucher(
-            coupon=coupon,
-            end_datetime=end_datetime,
-            offer=offers[i] if multi_offer else offers[0],
-            start_datetime=start_datetime,
-            voucher_type=voucher_type,
-            code=code,
-            name=name
-        )
-        vouchers.append(voucher)
+    else:
+        offers = [_get_or_create_offer(
+            product_range=product_range,
+            benefit_type=benefit_type,
+            benefit_value=benefit_value,
+            max_uses=max_uses,
+            coupon_id=coupon.id,
+            offer_number=0,
+            email_domains=email_domains
+        )]
+
+    vouchers = _create_new_vouchers(
+        coupon=coupon,
+        end_datetime=end_datetime,
+        offers=offers,
+        quantity=quantity,
+        start_datetime=start_datetime,
+        voucher_type=voucher_type,
+        code=code,
+        name=name
+    )
+
+    duration = time.time() - start_time
+    logger.info(
+        "Created [%d] vouchers for product [%s] in [%.3f] seconds ([%.1f] vouchers/second).",
+        len(vouchers), coupon.id, duration, len(vouchers) / duration if duration else len(vouchers)
+    )
 
     return vouchers
 
@@ -572,6 +1035,133 @@ def update_voucher_offer(offer, benefit_value, benefit_type, coupon, max_uses=No
     )
 
 
+def _get_redemption_bundle_cache_key(code):
+    return hashlib.md5('voucher_redemption_bundle_{code}'.format(code=code)).hexdigest()
+
+
+def _get_redemption_version_cache_key(model_name, instance_id):
+    return 'voucher_redemption_version_{model}_{id}'.format(model=model_name, id=instance_id)
+
+
+def _get_redemption_versions(keys):
+    return get_versions(keys, settings.VOUCHER_CACHE_TIMEOUT)
+
+
+def invalidate_voucher_redemption_cache(model_name, instance_ids):
+    """
+    Invalidates every cached redemption bundle built from the given objects.
+
+    Bundles record the version of the voucher, offer, benefit, range and products they
+    were built from, so replacing those versions is enough to invalidate every bundle
+    referencing the objects without having to know their voucher codes.
+
+    Arguments:
+        model_name (str): One of 'voucher', 'offer', 'benefit', 'range' or 'product'.
+        instance_ids (iterable): IDs of the changed objects.
+    """
+    cache_keys = [_get_redemption_version_cache_key(model_name, instance_id) for instance_id in instance_ids]
+    invalidate_versions(cache_keys, settings.VOUCHER_CACHE_TIMEOUT)
+
+
+def invalidate_voucher_redemption_bundle(code):
+    """ Removes the cached redemption bundle for the given voucher code. """
+    run_now_and_after_commit(cache.delete, _get_redemption_bundle_cache_key(code))
+
+
+def _get_redemption_offer_queryset():
+    return ConditionalOffer.objects.select_related('benefit__range__catalog', 'condition__range')
+
+
+def _get_redemption_products(product_ids):
+    products_by_id = Product.objects.in_bulk(product_ids) if product_ids else {}
+    return [products_by_id[product_id] for product_id in product_ids if product_id in products_by_id]
+
+
+def _build_voucher_redemption_bundle(code):
+    # Versions are read before the objects they cover, so that a bundle built from objects which have
+    # changed since is stored with outdated versions, rather than with the current ones.
+    voucher_id = Voucher.objects.values_list('id', flat=True).get(code=code)
+    version_objects = [('voucher', voucher_id)]
+    offer_ids = ConditionalOffer.objects.filter(vouchers__id=voucher_id).values_list(
+        'id', 'benefit_id', 'benefit__range_id'
+    ).first()
+    if offer_ids:
+        version_objects += zip(('offer', 'benefit', 'range'), offer_ids)
+    versions = _get_redemption_versions(
+        [_get_redemption_version_cache_key(name, object_id) for name, object_id in version_objects]
+    )
+
+    voucher = Voucher.objects.get(id=voucher_id)
+    offer = _get_redemption_offer_queryset().filter(vouchers=voucher).first()
+
+    product_ids = []
+    skus = []
+    if offer:
+        range_products = offer.benefit.range.all_products()
+        # Ranges of catalog queries list no products.
+        if not isinstance(range_products, list):
+            product_ids = list(range_products.values_list('id', flat=True))
+        versions.update(_get_redemption_versions(
+            [_get_redemption_version_cache_key('product', product_id) for product_id in product_ids]
+        ))
+    products = _get_redemption_products(product_ids)
+    if products:
+        skus = list(StockRecord.objects.filter(product__in=products).values_list('partner_sku', flat=True))
+
+    return {
+        'voucher': voucher,
+        'offer': offer,
+        'products': products,
+        'product_ids': [product.id for product in products],
+        'skus': skus,
+        'versions': versions,
+    }
+
+
+def get_voucher_redemption_bundle(code):
+    """
+    Returns everything needed to render and redeem a voucher code, from cache if possible.
+
+    The IDs of the voucher, its offer and products, and the SKUs of the products are cached per
+    code, and are invalidated whenever the voucher, its offer, benefit or range, the catalog backing
+    the range, or the products in it change. Products cannot be pickled, so the voucher, offer and
+    products themselves are loaded by primary key on every call.
+
+    Arguments:
+        code (str): The code of a coupon voucher.
+
+    Returns:
+        dict: The voucher, offer, products, product_ids and skus for the code.
+
+    Raises:
+        Voucher.DoesNotExist: When no vouchers with provided code exist.
+    """
+    cache_key = _get_redemption_bundle_cache_key(code)
+    cached_bundle = cache.get(cache_key)
+    if cached_bundle:
+        versions = cached_bundle['versions']
+        if cache.get_many(versions.keys()) == versions:
+            offer_id = cached_bundle['offer_id']
+            return {
+                'voucher': Voucher.objects.get(id=cached_bundle['voucher_id']),
+                'offer': _get_redemption_offer_queryset().get(id=offer_id) if offer_id else None,
+                'products': _get_redemption_products(cached_bundle['product_ids']),
+                'product_ids': cached_bundle['product_ids'],
+                'skus': cached_bundle['skus'],
+                'versions': versions,
+            }
+
+    bundle = _build_voucher_redemption_bundle(code)
+    cache.set(cache_key, {
+        'voucher_id': bundle['voucher'].id,
+        'offer_id': bundle['offer'].id if bundle['offer'] else None,
+        'product_ids': bundle['product_ids'],
+        'skus': bundle['skus'],
+        'versions': bundle['versions'],
+    }, settings.VOUCHER_CACHE_TIMEOUT)
+    return bundle
+
+
 def get_cached_voucher(code):
     """
     Returns a voucher from cache if one is stored to cache, if not the voucher
@@ -586,13 +1176,7 @@ def get_cached_voucher(code):
     Raises:
         Voucher.DoesNotExist: When no vouchers with provided code exist.
     """
-    cache_key = 'voucher_{code}'.format(code=code)
-    cache_key = hashlib.md5(cache_key).hexdigest()
-    voucher = cache.get(cache_key)
-    if not voucher:
-        voucher = Voucher.objects.get(code=code)
-        cache.set(cache_key, voucher, settings.VOUCHER_CACHE_TIMEOUT)
-    return voucher
+    return get_voucher_redemption_bundle(code)['voucher']
 
 
 def get_voucher_and_products_from_code(code):
@@ -610,9 +1194,10 @@ def get_voucher_and_products_from_code(code):
         Voucher.DoesNotExist: When no vouchers with provided code exist.
         ProductNotFoundError: When no products are associated with the voucher.
     """
-    voucher = get_cached_voucher(code)
-    voucher_range = voucher.offers.first().benefit.range
-    products = voucher_range.all_products()
+    bundle = get_voucher_redemption_bundle(code)
+    voucher = bundle['voucher']
+    voucher_range = bundle['offer'].benefit.range
+    products = bundle['products']
 
     if products or voucher_range.catalog_query:
         # List of products is empty in case of Multi-course coupon
@@ -1,52 +1,148 @@
 import csv
+import datetime
 import logging
 
-from django.http import HttpResponse
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.utils.text import slugify
+from django.utils.timezone import now
 from django.utils.translation import ugettext_lazy as _
 from django.views.generic import View
 from oscar.core.loading import get_model
+from rest_framework import status
+import waffle
 
+from ecommerce.core.constants import ASYNC_COUPON_REPORTS_SWITCH
 from ecommerce.core.views import StaffOnlyMixin
-from ecommerce.extensions.voucher.utils import generate_coupon_report
+from ecommerce.extensions.api.serializers import CouponReportSerializer
+from ecommerce.extensions.voucher.tasks import generate_coupon_report_task
+from ecommerce.extensions.voucher.utils import (
+    encode_coupon_report_row, get_coupon_report_fingerprint, get_coupon_report_storage, iter_coupon_report
+)
 
 logger = logging.getLogger(__name__)
 
 Benefit = get_model('offer', 'Benefit')
+CouponReport = get_model('voucher', 'CouponReport')
 CouponVouchers = get_model('voucher', 'CouponVouchers')
 Product = get_model('catalogue', 'Product')
 StockRecord = get_model('partner', 'StockRecord')
+Voucher = get_model('voucher', 'Voucher')
+
+
+class Echo(object):
+    """ File-like object which returns written values instead of buffering them. """
+
+    def write(self, value):
+        return value
 
 
 class CouponReportCSVView(StaffOnlyMixin, View):
-    """Generates coupon report and returns it in CSV format."""
+    """
+    Generates coupon report and returns it in CSV format.
+
+    Reports for coupons with more than COUPON_REPORT_STREAMING_THRESHOLD vouchers are
+    streamed, so that neither the rows nor the response body are held in memory.
+
+    When the async_coupon_reports switch is active the report is generated by a Celery task
+    instead, and the response describes the background report, whose status can be polled
+    at the coupon report status endpoint.
+    """
 
     def get(self, request, coupon_id):  # pylint: disable=unused-argument
         """
         Generate coupon report for vouchers associated with the coupon.
         """
         coupon = Product.objects.get(id=coupon_id)
+
+        if waffle.switch_is_active(ASYNC_COUPON_REPORTS_SWITCH):
+            return self._enqueue_report(request, coupon)
+
         filename = _("Coupon Report for {coupon_name}").format(coupon_name=unicode(coupon))
         coupons_vouchers = CouponVouchers.objects.filter(coupon=coupon)
 
         filename = "{}.csv".format(slugify(filename))
 
         try:
-            field_names, rows = generate_coupon_report(coupons_vouchers)
+            field_names, rows = iter_coupon_report(coupons_vouchers)
         except StockRecord.DoesNotExist:
             logger.exception(u'Failed to find StockRecord for Coupon [%d].', coupon.id)
             return HttpResponse(_('Failed to find a matching stock record for coupon, report download canceled.'),
                                 status=404)
 
-        response = HttpResponse(content_type='text/csv')
+        voucher_count = Voucher.objects.filter(coupon_vouchers__coupon=coupon).count()
+        if voucher_count > settings.COUPON_REPORT_STREAMING_THRESHOLD:
+            response = StreamingHttpResponse(self._stream_csv(field_names, rows), content_type='text/csv')
+        else:
+            response = HttpResponse(content_type='text/csv')
+            writer = csv.DictWriter(response, fieldnames=field_names)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(encode_coupon_report_row(row))
+
         response['Content-Disposition'] = 'attachment; filename={}'.format(filename)
+        return response
 
-        writer = csv.DictWriter(response, fieldnames=field_names)
-        writer.writeheader()
+    def _stream_csv(self, field_names, rows):
+        writer = csv.DictWriter(Echo(), fieldnames=field_names)
+        # DictWriter.writeheader does not return the written line, so the header is written as a row.
+        yield writer.writerow(dict(zip(field_names, field_names)))
         for row in rows:
-            for key, value in row.items():
-                if isinstance(row[key], unicode):
-                    row[key] = value.encode('utf-8')
-            writer.writerow(row)
+            yield writer.writerow(encode_coupon_report_row(row))
+
+    def _enqueue_report(self, request, coupon):
+        """
+        Return the stored report for the current state of the coupon, or enqueue a new one.
+
+        Reports which failed are never reused. Reports which have not made progress for
+        COUPON_REPORT_STALE_TIMEOUT seconds, presumably because their task was lost, are marked as failed.
+        """
+        fingerprint = get_coupon_report_fingerprint(coupon)
+        compressed = settings.COUPON_REPORT_GZIP
+        reports = CouponReport.objects.filter(
+            coupon=coupon, fingerprint=fingerprint, compressed=compressed
+        ).exclude(status=CouponReport.FAILED)
+
+        stale_before = now() - datetime.timedelta(seconds=settings.COUPON_REPORT_STALE_TIMEOUT)
+        stale_reports = reports.filter(
+            status__in=(CouponReport.PENDING, CouponReport.IN_PROGRESS), modified__lt=stale_before
+        )
+        for report_id in stale_reports.values_list('id', flat=True):
+            logger.warning('Report [%d] for coupon [%d] made no progress, and is presumed lost.', report_id, coupon.id)
+        stale_reports.update(status=CouponReport.FAILED)
+
+        report = reports.first()
+
+        if report:
+            logger.info('Reusing report [%d] for coupon [%d].', report.id, coupon.id)
+        else:
+            report = CouponReport.objects.create(
+                coupon=coupon,
+                site=request.site,
+                requested_by=request.user,
+                fingerprint=fingerprint,
+                compressed=compressed
+            )
+            # The task must only be sent once the report is committed, see the URL configuration.
+            generate_coupon_report_task.delay(report.id)
+            report.refresh_from_db()
+
+        response_status = status.HTTP_200_OK if report.status == CouponReport.COMPLETE else status.HTTP_202_ACCEPTED
+        data = CouponReportSerializer(report, context={'request': request}).data
+        return JsonResponse(data, status=response_status)
+
+
+class CouponReportDownloadView(StaffOnlyMixin, View):
+    """ Downloads the file of a coupon report generated in the background. """
+
+    def get(self, request, pk):  # pylint: disable=unused-argument
+        try:
+            report = CouponReport.objects.get(id=pk, status=CouponReport.COMPLETE)
+        except CouponReport.DoesNotExist:
+            raise Http404('Coupon report not found.')
 
+        report_file = get_coupon_report_storage().open(report.file_name)
+        content_type = 'application/gzip' if report.compressed else 'text/csv'
+        response = StreamingHttpResponse(report_file.chunks(), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename={}'.format(report.file_name.split('/')[-1])
         return response
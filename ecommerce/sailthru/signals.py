@@ -35,6 +35,10 @@ def process_checkout_complete(sender, order=None, user=None, request=None,  # py
     if not partner.enable_sailthru:
         return
 
+    # only course seats are reported, so orders without any are ignored
+    if not order.seat_course_ids:
+        return
+
     # get campaign id from cookies, or saved value in basket
     message_id = None
     if request:
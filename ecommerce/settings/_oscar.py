@@ -53,7 +53,8 @@ OSCAR_ORDER_STATUS_PIPELINE = {
     ORDER.COMPLETE: ()
 }
 
-# This is a dict defining all the statuses a single line in an order may have.
+# This is a dict defining all the statuses a single line in an order may have. Lines whose fulfillment failed
+# may be fulfilled again, e.g. by the fulfillment retry queue, and fail with a different error.
 OSCAR_LINE_STATUS_PIPELINE = {
     LINE.OPEN: (
         LINE.COMPLETE,
@@ -62,10 +63,30 @@ OSCAR_LINE_STATUS_PIPELINE = {
         LINE.FULFILLMENT_TIMEOUT_ERROR,
         LINE.FULFILLMENT_SERVER_ERROR,
     ),
-    LINE.FULFILLMENT_CONFIGURATION_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_NETWORK_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_TIMEOUT_ERROR: (LINE.COMPLETE,),
-    LINE.FULFILLMENT_SERVER_ERROR: (LINE.COMPLETE,),
+    LINE.FULFILLMENT_CONFIGURATION_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_NETWORK_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_TIMEOUT_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_SERVER_ERROR,
+    ),
+    LINE.FULFILLMENT_SERVER_ERROR: (
+        LINE.COMPLETE,
+        LINE.FULFILLMENT_CONFIGURATION_ERROR,
+        LINE.FULFILLMENT_NETWORK_ERROR,
+        LINE.FULFILLMENT_TIMEOUT_ERROR,
+    ),
     LINE.COMPLETE: (),
 }
 
@@ -259,6 +280,28 @@ OSCAR_DASHBOARD_NAVIGATION = [
 # Default timeout for Enrollment API calls
 ENROLLMENT_FULFILLMENT_TIMEOUT = 7
 
+# Maximum number of Enrollment API calls made concurrently when fulfilling an order with several seats.
+# Lines are enrolled one at a time when this is 1.
+ENROLLMENT_FULFILLMENT_MAX_WORKERS = 1
+
+# Path of the LMS bulk enrollment API, used to enroll, or unenroll, the students of a course together when fulfilling
+# or revoking the lines of several orders. Lines are enrolled one at a time when this is not set.
+ENROLLMENT_BULK_API_PATH = None
+# Maximum number of enrollments sent in one bulk enrollment request, and the timeout of such requests.
+ENROLLMENT_BULK_API_BATCH_SIZE = 100
+ENROLLMENT_BULK_API_TIMEOUT = 30
+
+# Orders whose fulfillment fails with a network error or timeout are fulfilled again in the background, up to
+# FULFILLMENT_RETRY_MAX_ATTEMPTS times. Retries are disabled when this is 0.
+FULFILLMENT_RETRY_MAX_ATTEMPTS = 8
+# Seconds before the first retry. The delay doubles with every attempt, up to FULFILLMENT_RETRY_MAX_DELAY.
+FULFILLMENT_RETRY_BASE_DELAY = 60
+FULFILLMENT_RETRY_MAX_DELAY = 60 * 60
+# Maximum number of orders of a site being retried at the same time.
+FULFILLMENT_RETRY_SITE_CONCURRENCY = 10
+# Seconds after which a retry still in progress is presumed lost, and may be started again.
+FULFILLMENT_RETRY_CLAIM_TIMEOUT = 10 * 60
+
 # Coupon code length
 VOUCHER_CODE_LENGTH = 16
 
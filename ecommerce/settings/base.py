@@ -224,6 +224,9 @@ MIDDLEWARE_CLASSES = (
     'ecommerce.theming.middleware.CurrentSiteThemeMiddleware',
     'ecommerce.theming.middleware.ThemePreviewMiddleware',
 )
+
+# Requests to paths starting with any of these prefixes are not given a basket by BasketMiddleware.
+BASKET_MIDDLEWARE_EXCLUDED_PATHS = ('/api/', STATIC_URL, MEDIA_URL)
 # END MIDDLEWARE CONFIGURATION
 
 
@@ -242,7 +245,66 @@ PROVIDER_DATA_PROCESSING_TIMEOUT = 15  # Value is in seconds.
 CREDIT_PROVIDER_CACHE_TIMEOUT = 600
 # END URL CONFIGURATION
 
-VOUCHER_CACHE_TIMEOUT = 10  # Value is in seconds.
+# Cached voucher redemption data is invalidated by signals when vouchers, offers or ranges change.
+VOUCHER_CACHE_TIMEOUT = 60 * 60 * 6  # Value is in seconds.
+
+# Seat and enrollment code SKU mappings are recomputed whenever course seats are created or updated.
+COURSE_SWITCH_SKU_MAP_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+
+# Stock records are cached by SKU in the shared cache, and in a small LRU local to every process. Shared entries are
+# invalidated by signals when stock records or products change; local entries of other processes expire on their own.
+# Caching is disabled when SKU_CACHE_TIMEOUT is 0.
+SKU_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+SKU_CACHE_LOCAL_TIMEOUT = 60  # Value is in seconds.
+SKU_CACHE_LOCAL_MAX_ENTRIES = 1024
+
+# Catalog product ID sets used by ranges are invalidated by signals when catalog stock records change.
+RANGE_PRODUCTS_CACHE_TIMEOUT = 60 * 60 * 24  # Value is in seconds.
+
+# Serialized representations of completed orders are invalidated when the order, its lines or its refunds change.
+# Representations also include the current state of the ordered products, so they are not kept for long.
+# Caching is disabled when the timeout is 0.
+SERIALIZED_ORDER_CACHE_TIMEOUT = 60 * 60  # Value is in seconds.
+
+# Maximum number of concurrent LMS credit eligibility requests made when listing voucher offers.
+CREDIT_ELIGIBILITY_MAX_WORKERS = 10
+
+# Pooled HTTP clients used for calls to the LMS and other services.
+HTTP_CLIENT_POOL_CONNECTIONS = 10  # Number of hosts whose connections are pooled per site.
+# Number of keep-alive connections kept per host. This should be at least ENROLLMENT_FULFILLMENT_MAX_WORKERS.
+HTTP_CLIENT_POOL_MAXSIZE = 10
+# Number of times idempotent requests failing to connect, or answered with a 502, 503 or 504, are retried.
+HTTP_CLIENT_MAX_RETRIES = 2
+HTTP_CLIENT_RETRY_BACKOFF = 0.1  # Seconds before the first retry, doubled for every further retry.
+
+# Circuit breakers guarding LMS endpoints. Once CIRCUIT_BREAKER_FAILURE_THRESHOLD calls made to an endpoint on
+# behalf of a site fail, or time out, within CIRCUIT_BREAKER_FAILURE_WINDOW seconds, further calls fail fast as
+# network errors for CIRCUIT_BREAKER_RESET_TIMEOUT seconds. A probe call is then let through every
+# CIRCUIT_BREAKER_PROBE_INTERVAL seconds until one succeeds. Circuit breakers are disabled when the threshold is 0.
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 10
+CIRCUIT_BREAKER_FAILURE_WINDOW = 60
+CIRCUIT_BREAKER_RESET_TIMEOUT = 30
+CIRCUIT_BREAKER_PROBE_INTERVAL = 10
+
+# Number of vouchers generated, checked for uniqueness and inserted per query batch.
+VOUCHER_BULK_CREATE_BATCH_SIZE = 1000
+
+# Number of vouchers loaded per query chunk when generating coupon reports.
+COUPON_REPORT_CHUNK_SIZE = 500
+
+# Coupon reports for coupons with more vouchers than this are streamed to the client.
+COUPON_REPORT_STREAMING_THRESHOLD = 1000
+
+# Storage used for coupon reports generated in the background. Defaults to DEFAULT_FILE_STORAGE.
+COUPON_REPORT_STORAGE_CLASS = None
+COUPON_REPORT_STORAGE_KWARGS = {}
+
+# Whether background coupon reports are gzip-compressed before they are stored.
+COUPON_REPORT_GZIP = False
+
+# Seconds after which a pending or in progress background coupon report which made no progress is presumed lost,
+# and is replaced rather than reused.
+COUPON_REPORT_STALE_TIMEOUT = 30 * 60
 
 # APP CONFIGURATION
 DJANGO_APPS = [
@@ -501,10 +563,25 @@ BROKER_HEARTBEAT_CHECKRATE = 2
 # See http://celery.readthedocs.org/en/latest/configuration.html#celery-imports.
 CELERY_IMPORTS = (
     'ecommerce_worker.fulfillment.v1.tasks',
+    'ecommerce.extensions.voucher.tasks',
+    'ecommerce.extensions.fulfillment.tasks',
 )
 
 CELERY_ROUTES = {'ecommerce_worker.fulfillment.v1.tasks.fulfill_order': {'queue': 'fulfillment'},
-                 'ecommerce_worker.sailthru.v1.tasks.update_course_enrollment': {'queue': 'email_marketing'}}
+                 'ecommerce_worker.sailthru.v1.tasks.update_course_enrollment': {'queue': 'email_marketing'},
+                 'ecommerce.extensions.voucher.tasks.generate_coupon_report_task': {'queue': 'coupon_reports'},
+                 'ecommerce.extensions.fulfillment.tasks.process_fulfillment_retries_task': {
+                     'queue': 'fulfillment_retries'},
+                 'ecommerce.extensions.fulfillment.tasks.retry_fulfillment_task': {'queue': 'fulfillment_retries'}}
+
+# Periodic tasks, run by celery beat.
+# See http://celery.readthedocs.org/en/latest/userguide/periodic-tasks.html.
+CELERYBEAT_SCHEDULE = {
+    'process-fulfillment-retries': {
+        'task': 'ecommerce.extensions.fulfillment.tasks.process_fulfillment_retries_task',
+        'schedule': datetime.timedelta(minutes=1),
+    },
+}
 
 # Prevent Celery from removing handlers on the root logger. Allows setting custom logging handlers.
 # See http://celery.readthedocs.org/en/latest/configuration.html#celeryd-hijack-root-logger.
@@ -64,6 +64,16 @@ PASSWORD_HASHERS = (
 EDX_API_KEY = 'replace-me'
 # END ORDER PROCESSING
 
+# Services are unreachable from tests, so failed calls are not retried, nor do they open circuits.
+HTTP_CLIENT_MAX_RETRIES = 0
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = 0
+
+# Order numbers are reused from one test to the next, so serialized orders are not cached.
+SERIALIZED_ORDER_CACHE_TIMEOUT = 0
+
+# SKUs are reused from one test to the next, and rolled back without signals, so stock records are not cached.
+SKU_CACHE_TIMEOUT = 0
+
 
 # PAYMENT PROCESSING
 PAYMENT_PROCESSOR_CONFIG = {
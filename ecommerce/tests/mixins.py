@@ -3,6 +3,7 @@
 import datetime
 import json
 from decimal import Decimal
+from urlparse import parse_qs, urlparse
 
 import httpretty
 import jwt
@@ -315,6 +316,7 @@ class LmsApiMockMixin(object):
 
     def setUp(self):
         super(LmsApiMockMixin, self).setUp()
+        self.eligibility_responses = {}
 
     def mock_course_api_response(self, course=None):
         """ Helper function to register an API endpoint for the course information. """
@@ -381,12 +383,17 @@ class LmsApiMockMixin(object):
             'course_key': course_key,
             'deadline': str(datetime.datetime.now() + datetime.timedelta(days=1))
         }] if eligible else []
-        url = '{host}/eligibility/?username={username}&course_key={course_key}'.format(
-            host=request.site.siteconfiguration.build_lms_url('/api/credit/v1'),
-            username=user.username,
-            course_key=course_key
-        )
-        httpretty.register_uri(httpretty.GET, url, body=json.dumps(eligibility_data), content_type=CONTENT_TYPE)
+        self.eligibility_responses[(user.username, course_key)] = eligibility_data
+
+        def callback(request, uri, headers):  # pylint: disable=unused-argument
+            # httpretty matches URLs regardless of their querystring, and decodes a + in it to a space,
+            # so the eligibility is looked up from the raw querystring of the request.
+            params = parse_qs(urlparse(request.path).query)
+            key = (params['username'][0], params['course_key'][0])
+            return 200, headers, json.dumps(self.eligibility_responses.get(key, []))
+
+        url = '{host}/eligibility/'.format(host=request.site.siteconfiguration.build_lms_url('/api/credit/v1'))
+        httpretty.register_uri(httpretty.GET, url, body=callback, content_type=CONTENT_TYPE)
 
     def mock_verification_status_api(self, site, user, status=200, is_verified=True):
         """ Mock verification API endpoint. Returns verfication status data. """